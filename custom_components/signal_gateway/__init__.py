@@ -3,28 +3,125 @@
 from __future__ import annotations
 
 import logging
+import re
+import sqlite3
+from collections.abc import Callable, Coroutine, Mapping
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CoreState, HomeAssistant, callback
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later, async_track_time_interval
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
+    CONF_API_INFO,
+    CONF_ATTACHMENT_CACHE_MB,
+    CONF_AUTO_REPLIES,
+    CONF_COMMANDS,
+    CONF_DOWNLOAD_ATTACHMENTS,
+    CONF_GROUP_ALLOWLIST,
+    CONF_GROUP_RATE_LIMIT,
+    CONF_GROUP_SAMPLING,
+    CONF_INCLUDE_ENVELOPE,
+    CONF_MAX_PARALLEL_DOWNLOADS,
+    CONF_MAX_RECEIVED_ATTACHMENT_MB,
+    CONF_MESSAGE_REGEX,
+    CONF_MESSAGE_RETENTION_DAYS,
     CONF_PHONE_NUMBER,
+    CONF_RATE_LIMIT_SUMMARY,
+    CONF_RECEIVE_MODE,
+    CONF_RECEIVE_ON_DEMAND,
     CONF_RECIPIENTS,
+    CONF_SENDER_ALLOWLIST,
+    CONF_SENDER_DENYLIST,
+    CONF_SENDER_RATE_LIMIT,
     CONF_SIGNAL_CLI_REST_API_URL,
+    CONF_STARTUP_DELAY,
+    CONF_STORE_MESSAGES,
+    CONF_TIMEOUT_CEILING,
+    CONF_TIMEOUT_FLOOR,
+    CONF_WEBSOCKET_COMPRESSION,
     CONF_WEBSOCKET_ENABLED,
+    CONF_WEBSOCKET_HEARTBEAT,
+    CONF_WEBSOCKET_IDLE_TIMEOUT,
+    CONF_WEBSOCKET_MAX_MESSAGE_KB,
+    CONF_WEBSOCKET_OVERFLOW_POLICY,
+    CONF_WEBSOCKET_QUEUE_SIZE,
+    DATA_DEDUP_INDEXES,
     DOMAIN,
+    EVENT_SIGNAL_ATTACHMENTS,
+    EVENT_SIGNAL_COMMAND,
+    EVENT_SIGNAL_RATE_LIMITED,
     EVENT_SIGNAL_RECEIVED,
+    RECEIVE_MODE_POLLING,
+    RECEIVE_MODE_WEBSOCKET,
 )
-from .signal import SignalClient
+from .signal import (
+    AdaptiveTimeout,
+    CommandRouter,
+    DedupIndex,
+    Envelope,
+    MessageFilter,
+    RateLimiter,
+    SignalClient,
+    SignalWebSocketListener,
+)
+from .signal.commands import parse_commands
+from .signal.filters import parse_group_sampling
+from .signal.timeouts import DEFAULT_TIMEOUT_CEILING, DEFAULT_TIMEOUT_FLOOR
+from .api_info import async_probe_api, receive_mode
+from .attachment_cache import (
+    DEFAULT_ATTACHMENT_CACHE_MB,
+    DEFAULT_MAX_PARALLEL_DOWNLOADS,
+    DEFAULT_MAX_RECEIVED_ATTACHMENT_MB,
+    AttachmentCache,
+)
+from .auto_reply import AutoResponder, parse_auto_replies
+from .message_store import MessageStore
 from .notify import async_unload_notify_service
+from .on_demand import OnDemandReceiver
+from .services import async_setup_services
+from .views import AttachmentView
 
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
-PLATFORMS: list[Platform] = [Platform.NOTIFY]
+# Interval of the events summarizing the messages dropped by flood protection
+RATE_LIMIT_SUMMARY_INTERVAL = timedelta(minutes=1)
+# Interval between two prunings of the message store
+MESSAGE_STORE_PRUNE_INTERVAL = timedelta(hours=1)
+
+# Options applied to a loaded entry without reloading it
+FILTER_OPTIONS = frozenset(
+    {
+        CONF_MESSAGE_REGEX,
+        CONF_SENDER_ALLOWLIST,
+        CONF_SENDER_DENYLIST,
+        CONF_GROUP_ALLOWLIST,
+        CONF_GROUP_SAMPLING,
+    }
+)
+RATE_LIMIT_OPTIONS = frozenset({CONF_SENDER_RATE_LIMIT, CONF_GROUP_RATE_LIMIT})
+LIVE_OPTIONS = (
+    FILTER_OPTIONS
+    | RATE_LIMIT_OPTIONS
+    | {
+        CONF_RECIPIENTS,
+        CONF_MESSAGE_RETENTION_DAYS,
+        CONF_STARTUP_DELAY,
+    }
+)
+
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.NOTIFY, Platform.SENSOR]
+
+# pylint: disable-next=invalid-name
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
 
 def parse_recipients(recipients_str: str) -> list[str]:
@@ -69,6 +166,361 @@ def parse_recipients(recipients_str: str) -> list[str]:
     return recipients
 
 
+def build_message_filter(data: Mapping[str, Any]) -> MessageFilter:
+    """Build the incoming message filter from the entry configuration.
+
+    Args:
+        data: Config entry data
+
+    Returns:
+        The message filter (empty if no filter is configured)
+
+    Raises:
+        ValueError: If the group sampling rules are malformed
+        re.error: If the message regex is invalid
+    """
+    return MessageFilter(
+        sender_allowlist=parse_recipients(data.get(CONF_SENDER_ALLOWLIST, "")),
+        sender_denylist=parse_recipients(data.get(CONF_SENDER_DENYLIST, "")),
+        group_allowlist=parse_recipients(data.get(CONF_GROUP_ALLOWLIST, "")),
+        message_regex=data.get(CONF_MESSAGE_REGEX) or None,
+        group_sampling=parse_group_sampling(data.get(CONF_GROUP_SAMPLING, "")),
+    )
+
+
+async def async_setup(
+    hass: HomeAssistant, config: ConfigType  # pylint: disable=unused-argument
+) -> bool:
+    """Set up the Signal Gateway integration-wide services and views."""
+    await async_setup_services(hass)
+    hass.http.register_view(AttachmentView())
+    return True
+
+
+async def _async_route_command(
+    hass: HomeAssistant, router: CommandRouter, event_data: dict[str, Any]
+) -> None:
+    """Call the service or fire the event of the command starting a message."""
+    match = router.match(event_data.get("message"))
+    if match is None:
+        return
+    command, args = match
+    service = router.service(command)
+    if service:
+        domain, service_name = service.split(".", 1)
+        _LOGGER.debug("Command '%s' calls service %s", command, service)
+        # The arguments are only sent when present, so that commands without
+        # arguments can call any service (most reject unknown fields)
+        await hass.services.async_call(
+            domain, service_name, {"args": args} if args else {}, blocking=False
+        )
+    else:
+        hass.bus.async_fire(
+            EVENT_SIGNAL_COMMAND, {"command": command, "args": args, **event_data}
+        )
+
+
+async def _async_download_attachments(
+    hass: HomeAssistant, cache: AttachmentCache, event_data: dict[str, Any]
+) -> None:
+    """Download the attachments of a message and fire the follow-up event."""
+    attachments = await cache.async_fetch_all(event_data["attachments"])
+    hass.bus.async_fire(
+        EVENT_SIGNAL_ATTACHMENTS,
+        {
+            "timestamp": event_data["timestamp"],
+            "sender": event_data["sender"],
+            "group_id": event_data["group_id"],
+            "reply_to": event_data["reply_to"],
+            "message": event_data["message"],
+            "attachments": attachments,
+        },
+    )
+
+
+def _setup_message_filter(
+    hass: HomeAssistant, entry: ConfigEntry, client: SignalClient
+) -> None:
+    """Set up the filter of incoming messages."""
+    try:
+        message_filter = build_message_filter(entry.data)
+    except (ValueError, re.error) as err:
+        _LOGGER.error("Invalid incoming message filter, ignoring it: %s", err)
+        return
+    if not message_filter.is_empty:
+        client.set_message_filter(message_filter)
+        hass.data[DOMAIN][entry.entry_id]["message_filter"] = message_filter
+
+
+def _setup_rate_limiter(
+    hass: HomeAssistant, entry: ConfigEntry, client: SignalClient
+) -> None:
+    """Set up the flood protection and its periodic summary event."""
+    rate_limiter = RateLimiter(
+        sender_rate=entry.data.get(CONF_SENDER_RATE_LIMIT, 0),
+        group_rate=entry.data.get(CONF_GROUP_RATE_LIMIT, 0),
+    )
+    if rate_limiter.is_empty:
+        return
+    client.set_rate_limiter(rate_limiter)
+    hass.data[DOMAIN][entry.entry_id]["rate_limiter"] = rate_limiter
+    if not entry.data.get(CONF_RATE_LIMIT_SUMMARY, False):
+        return
+
+    @callback
+    def _fire_summary(_now: datetime) -> None:
+        summary = rate_limiter.pop_summary()
+        if summary:
+            hass.bus.async_fire(
+                EVENT_SIGNAL_RATE_LIMITED,
+                {
+                    "interval": RATE_LIMIT_SUMMARY_INTERVAL.total_seconds(),
+                    **summary,
+                },
+            )
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            _fire_summary,
+            RATE_LIMIT_SUMMARY_INTERVAL,
+            name=f"{DOMAIN} rate limit summary",
+        )
+    )
+
+
+async def _async_open_message_store(
+    hass: HomeAssistant, entry: ConfigEntry, service_name: str
+) -> Optional[MessageStore]:
+    """Open the message store of an entry and schedule its pruning."""
+    message_store = MessageStore(
+        hass,
+        Path(hass.config.path(f"{DOMAIN}_{service_name}.db")),
+        retention_days=entry.data.get(CONF_MESSAGE_RETENTION_DAYS, 30),
+    )
+    try:
+        await message_store.async_open()
+    except (sqlite3.Error, OSError) as err:
+        _LOGGER.error("Cannot open the message store, messages are not stored: %s", err)
+        return None
+    if message_store.retention_days:
+        entry.async_create_background_task(
+            hass, message_store.async_prune(), f"{DOMAIN} message store pruning"
+        )
+
+    # Scheduled even without retention, which can be set without reloading
+    async def _async_prune(_now: datetime) -> None:
+        await message_store.async_prune()
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            _async_prune,
+            MESSAGE_STORE_PRUNE_INTERVAL,
+            name=f"{DOMAIN} message store pruning",
+        )
+    )
+    return message_store
+
+
+async def _async_setup_on_demand(
+    hass: HomeAssistant, entry: ConfigEntry, client: SignalClient, always_needed: bool
+) -> None:
+    """Start the listener only while received messages have consumers."""
+    on_demand = OnDemandReceiver(hass, client, always_needed)
+    hass.data[DOMAIN][entry.entry_id]["on_demand"] = on_demand
+    entry.async_on_unload(on_demand.async_cancel)
+    await on_demand.async_start()
+
+
+async def _async_start_after_boot(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    start: Callable[[], Coroutine[Any, Any, None]],
+) -> None:
+    """Start the listener now, or once Home Assistant has started.
+
+    During boot, the listener is started after EVENT_HOMEASSISTANT_STARTED
+    (and the configured startup delay): messages queued by signal-cli in the
+    meantime are then received by loaded automations.
+    """
+    if hass.state is CoreState.running:
+        await start()
+        return
+    delay = entry.data.get(CONF_STARTUP_DELAY, 0)
+
+    @callback
+    def _start(_now: Optional[datetime] = None) -> None:
+        entry.async_create_background_task(hass, start(), f"{DOMAIN} listener start")
+
+    @callback
+    def _at_started(_hass: HomeAssistant) -> None:
+        if delay:
+            entry.async_on_unload(async_call_later(hass, delay, _start))
+        else:
+            _start()
+
+    _LOGGER.debug("Signal listener starts once Home Assistant has started")
+    entry.async_on_unload(async_at_started(hass, _at_started))
+
+
+def attachment_directory(hass: HomeAssistant, service_name: str) -> Path:
+    """Return the directory of the attachments received by an entry."""
+    media_dir = hass.config.media_dirs.get("local") or hass.config.path("media")
+    return Path(media_dir) / DOMAIN / service_name
+
+
+async def _async_start_listener(
+    hass: HomeAssistant, entry: ConfigEntry, client: SignalClient
+) -> None:
+    """Start the WebSocket listener firing events for incoming messages."""
+    entry_data = hass.data[DOMAIN][entry.entry_id]
+    include_envelope = entry.data.get(CONF_INCLUDE_ENVELOPE, False)
+    try:
+        commands = parse_commands(entry.data.get(CONF_COMMANDS, ""))
+    except ValueError as err:
+        _LOGGER.error("Invalid command rules, ignoring them: %s", err)
+        commands = {}
+    router = CommandRouter(commands)
+
+    # Download received attachments in the background, events fire immediately
+    attachment_cache = None
+    if entry.data.get(CONF_DOWNLOAD_ATTACHMENTS, False):
+        attachment_cache = entry_data["attachment_cache"]
+
+    # Keep a searchable history of the received messages
+    message_store = None
+    if entry.data.get(CONF_STORE_MESSAGES, False):
+        message_store = await _async_open_message_store(
+            hass, entry, entry_data["service_name"]
+        )
+        if message_store is not None:
+            entry_data["message_store"] = message_store
+
+    async def _handle_message(data: dict) -> None:
+        """Handle incoming Signal messages."""
+        try:
+            event_data = Envelope(data).as_event_data(include_envelope)
+            hass.bus.async_fire(EVENT_SIGNAL_RECEIVED, event_data)
+            if message_store is not None:
+                message_store.async_add(event_data)
+            if attachment_cache is not None and event_data["attachments"]:
+                entry.async_create_background_task(
+                    hass,
+                    _async_download_attachments(hass, attachment_cache, event_data),
+                    f"{DOMAIN} attachments download",
+                )
+            if router:
+                await _async_route_command(hass, router, event_data)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Error processing Signal message: %s", err)
+
+    client.set_message_handler(_handle_message)
+
+    # Drop unwanted messages before any event is fired
+    _setup_message_filter(hass, entry, client)
+
+    # Drop floods from a sender or a group, before auto-replies and events
+    _setup_rate_limiter(hass, entry, client)
+
+    # Answer simple requests without going through the automation engine
+    try:
+        auto_replies = parse_auto_replies(entry.data.get(CONF_AUTO_REPLIES, ""))
+    except ValueError as err:
+        _LOGGER.error("Invalid auto-reply rules, ignoring them: %s", err)
+    else:
+        if auto_replies:
+            auto_responder = AutoResponder(hass, client, auto_replies)
+            client.set_auto_responder(auto_responder)
+            entry_data["auto_responder"] = auto_responder
+
+    async def _async_start() -> None:
+        if entry.data.get(CONF_RECEIVE_ON_DEMAND, False):
+            # Messages consumed by the integration itself need a started listener
+            await _async_setup_on_demand(
+                hass,
+                entry,
+                client,
+                always_needed=(
+                    message_store is not None
+                    or "auto_responder" in entry_data
+                    or any(commands.values())
+                ),
+            )
+            return
+        await client.start_listening()
+        _LOGGER.info("Signal WebSocket listener started")
+
+    # Messages received during boot would fire events before automations load
+    await _async_start_after_boot(hass, entry, _async_start)
+
+
+async def _async_resolve_receive_mode(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    """Return the receive mode matching the mode of the API.
+
+    The API mode is probed by the config and options flows and cached in the
+    entry. It is only probed here when the entry has none cached (the API was
+    unreachable when the entry was saved).
+    """
+    api_info = entry.data.get(CONF_API_INFO)
+    if api_info is None:
+        api_info = await async_probe_api(
+            hass,
+            str(entry.data.get(CONF_SIGNAL_CLI_REST_API_URL, "")),
+            str(entry.data.get(CONF_PHONE_NUMBER, "")),
+        )
+        if api_info is not None:
+            hass.config_entries.async_update_entry(
+                entry, data={**entry.data, CONF_API_INFO: api_info}
+            )
+    configured_mode = entry.data.get(CONF_RECEIVE_MODE, RECEIVE_MODE_WEBSOCKET)
+    mode = receive_mode(api_info, configured_mode)
+    if mode != configured_mode:
+        _LOGGER.info(
+            "signal-cli-rest-api runs in %s mode, receiving messages with %s",
+            api_info and api_info.get("mode"),
+            mode,
+        )
+    return mode
+
+
+def _dedup_index(hass: HomeAssistant, entry: ConfigEntry) -> DedupIndex:
+    """Return the index of the envelopes received by an entry.
+
+    The index outlives the client, so envelopes redelivered after a reload
+    (e.g. when switching between the WebSocket and polling) are dropped.
+    """
+    indexes: dict[str, DedupIndex] = hass.data.setdefault(DATA_DEDUP_INDEXES, {})
+    dedup = indexes.get(entry.entry_id)
+    if dedup is None:
+        dedup = indexes[entry.entry_id] = DedupIndex(
+            SignalWebSocketListener.dedup_window, SignalWebSocketListener.dedup_size
+        )
+    return dedup
+
+
+def _listener_settings(options: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the listener tuning settings configured in the options.
+
+    Settings missing from the options keep the defaults of the listener.
+    """
+    settings: dict[str, Any] = {}
+    if CONF_WEBSOCKET_HEARTBEAT in options:
+        settings["heartbeat"] = options[CONF_WEBSOCKET_HEARTBEAT] or None
+    if CONF_WEBSOCKET_IDLE_TIMEOUT in options:
+        settings["idle_timeout"] = options[CONF_WEBSOCKET_IDLE_TIMEOUT] or None
+    if CONF_WEBSOCKET_COMPRESSION in options:
+        # 15 window bits: the deflate default, as negotiated by browsers
+        settings["compress"] = 15 if options[CONF_WEBSOCKET_COMPRESSION] else 0
+    if CONF_WEBSOCKET_MAX_MESSAGE_KB in options:
+        settings["max_msg_size"] = options[CONF_WEBSOCKET_MAX_MESSAGE_KB] * 1024
+    if CONF_WEBSOCKET_QUEUE_SIZE in options:
+        settings["queue_size"] = options[CONF_WEBSOCKET_QUEUE_SIZE]
+    if CONF_WEBSOCKET_OVERFLOW_POLICY in options:
+        settings["overflow_policy"] = options[CONF_WEBSOCKET_OVERFLOW_POLICY]
+    return settings
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Signal Gateway from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -77,10 +529,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     phone_number = str(entry.data.get(CONF_PHONE_NUMBER, ""))
     websocket_enabled = entry.data.get(CONF_WEBSOCKET_ENABLED, True)
 
-    # Create the Signal client
-    session = async_get_clientsession(hass)
-    client = SignalClient(api_url, phone_number, session)
-
     # Normalize the integration name for the service
     integration_name = entry.data.get(CONF_NAME, DOMAIN)
     service_name = cv.slugify(integration_name)
@@ -98,41 +546,62 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                 )
                 return False
 
+    # Create the Signal client, receiving with the transport of the API mode
+    session = async_get_clientsession(hass)
+    polling = await _async_resolve_receive_mode(hass, entry) == RECEIVE_MODE_POLLING
+    client = SignalClient(
+        api_url,
+        phone_number,
+        session,
+        polling=polling,
+        dedup=_dedup_index(hass, entry),
+        timeouts=AdaptiveTimeout(
+            entry.data.get(CONF_TIMEOUT_FLOOR, DEFAULT_TIMEOUT_FLOOR),
+            entry.data.get(CONF_TIMEOUT_CEILING, DEFAULT_TIMEOUT_CEILING),
+        ),
+    )
+    client.configure_listener(**_listener_settings(entry.data))
+
     _LOGGER.debug("Singal Gateway integration setup (name: %s)", service_name)
 
     # Get default recipients if configured
-    recipients_str = entry.data.get(CONF_RECIPIENTS, "")
-    default_recipients = parse_recipients(recipients_str)
+    default_recipients = parse_recipients(entry.data.get(CONF_RECIPIENTS, ""))
+
+    # Received attachments, downloaded on demand or when messages are received
+    attachment_cache = AttachmentCache(
+        hass,
+        client,
+        attachment_directory(hass, service_name),
+        max_bytes=entry.data.get(CONF_ATTACHMENT_CACHE_MB, DEFAULT_ATTACHMENT_CACHE_MB)
+        * 1048576,
+        max_parallel=entry.data.get(
+            CONF_MAX_PARALLEL_DOWNLOADS, DEFAULT_MAX_PARALLEL_DOWNLOADS
+        ),
+        max_file_bytes=entry.data.get(
+            CONF_MAX_RECEIVED_ATTACHMENT_MB, DEFAULT_MAX_RECEIVED_ATTACHMENT_MB
+        )
+        * 1048576,
+    )
+    await attachment_cache.async_load()
 
     # Store the client, service_name, and default recipients
     hass.data[DOMAIN][entry.entry_id] = {
+        "config": dict(entry.data),
         "client": client,
         "service_name": service_name,
         "default_recipients": default_recipients,
+        "attachment_cache": attachment_cache,
     }
 
     # Set up WebSocket listener if enabled
     if websocket_enabled:
-
-        async def _handle_message(data: dict) -> None:
-            """Handle incoming Signal messages."""
-            try:
-                hass.bus.async_fire(
-                    EVENT_SIGNAL_RECEIVED,
-                    data,
-                )
-            except Exception as err:  # pylint: disable=broad-except
-                _LOGGER.error("Error processing Signal message: %s", err)
-
-        client.set_message_handler(_handle_message)
-        await client.start_listening()
-        _LOGGER.info("Signal WebSocket listener started")
+        await _async_start_listener(hass, entry, client)
 
     # Load the notify platform for this entry
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    # Register update listener for config changes
-    entry.add_update_listener(async_reload_entry)
+    # Register update listener for config changes (removed when unloaded)
+    entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
     return True
 
@@ -153,12 +622,22 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
         return False
 
+    # Stop starting the listener on demand, then stop it
+    on_demand = data.get("on_demand")
+    if on_demand:
+        on_demand.async_cancel()
+
     # Stop the WebSocket listener
     client = data.get("client")
     if client:
         await client.stop_listening()
         _LOGGER.info("Signal WebSocket listener stopped")
 
+    # Write the pending messages and close the message store
+    message_store = data.get("message_store")
+    if message_store:
+        await message_store.async_close()
+
     # Manually unload the notify service (this is not done by platform unload)
     await async_unload_notify_service(hass, entry)
 
@@ -168,7 +647,81 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the envelopes received by a removed config entry."""
+    hass.data.get(DATA_DEDUP_INDEXES, {}).pop(entry.entry_id, None)
+
+
+def _apply_live_options(
+    hass: HomeAssistant, entry: ConfigEntry, data: dict[str, Any]
+) -> bool:
+    """Apply the changed options of a loaded entry in place, if possible.
+
+    Args:
+        hass: Home Assistant instance
+        entry: Config entry with the new configuration
+        data: Entry data, holding the configuration the entry was set up with
+
+    Returns:
+        False if a changed option requires a reload (nothing is applied)
+    """
+    previous = data.get("config", {})
+    changed = {
+        key
+        for key in previous.keys() | entry.data.keys()
+        if previous.get(key) != entry.data.get(key)
+    }
+    if not changed <= LIVE_OPTIONS:
+        return False
+    rate_limiter = data.get("rate_limiter")
+    sender_rate = entry.data.get(CONF_SENDER_RATE_LIMIT, 0)
+    group_rate = entry.data.get(CONF_GROUP_RATE_LIMIT, 0)
+    # Enabling or disabling flood protection changes its summary timer
+    if changed & RATE_LIMIT_OPTIONS and (
+        rate_limiter is None or not (sender_rate > 0 or group_rate > 0)
+    ):
+        return False
+
+    if CONF_RECIPIENTS in changed:
+        data["default_recipients"] = parse_recipients(
+            entry.data.get(CONF_RECIPIENTS, "")
+        )
+        if data.get("notify_service") is not None:
+            data["notify_service"].set_default_recipients(data["default_recipients"])
+    if changed & FILTER_OPTIONS:
+        data.pop("message_filter", None)
+        data["client"].set_message_filter(None)
+        _setup_message_filter(hass, entry, data["client"])
+    if changed & RATE_LIMIT_OPTIONS and rate_limiter is not None:
+        # Buckets keep their tokens, capped to the new rates
+        rate_limiter.sender_rate = sender_rate
+        rate_limiter.group_rate = group_rate
+    message_store = data.get("message_store")
+    if CONF_MESSAGE_RETENTION_DAYS in changed and message_store is not None:
+        message_store.retention_days = entry.data.get(CONF_MESSAGE_RETENTION_DAYS, 30)
+        # Apply a shorter retention now rather than at the next hourly pruning
+        if message_store.retention_days:
+            entry.async_create_background_task(
+                hass, message_store.async_prune(), f"{DOMAIN} message store pruning"
+            )
+
+    data["config"] = dict(entry.data)
+    if changed:
+        _LOGGER.info(
+            "Applied Signal Gateway options without reloading: %s",
+            ", ".join(sorted(changed)),
+        )
+    return True
+
+
 async def async_reload_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Reload config entry."""
-    await async_unload_entry(hass, entry)
-    await async_setup_entry(hass, entry)
+    """Apply a configuration change, reloading the entry only if needed.
+
+    Recipients, filters, rate limits and retention are updated in place; other
+    changes (API URL, phone number, receive mode...) restart the listener.
+    """
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if data is not None and _apply_live_options(hass, entry, data):
+        return
+    # Unloading through the config entry runs its unload callbacks
+    await hass.config_entries.async_reload(entry.entry_id)
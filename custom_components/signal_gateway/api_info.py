@@ -0,0 +1,76 @@
+"""Capabilities of the signal-cli-rest-api instance, probed at setup.
+
+The mode of signal-cli-rest-api decides how messages are received: the
+json-rpc mode only delivers them over the WebSocket, the normal and native
+modes only over REST. The probed mode is cached in the config entry when it
+is saved, so setting the entry up does not query the API again.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Optional
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import RECEIVE_MODE_POLLING, RECEIVE_MODE_WEBSOCKET
+from .signal import SignalHTTPClient
+
+_LOGGER = logging.getLogger(__name__)
+
+API_MODE_NORMAL = "normal"  # A JVM is started for each request
+API_MODE_NATIVE = "native"
+API_MODE_JSON_RPC = "json-rpc"
+
+
+async def async_probe_api(
+    hass: HomeAssistant, api_url: str, phone_number: str
+) -> Optional[dict[str, Any]]:
+    """Query the capabilities of the API.
+
+    Args:
+        hass: Home Assistant instance
+        api_url: Base URL of the Signal-cli-rest-api service
+        phone_number: Phone number of the Signal account
+
+    Returns:
+        The API mode, version and build (without the health status, which is
+        only logged), or None if the API cannot be queried
+    """
+    client = SignalHTTPClient(api_url, phone_number, async_get_clientsession(hass))
+    try:
+        info = await client.probe()
+    except (RuntimeError, ValueError, aiohttp.ClientError, TimeoutError) as err:
+        _LOGGER.warning("Cannot query signal-cli-rest-api at %s: %s", api_url, err)
+        return None
+    if not info.pop("healthy"):
+        _LOGGER.warning("signal-cli-rest-api at %s reports it is unhealthy", api_url)
+    if info["mode"] == API_MODE_NORMAL:
+        _LOGGER.warning(
+            "signal-cli-rest-api at %s runs in normal mode, which starts a JVM for "
+            "each request: sending and receiving take seconds. The json-rpc mode "
+            "is much faster",
+            api_url,
+        )
+    return info
+
+
+def receive_mode(api_info: Optional[dict[str, Any]], configured: str) -> str:
+    """Return the receive mode supported by the API, or the configured one.
+
+    Examples:
+        >>> receive_mode({"mode": "normal"}, "websocket")
+        'polling'
+        >>> receive_mode({"mode": "json-rpc"}, "polling")
+        'websocket'
+        >>> receive_mode(None, "polling")
+        'polling'
+    """
+    mode = (api_info or {}).get("mode")
+    if mode == API_MODE_JSON_RPC:
+        return RECEIVE_MODE_WEBSOCKET
+    if mode in (API_MODE_NORMAL, API_MODE_NATIVE):
+        return RECEIVE_MODE_POLLING
+    return configured
@@ -0,0 +1,310 @@
+"""Local cache of the attachments received with Signal messages.
+
+Received envelopes only carry attachment IDs. Attachments are downloaded on
+demand (by the attachment view) or in the background when a message is
+received, a few at a time, to a directory of the media folder. The size of
+the directory is capped: the least recently used files are evicted first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Optional
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .signal import SignalClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Defaults of the options: total size of the downloaded attachments of an
+# entry, size above which attachments are not downloaded, and maximum number of
+# attachments downloaded concurrently
+DEFAULT_ATTACHMENT_CACHE_MB = 500
+DEFAULT_MAX_RECEIVED_ATTACHMENT_MB = 50
+DEFAULT_MAX_PARALLEL_DOWNLOADS = 4
+# Suffix of files being downloaded (renamed once complete)
+PART_SUFFIX = ".part"
+# Downloaded chunks are buffered and written by blocks of this size
+WRITE_BLOCK_SIZE = 1048576
+
+
+def attachment_filename(attachment_id: Optional[str]) -> Optional[str]:
+    """Return the local file name of an attachment, or None if the ID is unsafe.
+
+    Examples:
+        >>> attachment_filename("Jr2vY4cFvQ.jpg")
+        'Jr2vY4cFvQ.jpg'
+        >>> attachment_filename("../configuration.yaml") is None
+        True
+        >>> attachment_filename(".hidden") is None
+        True
+    """
+    if not attachment_id:
+        return None
+    name = os.path.basename(attachment_id)
+    if name != attachment_id or name.startswith(".") or name.endswith(PART_SUFFIX):
+        return None
+    return name
+
+
+class AttachmentCache:  # pylint: disable=too-many-instance-attributes
+    """Download received attachments to a size-capped directory.
+
+    Downloaded files are tracked in least recently used order. Downloading an
+    attachment already in the cache only refreshes its position, and requests
+    for an attachment being downloaded wait for the same download.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: SignalClient,
+        directory: Path,
+        max_bytes: int = DEFAULT_ATTACHMENT_CACHE_MB * 1048576,
+        max_parallel: int = DEFAULT_MAX_PARALLEL_DOWNLOADS,
+        max_file_bytes: int = DEFAULT_MAX_RECEIVED_ATTACHMENT_MB * 1048576,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            hass: Home Assistant instance
+            client: Signal client used to download the attachments
+            directory: Directory holding the downloaded files
+            max_bytes: Maximum total size of the downloaded files
+            max_parallel: Maximum number of concurrent downloads
+            max_file_bytes: Size above which attachments are not downloaded
+        """
+        self.hass = hass
+        self.client = client
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self._semaphore = asyncio.Semaphore(max_parallel)
+        self._files: OrderedDict[str, int] = OrderedDict()
+        self._pending: dict[str, asyncio.Task[Optional[str]]] = {}
+        self._size = 0
+        self.downloads = 0
+        self.hits = 0
+        self.errors = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached files."""
+        return len(self._files)
+
+    @property
+    def size(self) -> int:
+        """Return the total size of the cached files."""
+        return self._size
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the cache statistics."""
+        return {
+            "directory": str(self.directory),
+            "files": len(self._files),
+            "size": self._size,
+            "max_size": self.max_bytes,
+            "downloads": self.downloads,
+            "hits": self.hits,
+            "errors": self.errors,
+        }
+
+    def _scan(self) -> list[tuple[str, int]]:
+        """List the cached files, oldest first."""
+        if not self.directory.is_dir():
+            return []
+        files = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                if entry.name.endswith(PART_SUFFIX):
+                    # Interrupted download
+                    os.unlink(entry.path)
+                    continue
+                stat = entry.stat()
+                files.append((stat.st_atime, entry.name, stat.st_size))
+        files.sort()
+        return [(name, size) for _, name, size in files]
+
+    async def async_load(self) -> None:
+        """Load the files downloaded before a restart."""
+        for name, size in await self.hass.async_add_executor_job(self._scan):
+            self._files[name] = size
+            self._size += size
+        await self._async_evict()
+        _LOGGER.debug(
+            "Attachment cache %s: %d files, %d bytes",
+            self.directory,
+            len(self._files),
+            self._size,
+        )
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        """Update the access time of a file.
+
+        It keeps the least recently used order across restarts, while the
+        modification time (used for ETags) is left unchanged.
+        """
+        try:
+            os.utime(path, ns=(time.time_ns(), path.stat().st_mtime_ns))
+        except FileNotFoundError:
+            pass
+
+    def _remove(self, names: list[str]) -> None:
+        """Remove evicted files."""
+        for name in names:
+            try:
+                (self.directory / name).unlink()
+            except FileNotFoundError:
+                pass
+
+    async def _async_evict(self) -> None:
+        """Evict the least recently used files above the size limit."""
+        evicted = []
+        while self._size > self.max_bytes and self._files:
+            name, size = self._files.popitem(last=False)
+            self._size -= size
+            evicted.append(name)
+        if evicted:
+            _LOGGER.debug("Evicting %d cached attachments", len(evicted))
+            await self.hass.async_add_executor_job(self._remove, evicted)
+
+    @staticmethod
+    def _open(path: Path) -> IO[bytes]:
+        """Create the directory if needed and open a file for writing."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path.open("wb")  # pylint: disable=consider-using-with
+
+    async def _async_download(self, attachment_id: str, path: Path, size: int) -> int:
+        """Stream an attachment to a file.
+
+        Chunks are written by blocks of WRITE_BLOCK_SIZE, each block from one
+        executor job.
+
+        Returns:
+            The size of the downloaded file
+
+        Raises:
+            ValueError: If the attachment is too large
+        """
+        run = self.hass.async_add_executor_job
+        part = path.with_name(path.name + PART_SUFFIX)
+        file = await run(self._open, part)
+        received = 0
+        block = bytearray()
+        try:
+            async for chunk in self.client.iter_attachment(attachment_id, size):
+                received += len(chunk)
+                if received > self.max_file_bytes:
+                    raise ValueError(
+                        f"Attachment too large (downloaded: {received} bytes). "
+                        f"Max size: {self.max_file_bytes} bytes"
+                    )
+                block += chunk
+                if len(block) >= WRITE_BLOCK_SIZE:
+                    await run(file.write, bytes(block))
+                    block.clear()
+            if block:
+                await run(file.write, bytes(block))
+        except BaseException:
+            await run(file.close)
+            await run(part.unlink)
+            raise
+        await run(file.close)
+        await run(part.replace, path)
+        return received
+
+    async def async_fetch(self, attachment: dict[str, Any]) -> Optional[str]:
+        """Download an attachment unless it is already cached.
+
+        Args:
+            attachment: Attachment of the event payload (id, size...)
+
+        Returns:
+            The local path of the attachment, or None if it was not downloaded
+        """
+        name = attachment_filename(attachment.get("id"))
+        if name is None:
+            _LOGGER.warning("Ignoring attachment with invalid ID: %s", attachment)
+            return None
+        path = self.directory / name
+
+        if name in self._files:
+            self._files.move_to_end(name)
+            self.hits += 1
+            await self.hass.async_add_executor_job(self._touch, path)
+            return str(path)
+
+        pending = self._pending.get(name)
+        if pending is None:
+            pending = self.hass.async_create_task(
+                self._async_fetch_new(name, path, attachment.get("size") or 0),
+                f"{DOMAIN} attachment {name}",
+            )
+            self._pending[name] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(name, None))
+        # A cancelled request does not cancel the download shared with others
+        return await asyncio.shield(pending)
+
+    async def _async_fetch_new(
+        self, name: str, path: Path, expected_size: int
+    ) -> Optional[str]:
+        """Download an attachment missing from the cache."""
+        if expected_size > self.max_file_bytes:
+            _LOGGER.warning(
+                "Not downloading attachment %s: %d bytes (max: %d bytes)",
+                name,
+                expected_size,
+                self.max_file_bytes,
+            )
+            return None
+
+        async with self._semaphore:
+            try:
+                size = await self._async_download(name, path, expected_size)
+            except (
+                ValueError,
+                RuntimeError,
+                OSError,
+                aiohttp.ClientError,
+                asyncio.TimeoutError,
+            ) as err:
+                self.errors += 1
+                _LOGGER.error("Failed to download attachment %s: %s", name, err)
+                return None
+
+        self.downloads += 1
+        self._files[name] = size
+        self._size += size
+        await self._async_evict()
+        _LOGGER.debug("Downloaded attachment %s (%d bytes)", name, size)
+        return str(path) if name in self._files else None
+
+    async def async_fetch_all(
+        self, attachments: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Download the attachments of a message concurrently.
+
+        Args:
+            attachments: Attachments of the event payload
+
+        Returns:
+            The attachments with their local path (None if not downloaded)
+        """
+        paths = await asyncio.gather(
+            *(self.async_fetch(attachment) for attachment in attachments)
+        )
+        return [
+            {**attachment, "path": path} for attachment, path in zip(attachments, paths)
+        ]
@@ -0,0 +1,324 @@
+"""Pre-registered attachments for Signal Gateway.
+
+Assets sent with many notifications (logos, floor plans, sound clips) are
+loaded, optionally compressed and base64 encoded once, then referenced by
+handle. Their content is kept in memory so sending them never reads files, and
+persisted across restarts as asset files next to the metadata in storage.
+"""
+
+from __future__ import annotations
+
+import base64
+import io
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version 1 stored the base64 content in the metadata, rewritten on each change
+STORAGE_VERSION = 2
+STORAGE_KEY = f"{DOMAIN}.attachments"
+# Folder of the registered asset files, in the storage folder
+ASSETS_DIRECTORY = f"{DOMAIN}_attachments"
+
+# Registered assets are kept in memory: keep them reasonably small
+CONF_MAX_REGISTERED_ATTACHMENT_BYTES = 10485760  # 10 MB
+# Compressed images are downscaled to fit in this size (in pixels)
+COMPRESS_MAX_DIMENSION = 2048
+COMPRESS_JPEG_QUALITY = 85
+
+
+def compress_image(content: bytes) -> bytes:
+    """Downscale and re-encode an image as JPEG.
+
+    Transparent areas are flattened onto a white background (JPEG has no
+    alpha channel, and converting them directly would make them black).
+
+    Args:
+        content: Raw image content
+
+    Returns:
+        Compressed image, or the original content if it is not smaller
+
+    Raises:
+        ValueError: If the content is not an image
+    """
+    # Pillow is a Home Assistant core dependency, only needed for compression
+    # pylint: disable-next=import-outside-toplevel
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image.thumbnail((COMPRESS_MAX_DIMENSION, COMPRESS_MAX_DIMENSION))
+            if image.has_transparency_data:
+                rgba = image.convert("RGBA")
+                flattened = Image.new("RGB", rgba.size, "white")
+                flattened.paste(rgba, mask=rgba.getchannel("A"))
+            else:
+                flattened = image.convert("RGB")
+            output = io.BytesIO()
+            flattened.save(
+                output, format="JPEG", quality=COMPRESS_JPEG_QUALITY, optimize=True
+            )
+    except UnidentifiedImageError as err:
+        raise ValueError("Only images can be compressed") from err
+
+    compressed = output.getvalue()
+    return compressed if len(compressed) < len(content) else content
+
+
+class RegisteredAttachment:  # pylint: disable=too-few-public-methods
+    """An attachment encoded once and referenced by handle."""
+
+    __slots__ = ("handle", "source", "size", "compressed", "base64_content")
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        handle: str,
+        source: str,
+        size: int,
+        compressed: bool,
+        base64_content: str,
+    ) -> None:
+        """Initialize the registered attachment."""
+        self.handle = handle
+        self.source = source
+        self.size = size
+        self.compressed = compressed
+        self.base64_content = base64_content
+
+    def as_dict(self, with_content: bool = False) -> dict[str, Any]:
+        """Return the attachment as a dictionary (without content by default)."""
+        data: dict[str, Any] = {
+            "handle": self.handle,
+            "source": self.source,
+            "size": self.size,
+            "compressed": self.compressed,
+            "memory_usage": len(self.base64_content),
+        }
+        if with_content:
+            data["base64_content"] = self.base64_content
+        return data
+
+
+def _write_asset(directory: Path, handle: str, content: bytes) -> None:
+    """Write the content of a registered attachment, replacing it atomically."""
+    directory.mkdir(parents=True, exist_ok=True)
+    temp_path = directory / f".{handle}.tmp"
+    temp_path.write_bytes(content)
+    os.replace(temp_path, directory / handle)
+
+
+class _AttachmentStore(Store[dict[str, Any]]):
+    """Storage of the registered attachments metadata."""
+
+    def __init__(self, hass: HomeAssistant, directory: Path) -> None:
+        super().__init__(hass, STORAGE_VERSION, STORAGE_KEY)
+        self.directory = directory
+
+    async def _async_migrate_func(
+        self, old_major_version: int, old_minor_version: int, old_data: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Move the base64 contents of version 1 to asset files."""
+
+        def _move_contents() -> None:
+            for item in old_data.get("attachments", []):
+                content = base64.b64decode(item.pop("base64_content"))
+                _write_asset(self.directory, item["handle"], content)
+
+        if old_major_version == 1:
+            await self.hass.async_add_executor_job(_move_contents)
+        return old_data
+
+
+class AttachmentRegistry:
+    """Registry of pre-encoded attachments, persisted in Home Assistant storage.
+
+    Only the metadata is saved in the storage file; the content of each
+    attachment is written once to its own file, in ASSETS_DIRECTORY.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the registry."""
+        self.hass = hass
+        self.directory = Path(hass.config.path(STORAGE_DIR, ASSETS_DIRECTORY))
+        self._store = _AttachmentStore(hass, self.directory)
+        self._attachments: dict[str, RegisteredAttachment] = {}
+
+    def _read_assets(self, items: list[dict[str, Any]]) -> dict[str, str]:
+        """Read and encode the asset files of the stored attachments.
+
+        Returns:
+            Base64 content of the attachments by handle (missing files skipped)
+        """
+        contents = {}
+        for item in items:
+            try:
+                content = (self.directory / item["handle"]).read_bytes()
+            except OSError as err:
+                _LOGGER.warning(
+                    "Cannot load registered attachment '%s': %s", item["handle"], err
+                )
+                continue
+            contents[item["handle"]] = base64.b64encode(content).decode("ascii")
+        return contents
+
+    async def async_load(self) -> None:
+        """Load the registered attachments from storage."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        items = data.get("attachments", [])
+        contents = await self.hass.async_add_executor_job(self._read_assets, items)
+        for item in items:
+            if item["handle"] not in contents:
+                continue
+            self._attachments[item["handle"]] = RegisteredAttachment(
+                handle=item["handle"],
+                source=item["source"],
+                size=item["size"],
+                compressed=item["compressed"],
+                base64_content=contents[item["handle"]],
+            )
+        _LOGGER.debug(
+            "Loaded %d registered attachments (%d bytes)",
+            len(self._attachments),
+            self.memory_usage,
+        )
+
+    async def _async_save(self) -> None:
+        await self._store.async_save(
+            {
+                "attachments": [
+                    {
+                        "handle": attachment.handle,
+                        "source": attachment.source,
+                        "size": attachment.size,
+                        "compressed": attachment.compressed,
+                    }
+                    for attachment in self._attachments.values()
+                ]
+            }
+        )
+
+    def _load_file(self, path: Path, handle: str, compress: bool) -> tuple[int, str]:
+        """Check and read a file, optionally compress it, and store its asset.
+
+        Returns:
+            Size of the (compressed) content and its base64 encoding
+
+        Raises:
+            ValueError: If the file is not valid, too large or cannot be compressed
+        """
+        if not path.is_file():
+            raise ValueError(f"Attachment file not found: {path}")
+        if not os.access(path, os.R_OK):
+            raise ValueError(f"Attachment file is not readable: {path}")
+        file_size = path.stat().st_size
+        if file_size > CONF_MAX_REGISTERED_ATTACHMENT_BYTES:
+            raise ValueError(
+                f"Attachment file {path} size ({file_size} bytes) exceeds "
+                f"maximum allowed size ({CONF_MAX_REGISTERED_ATTACHMENT_BYTES} bytes)"
+            )
+        content = path.read_bytes()
+        if compress:
+            content = compress_image(content)
+        _write_asset(self.directory, handle, content)
+        return len(content), base64.b64encode(content).decode("ascii")
+
+    async def async_register(
+        self, file_path: str, handle: str | None = None, compress: bool = False
+    ) -> RegisteredAttachment:
+        """Load, encode and register a file as an attachment.
+
+        Registering an existing handle replaces its content.
+
+        Args:
+            file_path: Path of the file to register (supports file:// URLs)
+            handle: Handle to reference the attachment (defaults to the file name)
+            compress: Whether to downscale and re-encode the image
+
+        Returns:
+            The registered attachment
+
+        Raises:
+            ValueError: If the handle or the file is not valid, the file is too
+                large or cannot be compressed
+        """
+        if file_path.startswith("file://"):
+            file_path = file_path[7:]
+        path = Path(file_path)
+        handle = handle or cv.slugify(path.stem)
+        # The handle names the asset file
+        if handle != cv.slugify(handle):
+            raise ValueError(f"Invalid attachment handle: {handle}")
+
+        size, base64_content = await self.hass.async_add_executor_job(
+            self._load_file, path, handle, compress
+        )
+        attachment = RegisteredAttachment(
+            handle=handle,
+            source=str(path),
+            size=size,
+            compressed=compress,
+            base64_content=base64_content,
+        )
+        self._attachments[attachment.handle] = attachment
+        await self._async_save()
+        _LOGGER.info(
+            "Registered attachment '%s' from %s (%d bytes)",
+            attachment.handle,
+            path,
+            size,
+        )
+        return attachment
+
+    async def async_unregister(self, handle: str) -> bool:
+        """Remove a registered attachment.
+
+        Returns:
+            True if the attachment existed
+        """
+        if self._attachments.pop(handle, None) is None:
+            return False
+        await self._async_save()
+        await self.hass.async_add_executor_job(
+            lambda: (self.directory / handle).unlink(missing_ok=True)
+        )
+        return True
+
+    def get(self, handle: str) -> str:
+        """Return the base64 content of a registered attachment.
+
+        Raises:
+            ValueError: If the handle is not registered
+        """
+        attachment = self._attachments.get(handle)
+        if attachment is None:
+            raise ValueError(f"Unknown attachment handle: {handle}")
+        return attachment.base64_content
+
+    @property
+    def memory_usage(self) -> int:
+        """Return the memory used by the encoded attachments, in bytes."""
+        return sum(
+            len(attachment.base64_content) for attachment in self._attachments.values()
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the registered attachments (without content), for diagnostics."""
+        return {
+            "memory_usage": self.memory_usage,
+            "attachments": [
+                attachment.as_dict() for attachment in self._attachments.values()
+            ],
+        }
@@ -0,0 +1,129 @@
+"""Built-in auto-responder for Signal Gateway.
+
+Simple requests ("ping", "status") are answered directly from the WebSocket
+listener, without going through the event bus and the automation engine.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+import aiohttp
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import TemplateError
+from homeassistant.helpers.template import Template
+
+from .signal import Envelope, SignalClient
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_auto_replies(rules_str: str) -> dict[str, str]:
+    """Parse auto-reply rules "trigger: reply", one per line.
+
+    Triggers are case-insensitive and matched against the whole message. The
+    reply is a template.
+
+    Raises:
+        ValueError: If a rule is malformed
+
+    Examples:
+        >>> parse_auto_replies("Ping: pong\\nstatus: {{ states('sun.sun') }}")
+        {'ping': 'pong', 'status': "{{ states('sun.sun') }}"}
+        >>> parse_auto_replies("")
+        {}
+    """
+    rules = {}
+    for line in rules_str.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        trigger, separator, reply = line.partition(":")
+        trigger = " ".join(trigger.lower().split())
+        reply = reply.strip()
+        if not separator or not trigger or not reply:
+            raise ValueError(
+                f"Invalid auto-reply rule (expected 'trigger: reply'): {line}"
+            )
+        rules[trigger] = reply
+    return rules
+
+
+class AutoResponder:  # pylint: disable=too-few-public-methods
+    """Answer messages matching a trigger with a rendered template.
+
+    The response time of each rule (from message reception to the end of the
+    send request) is recorded for diagnostics.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, client: SignalClient, rules: dict[str, str]
+    ) -> None:
+        """Initialize the auto-responder.
+
+        Args:
+            hass: Home Assistant instance
+            client: Signal client used to send the replies
+            rules: Triggers mapped to reply templates
+        """
+        self.hass = hass
+        self.client = client
+        self._templates = {
+            trigger: Template(reply, hass) for trigger, reply in rules.items()
+        }
+        self.stats: dict[str, dict[str, Any]] = {
+            trigger: {
+                "replies": 0,
+                "errors": 0,
+                "last_response_time": None,
+                "max_response_time": None,
+            }
+            for trigger in rules
+        }
+
+    def __call__(self, msg: dict[str, Any]) -> bool:
+        """Schedule a reply if the message matches a trigger.
+
+        Args:
+            msg: Received message
+
+        Returns:
+            True if a reply was scheduled
+        """
+        envelope = Envelope(msg)
+        trigger = " ".join((envelope.body or "").lower().split())
+        template = self._templates.get(trigger)
+        if template is None:
+            return False
+        self.hass.async_create_task(
+            self._async_reply(trigger, template, envelope, time.monotonic())
+        )
+        return True
+
+    async def _async_reply(
+        self, trigger: str, template: Template, envelope: Envelope, received: float
+    ) -> None:
+        """Render the reply and send it back to the sender (or group)."""
+        stats = self.stats[trigger]
+        event_data = envelope.as_event_data()
+        try:
+            reply = template.async_render(event_data, parse_result=False)
+            await self.client.send_message(event_data["reply_to"], reply)
+        except (
+            TemplateError,
+            RuntimeError,
+            aiohttp.ClientError,
+            asyncio.TimeoutError,
+        ) as err:
+            stats["errors"] += 1
+            _LOGGER.error("Failed to send auto-reply for '%s': %s", trigger, err)
+            return
+
+        response_time = round(time.monotonic() - received, 6)
+        stats["replies"] += 1
+        stats["last_response_time"] = response_time
+        stats["max_response_time"] = max(stats["max_response_time"] or 0, response_time)
+        _LOGGER.debug("Auto-reply for '%s' sent in %.3f s", trigger, response_time)
@@ -0,0 +1,47 @@
+"""Binary sensor platform for Signal Gateway."""
+
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import CONF_WEBSOCKET_ENABLED, DOMAIN
+from .entity import SignalGatewayEntity
+from .signal import SignalClient
+
+CONNECTED_DESCRIPTION = BinarySensorEntityDescription(
+    key="connected",
+    translation_key="connected",
+    device_class=BinarySensorDeviceClass.CONNECTIVITY,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the WebSocket connection binary sensor."""
+    if not entry.data.get(CONF_WEBSOCKET_ENABLED, True):
+        return
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    async_add_entities([SignalGatewayConnectedSensor(client, entry)])
+
+
+class SignalGatewayConnectedSensor(SignalGatewayEntity, BinarySensorEntity):
+    """Whether the WebSocket listener is connected."""
+
+    def __init__(self, client: SignalClient, entry: ConfigEntry) -> None:
+        """Initialize the binary sensor."""
+        super().__init__(client, entry, CONNECTED_DESCRIPTION)
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if the WebSocket is connected."""
+        return self.client.connected
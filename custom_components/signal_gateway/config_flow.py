@@ -1,20 +1,73 @@
 """Config flow for Signal Gateway integration."""
 
 import logging
+import re
+from collections.abc import Mapping
 from typing import Any
 
 import voluptuous as vol
 from homeassistant.config_entries import ConfigFlow, ConfigFlowResult, OptionsFlow
 from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
 from homeassistant.helpers import config_validation as cv
 
 from .const import (
+    CONF_API_INFO,
+    CONF_ATTACHMENT_CACHE_MB,
+    CONF_AUTO_REPLIES,
+    CONF_COMMANDS,
+    CONF_DOWNLOAD_ATTACHMENTS,
+    CONF_GROUP_ALLOWLIST,
+    CONF_GROUP_RATE_LIMIT,
+    CONF_GROUP_SAMPLING,
+    CONF_INCLUDE_ENVELOPE,
+    CONF_MAX_ATTACHMENTS_PER_MESSAGE,
+    CONF_MAX_ATTACHMENT_BATCH_MB,
+    CONF_MAX_PARALLEL_DOWNLOADS,
+    CONF_MAX_RECEIVED_ATTACHMENT_MB,
+    CONF_MESSAGE_REGEX,
+    CONF_MESSAGE_RETENTION_DAYS,
     CONF_PHONE_NUMBER,
+    CONF_RATE_LIMIT_SUMMARY,
+    CONF_RECEIVE_MODE,
+    CONF_RECEIVE_ON_DEMAND,
     CONF_RECIPIENTS,
+    CONF_SENDER_ALLOWLIST,
+    CONF_SENDER_DENYLIST,
+    CONF_SENDER_RATE_LIMIT,
     CONF_SIGNAL_CLI_REST_API_URL,
+    CONF_SPOOL_THRESHOLD_MB,
+    CONF_STARTUP_DELAY,
+    CONF_STORE_MESSAGES,
+    CONF_TIMEOUT_CEILING,
+    CONF_TIMEOUT_FLOOR,
+    CONF_WEBSOCKET_COMPRESSION,
     CONF_WEBSOCKET_ENABLED,
+    CONF_WEBSOCKET_HEARTBEAT,
+    CONF_WEBSOCKET_IDLE_TIMEOUT,
+    CONF_WEBSOCKET_MAX_MESSAGE_KB,
+    CONF_WEBSOCKET_OVERFLOW_POLICY,
+    CONF_WEBSOCKET_QUEUE_SIZE,
     DOMAIN,
+    RECEIVE_MODES,
+    RECEIVE_MODE_WEBSOCKET,
 )
+from .api_info import async_probe_api
+from .attachment_cache import (
+    DEFAULT_ATTACHMENT_CACHE_MB,
+    DEFAULT_MAX_PARALLEL_DOWNLOADS,
+    DEFAULT_MAX_RECEIVED_ATTACHMENT_MB,
+)
+from .auto_reply import parse_auto_replies
+from .notify import (
+    DEFAULT_MAX_ATTACHMENT_BATCH_MB,
+    DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE,
+    DEFAULT_SPOOL_THRESHOLD_MB,
+)
+from .signal.commands import parse_commands
+from .signal.filters import parse_group_sampling
+from .signal.timeouts import DEFAULT_TIMEOUT_CEILING, DEFAULT_TIMEOUT_FLOOR
+from .signal.websocket_listener import OVERFLOW_POLICIES, SignalWebSocketListener
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +76,22 @@ class DuplicateServiceNameError(Exception):
     """Exception raised when a duplicate service name is detected."""
 
 
+class InvalidFilterError(Exception):
+    """Exception raised when an incoming message filter is invalid."""
+
+
+class InvalidCommandError(Exception):
+    """Exception raised when a command rule is invalid."""
+
+
+class InvalidAutoReplyError(Exception):
+    """Exception raised when an auto-reply rule is invalid."""
+
+
+class InvalidTimeoutsError(Exception):
+    """Exception raised when the timeout ceiling is below the floor."""
+
+
 def validate_signal_gateway_input(
     user_input: dict[str, Any],
     existing_entries: list,
@@ -38,11 +107,41 @@ def validate_signal_gateway_input(
     Raises:
         ValueError: If the API URL is invalid
         DuplicateServiceNameError: If a duplicate service name is detected
+        InvalidFilterError: If the message regex or group sampling is invalid
+        InvalidCommandError: If a command rule is invalid
+        InvalidAutoReplyError: If an auto-reply rule or template is invalid
+        InvalidTimeoutsError: If the timeout ceiling is below the floor
     """
     api_url = user_input.get(CONF_SIGNAL_CLI_REST_API_URL)
     if not api_url or not api_url.startswith("http"):
         raise ValueError("Invalid API URL")
 
+    # Check incoming message filters
+    try:
+        re.compile(user_input.get(CONF_MESSAGE_REGEX, ""))
+        parse_group_sampling(user_input.get(CONF_GROUP_SAMPLING, ""))
+    except (re.error, ValueError) as err:
+        raise InvalidFilterError(str(err)) from err
+
+    # Check command rules
+    try:
+        parse_commands(user_input.get(CONF_COMMANDS, ""))
+    except ValueError as err:
+        raise InvalidCommandError(str(err)) from err
+
+    # Check auto-reply rules and templates
+    try:
+        for reply in parse_auto_replies(user_input.get(CONF_AUTO_REPLIES, "")).values():
+            cv.template(reply)
+    except (vol.Invalid, ValueError) as err:
+        raise InvalidAutoReplyError(str(err)) from err
+
+    # Check the bounds of the adaptive timeouts
+    if user_input.get(CONF_TIMEOUT_CEILING, DEFAULT_TIMEOUT_CEILING) < user_input.get(
+        CONF_TIMEOUT_FLOOR, DEFAULT_TIMEOUT_FLOOR
+    ):
+        raise InvalidTimeoutsError("The timeout ceiling is below the floor")
+
     # Check for duplicate service names
     integration_name = user_input.get(CONF_NAME, DOMAIN)
     service_name = cv.slugify(integration_name)
@@ -58,8 +157,35 @@ def validate_signal_gateway_input(
             )
 
 
+async def async_add_api_info(
+    hass: HomeAssistant,
+    user_input: dict[str, Any],
+    cached: Mapping[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Add the mode and version of the API to the entry data.
+
+    Args:
+        hass: Home Assistant instance
+        user_input: The validated user input
+        cached: API information probed before, kept if the API is unreachable
+
+    Returns:
+        The entry data (the user input if the API could not be queried)
+    """
+    api_info: Mapping[str, Any] | None = await async_probe_api(
+        hass,
+        user_input[CONF_SIGNAL_CLI_REST_API_URL],
+        user_input.get(CONF_PHONE_NUMBER, ""),
+    )
+    if api_info is None:
+        api_info = cached
+    if api_info is None:
+        return user_input
+    return {**user_input, CONF_API_INFO: api_info}
+
+
 def build_signal_gateway_schema(
-    defaults: dict[str, Any] | None = None,
+    defaults: Mapping[str, Any] | None = None,
 ) -> vol.Schema:
     """Build the schema for Signal Gateway configuration.
 
@@ -90,6 +216,14 @@ def build_signal_gateway_schema(
                 CONF_WEBSOCKET_ENABLED,
                 default=defaults.get(CONF_WEBSOCKET_ENABLED, True),
             ): bool,
+            vol.Optional(
+                CONF_RECEIVE_MODE,
+                default=defaults.get(CONF_RECEIVE_MODE, RECEIVE_MODE_WEBSOCKET),
+            ): vol.In(RECEIVE_MODES),
+            vol.Optional(
+                CONF_RECEIVE_ON_DEMAND,
+                default=defaults.get(CONF_RECEIVE_ON_DEMAND, False),
+            ): bool,
             vol.Optional(
                 CONF_RECIPIENTS,
                 default=defaults.get(CONF_RECIPIENTS, ""),
@@ -98,6 +232,157 @@ def build_signal_gateway_schema(
     )
 
 
+def build_filters_schema(
+    defaults: Mapping[str, Any] | None = None,
+) -> vol.Schema:
+    """Build the schema for incoming message filters and events (options only).
+
+    Args:
+        defaults: Optional dictionary with default values for the fields
+
+    Returns:
+        The voluptuous schema for the filter and event fields
+    """
+    if defaults is None:
+        defaults = {}
+
+    schema: dict[vol.Marker, Any] = {
+        vol.Optional(
+            key,
+            default=defaults.get(key, ""),
+        ): str
+        for key in (
+            CONF_SENDER_ALLOWLIST,
+            CONF_SENDER_DENYLIST,
+            CONF_GROUP_ALLOWLIST,
+            CONF_MESSAGE_REGEX,
+            CONF_GROUP_SAMPLING,
+            CONF_COMMANDS,
+            CONF_AUTO_REPLIES,
+        )
+    }
+    for key in (CONF_SENDER_RATE_LIMIT, CONF_GROUP_RATE_LIMIT, CONF_STARTUP_DELAY):
+        schema[vol.Optional(key, default=defaults.get(key, 0))] = vol.All(
+            vol.Coerce(int), vol.Range(min=0)
+        )
+    for key in (
+        CONF_RATE_LIMIT_SUMMARY,
+        CONF_INCLUDE_ENVELOPE,
+        CONF_DOWNLOAD_ATTACHMENTS,
+        CONF_STORE_MESSAGES,
+    ):
+        schema[vol.Optional(key, default=defaults.get(key, False))] = bool
+    schema[
+        vol.Optional(
+            CONF_MESSAGE_RETENTION_DAYS,
+            default=defaults.get(CONF_MESSAGE_RETENTION_DAYS, 30),
+        )
+    ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+    return vol.Schema(schema)
+
+
+def build_tuning_schema(
+    defaults: Mapping[str, Any] | None = None,
+) -> vol.Schema:
+    """Build the schema for the transport and attachment tuning fields (options only).
+
+    Durations are in seconds, 0 disabling the heartbeat or the idle watchdog.
+
+    Args:
+        defaults: Optional dictionary with default values for the fields
+
+    Returns:
+        The voluptuous schema for the tuning fields
+    """
+    if defaults is None:
+        defaults = {}
+
+    listener = SignalWebSocketListener
+    return vol.Schema(
+        {
+            vol.Optional(
+                CONF_WEBSOCKET_HEARTBEAT,
+                default=defaults.get(
+                    CONF_WEBSOCKET_HEARTBEAT, int(listener.heartbeat or 0)
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_WEBSOCKET_IDLE_TIMEOUT,
+                default=defaults.get(
+                    CONF_WEBSOCKET_IDLE_TIMEOUT, int(listener.idle_timeout or 0)
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_WEBSOCKET_COMPRESSION,
+                default=defaults.get(CONF_WEBSOCKET_COMPRESSION, False),
+            ): bool,
+            vol.Optional(
+                CONF_WEBSOCKET_MAX_MESSAGE_KB,
+                default=defaults.get(
+                    CONF_WEBSOCKET_MAX_MESSAGE_KB, listener.max_msg_size // 1024
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=64)),
+            vol.Optional(
+                CONF_WEBSOCKET_QUEUE_SIZE,
+                default=defaults.get(CONF_WEBSOCKET_QUEUE_SIZE, listener.queue_size),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(
+                CONF_WEBSOCKET_OVERFLOW_POLICY,
+                default=defaults.get(
+                    CONF_WEBSOCKET_OVERFLOW_POLICY, listener.overflow_policy
+                ),
+            ): vol.In(OVERFLOW_POLICIES),
+            vol.Optional(
+                CONF_MAX_ATTACHMENTS_PER_MESSAGE,
+                default=defaults.get(
+                    CONF_MAX_ATTACHMENTS_PER_MESSAGE,
+                    DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE,
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(
+                CONF_MAX_ATTACHMENT_BATCH_MB,
+                default=defaults.get(
+                    CONF_MAX_ATTACHMENT_BATCH_MB, DEFAULT_MAX_ATTACHMENT_BATCH_MB
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(
+                CONF_SPOOL_THRESHOLD_MB,
+                default=defaults.get(
+                    CONF_SPOOL_THRESHOLD_MB, DEFAULT_SPOOL_THRESHOLD_MB
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+            vol.Optional(
+                CONF_ATTACHMENT_CACHE_MB,
+                default=defaults.get(
+                    CONF_ATTACHMENT_CACHE_MB, DEFAULT_ATTACHMENT_CACHE_MB
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(
+                CONF_MAX_RECEIVED_ATTACHMENT_MB,
+                default=defaults.get(
+                    CONF_MAX_RECEIVED_ATTACHMENT_MB, DEFAULT_MAX_RECEIVED_ATTACHMENT_MB
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(
+                CONF_MAX_PARALLEL_DOWNLOADS,
+                default=defaults.get(
+                    CONF_MAX_PARALLEL_DOWNLOADS, DEFAULT_MAX_PARALLEL_DOWNLOADS
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=16)),
+            vol.Optional(
+                CONF_TIMEOUT_FLOOR,
+                default=defaults.get(CONF_TIMEOUT_FLOOR, int(DEFAULT_TIMEOUT_FLOOR)),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+            vol.Optional(
+                CONF_TIMEOUT_CEILING,
+                default=defaults.get(
+                    CONF_TIMEOUT_CEILING, int(DEFAULT_TIMEOUT_CEILING)
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        }
+    )
+
+
 class SignalGatewayConfigFlow(
     ConfigFlow, domain=DOMAIN
 ):  # pylint: disable=abstract-method
@@ -132,7 +417,7 @@ class SignalGatewayConfigFlow(
             else:
                 return self.async_create_entry(
                     title=user_input.get(CONF_NAME, "Signal Gateway"),
-                    data=user_input,
+                    data=await async_add_api_info(self.hass, user_input),
                 )
 
         # Build schema with defaults from user_input if available (to preserve data on errors)
@@ -170,13 +455,30 @@ class SignalGatewayOptionsFlow(OptionsFlow):
                 _LOGGER.error("Error validating input: %s", err)
             except DuplicateServiceNameError:
                 errors["base"] = "duplicate_service_name"
+            except InvalidFilterError as err:
+                errors["base"] = "invalid_filter"
+                _LOGGER.error("Invalid message filter: %s", err)
+            except InvalidCommandError as err:
+                errors["base"] = "invalid_commands"
+                _LOGGER.error("Invalid command rule: %s", err)
+            except InvalidAutoReplyError as err:
+                errors["base"] = "invalid_auto_replies"
+                _LOGGER.error("Invalid auto-reply rule: %s", err)
+            except InvalidTimeoutsError as err:
+                errors["base"] = "invalid_timeouts"
+                _LOGGER.error("Invalid timeouts: %s", err)
             except Exception as err:  # pylint: disable=broad-except
                 errors["base"] = "unknown"
                 _LOGGER.error("Unknown error: %s", err)
             else:
                 # Update the config entry with new data
                 self.hass.config_entries.async_update_entry(
-                    self._config_entry, data=user_input
+                    self._config_entry,
+                    data=await async_add_api_info(
+                        self.hass,
+                        user_input,
+                        self._config_entry.data.get(CONF_API_INFO),
+                    ),
                 )
                 return self.async_create_entry(title="", data={})
 
@@ -185,6 +487,8 @@ class SignalGatewayOptionsFlow(OptionsFlow):
 
         return self.async_show_form(
             step_id="init",
-            data_schema=build_signal_gateway_schema(defaults),
+            data_schema=build_signal_gateway_schema(defaults)
+            .extend(build_filters_schema(defaults).schema)
+            .extend(build_tuning_schema(defaults).schema),
             errors=errors,
         )
@@ -4,13 +4,75 @@ from typing import Final
 
 DOMAIN: Final = "signal_gateway"
 SERVICE_NOTIFY: Final = "send_message"
+SERVICE_REGISTER_ATTACHMENT: Final = "register_attachment"
+SERVICE_UNREGISTER_ATTACHMENT: Final = "unregister_attachment"
+SERVICE_RECONNECT: Final = "reconnect"
+SERVICE_SEARCH_MESSAGES: Final = "search_messages"
 EVENT_SIGNAL_RECEIVED: Final = "signal_received"
+EVENT_SIGNAL_COMMAND: Final = f"{DOMAIN}_command"
+EVENT_SIGNAL_ATTACHMENTS: Final = f"{DOMAIN}_attachments_downloaded"
+EVENT_SIGNAL_RATE_LIMITED: Final = f"{DOMAIN}_rate_limited"
 
 CONF_SIGNAL_CLI_REST_API_URL: Final = "signal_cli_rest_api_url"
 CONF_PHONE_NUMBER: Final = "phone_number"
 CONF_WEBSOCKET_ENABLED: Final = "websocket_enabled"
+CONF_RECEIVE_MODE: Final = "receive_mode"
+CONF_RECEIVE_ON_DEMAND: Final = "receive_on_demand"
+CONF_STARTUP_DELAY: Final = "startup_delay"
 CONF_RECIPIENTS: Final = "recipients"
+CONF_SENDER_ALLOWLIST: Final = "sender_allowlist"
+CONF_SENDER_DENYLIST: Final = "sender_denylist"
+CONF_GROUP_ALLOWLIST: Final = "group_allowlist"
+CONF_MESSAGE_REGEX: Final = "message_regex"
+CONF_GROUP_SAMPLING: Final = "group_sampling"
+CONF_INCLUDE_ENVELOPE: Final = "include_envelope"
+CONF_DOWNLOAD_ATTACHMENTS: Final = "download_attachments"
+CONF_SENDER_RATE_LIMIT: Final = "sender_rate_limit"
+CONF_GROUP_RATE_LIMIT: Final = "group_rate_limit"
+CONF_RATE_LIMIT_SUMMARY: Final = "rate_limit_summary"
+CONF_STORE_MESSAGES: Final = "store_messages"
+CONF_MESSAGE_RETENTION_DAYS: Final = "message_retention_days"
+CONF_COMMANDS: Final = "commands"
+CONF_AUTO_REPLIES: Final = "auto_replies"
+# Transport tuning (options only)
+CONF_WEBSOCKET_HEARTBEAT: Final = "websocket_heartbeat"
+CONF_WEBSOCKET_IDLE_TIMEOUT: Final = "websocket_idle_timeout"
+CONF_WEBSOCKET_COMPRESSION: Final = "websocket_compression"
+CONF_WEBSOCKET_MAX_MESSAGE_KB: Final = "websocket_max_message_kb"
+CONF_WEBSOCKET_QUEUE_SIZE: Final = "websocket_queue_size"
+CONF_WEBSOCKET_OVERFLOW_POLICY: Final = "websocket_overflow_policy"
+CONF_MAX_ATTACHMENTS_PER_MESSAGE: Final = "max_attachments_per_message"
+CONF_MAX_ATTACHMENT_BATCH_MB: Final = "max_attachment_batch_mb"
+CONF_SPOOL_THRESHOLD_MB: Final = "spool_threshold_mb"
+CONF_ATTACHMENT_CACHE_MB: Final = "attachment_cache_mb"
+CONF_MAX_RECEIVED_ATTACHMENT_MB: Final = "max_received_attachment_mb"
+CONF_MAX_PARALLEL_DOWNLOADS: Final = "max_parallel_downloads"
+CONF_TIMEOUT_FLOOR: Final = "timeout_floor"
+CONF_TIMEOUT_CEILING: Final = "timeout_ceiling"
+# Mode and version of the API, probed when the entry is saved (not a form field)
+CONF_API_INFO: Final = "api_info"
 
 ATTR_TARGET: Final = "target"
 ATTR_MESSAGE: Final = "message"
 ATTR_ATTACHMENTS: Final = "attachments"
+ATTR_ATTACHMENT_HANDLES: Final = "attachment_handles"
+ATTR_PATH: Final = "path"
+ATTR_HANDLE: Final = "handle"
+ATTR_COMPRESS: Final = "compress"
+ATTR_CONFIG_ENTRY_ID: Final = "config_entry_id"
+ATTR_QUERY: Final = "query"
+ATTR_SENDER: Final = "sender"
+ATTR_GROUP_ID: Final = "group_id"
+ATTR_SINCE: Final = "since"
+ATTR_UNTIL: Final = "until"
+ATTR_LIMIT: Final = "limit"
+
+# Keys of integration-wide objects in hass.data (hass.data[DOMAIN] holds entries)
+DATA_ATTACHMENT_REGISTRY: Final = f"{DOMAIN}_attachment_registry"
+# Envelopes already received by each entry, kept across reloads
+DATA_DEDUP_INDEXES: Final = f"{DOMAIN}_dedup_indexes"
+
+# Transports receiving messages (json-rpc mode: WebSocket, normal/native: polling)
+RECEIVE_MODE_WEBSOCKET: Final = "websocket"
+RECEIVE_MODE_POLLING: Final = "polling"
+RECEIVE_MODES: Final = [RECEIVE_MODE_WEBSOCKET, RECEIVE_MODE_POLLING]
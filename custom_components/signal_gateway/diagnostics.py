@@ -0,0 +1,65 @@
+"""Diagnostics support for Signal Gateway."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    CONF_GROUP_ALLOWLIST,
+    CONF_PHONE_NUMBER,
+    CONF_RECIPIENTS,
+    CONF_SENDER_ALLOWLIST,
+    CONF_SENDER_DENYLIST,
+    DATA_ATTACHMENT_REGISTRY,
+    DOMAIN,
+)
+
+TO_REDACT = {
+    CONF_PHONE_NUMBER,
+    CONF_RECIPIENTS,
+    CONF_SENDER_ALLOWLIST,
+    CONF_SENDER_DENYLIST,
+    CONF_GROUP_ALLOWLIST,
+}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data = hass.data.get(DOMAIN, {}).get(entry.entry_id, {})
+    client = data.get("client")
+    notify_service = data.get("notify_service")
+    message_filter = data.get("message_filter")
+    auto_responder = data.get("auto_responder")
+    rate_limiter = data.get("rate_limiter")
+    message_store = data.get("message_store")
+    on_demand = data.get("on_demand")
+    attachment_cache = data.get("attachment_cache")
+    attachment_registry = hass.data.get(DATA_ATTACHMENT_REGISTRY)
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "listener": client.listener_stats if client else {},
+        "filter_rejections": message_filter.rejected if message_filter else {},
+        "auto_replies": auto_responder.stats if auto_responder else {},
+        "rate_limited": rate_limiter.stats if rate_limiter else {},
+        "message_store": message_store.stats if message_store else {},
+        "on_demand": on_demand.stats if on_demand else {},
+        "timeouts": {
+            "api": client.timeout_estimates if client else {},
+            "downloads": (
+                notify_service.download_timeouts.estimates() if notify_service else {}
+            ),
+        },
+        "registered_attachments": (
+            attachment_registry.as_dict() if attachment_registry else {}
+        ),
+        "received_attachments": (
+            attachment_cache.stats if attachment_cache is not None else {}
+        ),
+    }
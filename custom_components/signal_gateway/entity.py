@@ -0,0 +1,45 @@
+"""Base entity for Signal Gateway."""
+
+from __future__ import annotations
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
+from homeassistant.helpers.entity import Entity, EntityDescription
+
+from .const import DOMAIN
+from .signal import SignalClient
+
+
+class SignalGatewayEntity(Entity):
+    """Entity updated by the WebSocket listener state changes (no polling)."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+
+    def __init__(
+        self,
+        client: SignalClient,
+        entry: ConfigEntry,
+        description: EntityDescription,
+    ) -> None:
+        """Initialize the entity.
+
+        Args:
+            client: Signal client of the config entry
+            entry: Config entry
+            description: Entity description
+        """
+        self.client = client
+        self.entity_description = description
+        self._attr_unique_id = f"{entry.entry_id}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=entry.title,
+            manufacturer="Signal",
+            model="signal-cli-rest-api",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """Write the state whenever the listener state changes."""
+        self.async_on_remove(self.client.add_state_listener(self.async_write_ha_state))
@@ -0,0 +1,347 @@
+"""Local SQLite store of the messages received by Signal Gateway.
+
+Received messages are buffered and written in batched transactions, in the
+executor. The database is indexed on sender, group and timestamp, with a
+full-text index on the message body. Old messages are pruned by small chunks
+so that writes and searches are never blocked for long.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+# Buffered messages are written when the batch is full or after the delay
+BATCH_SIZE = 100
+BATCH_DELAY = 1.0  # seconds
+# Messages deleted per transaction when pruning
+PRUNE_CHUNK_SIZE = 500
+# Maximum number of search results
+MAX_SEARCH_RESULTS = 500
+
+COLUMNS = (
+    "timestamp",
+    "sender",
+    "sender_uuid",
+    "sender_name",
+    "group_id",
+    "reply_to",
+    "message",
+    "attachments",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    sender TEXT,
+    sender_uuid TEXT,
+    sender_name TEXT,
+    group_id TEXT,
+    reply_to TEXT,
+    message TEXT,
+    attachments INTEGER NOT NULL DEFAULT 0
+);
+CREATE UNIQUE INDEX IF NOT EXISTS messages_sender ON messages (sender, timestamp);
+CREATE INDEX IF NOT EXISTS messages_group ON messages (group_id, timestamp);
+CREATE INDEX IF NOT EXISTS messages_timestamp ON messages (timestamp);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    message, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, message)
+    VALUES ('delete', old.id, old.message);
+END;
+"""
+
+
+def fts_query(text: str) -> str:
+    """Build a full-text query matching all the words of a text.
+
+    Each word is quoted, so FTS5 operators in the text are matched literally.
+
+    Examples:
+        >>> fts_query('door open')
+        '"door" "open"'
+        >>> fts_query("door OR open*")
+        '"door" "OR" "open*"'
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class MessageStore:  # pylint: disable=too-many-instance-attributes
+    """Store received messages in a SQLite database and search them.
+
+    The connection is only used from executor jobs, one at a time (serialized
+    by an asyncio lock).
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: Path, retention_days: int = 0
+    ) -> None:
+        """Initialize the store.
+
+        Args:
+            hass: Home Assistant instance
+            path: Path of the database file
+            retention_days: Messages older than this are pruned (0: keep all)
+        """
+        self.hass = hass
+        self.path = path
+        self.retention_days = retention_days
+        self._connection: Optional[sqlite3.Connection] = None
+        self._fts = False
+        self._lock = asyncio.Lock()
+        self._buffer: list[tuple[Any, ...]] = []
+        self._flush_timer: Optional[CALLBACK_TYPE] = None
+        # Tasks running async_prune, waited for before the database is closed
+        self._prune_tasks: set[asyncio.Task[Any]] = set()
+        self._closing = False
+        self.stored = 0
+        self.pruned = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the store statistics."""
+        return {
+            "path": str(self.path),
+            "full_text_search": self._fts,
+            "stored": self.stored,
+            "pruned": self.pruned,
+            "pending": len(self._buffer),
+            "retention_days": self.retention_days,
+        }
+
+    async def _async_run(self, target: Callable[..., _T], *args: Any) -> _T:
+        """Run a database operation in the executor."""
+        async with self._lock:
+            return await self.hass.async_add_executor_job(target, *args)
+
+    def _open(self) -> None:
+        """Open the database and create the schema."""
+        connection = sqlite3.connect(self.path, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.executescript(SCHEMA)
+        try:
+            connection.executescript(FTS_SCHEMA)
+            self._fts = True
+        except sqlite3.OperationalError as err:
+            _LOGGER.warning(
+                "SQLite full-text search unavailable, searching with LIKE: %s", err
+            )
+        connection.commit()
+        self._connection = connection
+
+    async def async_open(self) -> None:
+        """Open the database."""
+        await self._async_run(self._open)
+        self._closing = False
+        _LOGGER.debug("Message store opened: %s", self.path)
+
+    def _close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    async def async_close(self) -> None:
+        """Write the buffered messages and close the database.
+
+        A running pruning stops after its current chunk and is waited for: it
+        is not cancelled, which would release the lock while its executor job
+        still uses the connection.
+        """
+        self._closing = True
+        if self._prune_tasks:
+            await asyncio.wait(self._prune_tasks)
+        await self.async_flush()
+        await self._async_run(self._close)
+
+    @callback
+    def async_add(self, event_data: dict[str, Any]) -> None:
+        """Buffer a received message (event payload) for the next batch."""
+        self._buffer.append(
+            (
+                event_data["timestamp"] or int(time.time() * 1000),
+                event_data["sender"],
+                event_data["sender_uuid"],
+                event_data["sender_name"],
+                event_data["group_id"],
+                event_data["reply_to"],
+                event_data["message"],
+                len(event_data["attachments"]),
+            )
+        )
+        if len(self._buffer) >= BATCH_SIZE:
+            self._schedule_flush(0)
+        elif self._flush_timer is None:
+            self._schedule_flush(BATCH_DELAY)
+
+    @callback
+    def _schedule_flush(self, delay: float) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer()
+
+        @callback
+        def _flush() -> None:
+            self._flush_timer = None
+            self.hass.async_create_task(
+                self.async_flush(), f"{DOMAIN} message store flush"
+            )
+
+        if delay:
+            self._flush_timer = self.hass.loop.call_later(delay, _flush).cancel
+        else:
+            self._flush_timer = None
+            _flush()
+
+    def _insert(self, rows: list[tuple[Any, ...]]) -> int:
+        assert self._connection is not None
+        with self._connection:
+            cursor = self._connection.executemany(
+                f"INSERT OR IGNORE INTO messages ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                rows,
+            )
+        return cursor.rowcount
+
+    async def async_flush(self) -> None:
+        """Write the buffered messages in a single transaction."""
+        if self._flush_timer is not None:
+            self._flush_timer()
+            self._flush_timer = None
+        if not self._buffer or self._connection is None:
+            return
+        rows, self._buffer = self._buffer, []
+        try:
+            self.stored += await self._async_run(self._insert, rows)
+        except sqlite3.Error as err:
+            _LOGGER.error("Failed to store %d Signal messages: %s", len(rows), err)
+
+    def _prune_chunk(self, before: int) -> int:
+        if self._connection is None:
+            return 0
+        with self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM messages WHERE id IN (SELECT id FROM messages "
+                "WHERE timestamp < ? ORDER BY timestamp LIMIT ?)",
+                (before, PRUNE_CHUNK_SIZE),
+            )
+        return cursor.rowcount
+
+    async def async_prune(self) -> int:
+        """Delete the messages older than the retention, chunk by chunk.
+
+        Each chunk is a separate transaction: buffered messages and searches
+        are processed between chunks. Pruning stops when the store is closed.
+
+        Returns:
+            The number of deleted messages
+        """
+        if not self.retention_days or self._connection is None or self._closing:
+            return 0
+        before = int((time.time() - self.retention_days * 86400) * 1000)
+        deleted = 0
+        task = asyncio.current_task()
+        if task is not None:
+            self._prune_tasks.add(task)
+        try:
+            while not self._closing:
+                try:
+                    count = await self._async_run(self._prune_chunk, before)
+                except sqlite3.Error as err:
+                    _LOGGER.error("Failed to prune stored Signal messages: %s", err)
+                    break
+                deleted += count
+                if count < PRUNE_CHUNK_SIZE:
+                    break
+        finally:
+            if task is not None:
+                self._prune_tasks.discard(task)
+        self.pruned += deleted
+        if deleted:
+            _LOGGER.debug("Pruned %d stored Signal messages", deleted)
+        return deleted
+
+    def _search(self, sql: str, params: list[Any]) -> list[dict[str, Any]]:
+        assert self._connection is not None
+        return [dict(row) for row in self._connection.execute(sql, params)]
+
+    # pylint: disable-next=too-many-arguments
+    async def async_search(
+        self,
+        *,
+        query: Optional[str] = None,
+        sender: Optional[str] = None,
+        group_id: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        limit: int = 20,
+    ) -> list[dict[str, Any]]:
+        """Search the stored messages, most recent first.
+
+        Args:
+            query: Words the message must contain (all of them)
+            sender: Phone number or UUID of the sender
+            group_id: Internal ID of the group
+            since: Minimum timestamp (milliseconds since epoch)
+            until: Maximum timestamp (milliseconds since epoch)
+            limit: Maximum number of results
+
+        Returns:
+            The matching messages
+        """
+        if self._connection is None:
+            return []
+        # Messages received just before the search are included
+        await self.async_flush()
+
+        conditions = []
+        params: list[Any] = []
+        if query and query.strip():
+            if self._fts:
+                conditions.append(
+                    "id IN (SELECT rowid FROM messages_fts WHERE messages_fts MATCH ?)"
+                )
+                params.append(fts_query(query))
+            else:
+                for word in query.split():
+                    conditions.append("message LIKE ?")
+                    params.append(f"%{word}%")
+        if sender:
+            conditions.append("(sender = ? OR sender_uuid = ?)")
+            params.extend((sender, sender))
+        if group_id:
+            conditions.append("group_id = ?")
+            params.append(group_id)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("timestamp <= ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(min(limit, MAX_SEARCH_RESULTS))
+        sql = (
+            f"SELECT {', '.join(COLUMNS)} FROM messages {where} "
+            "ORDER BY timestamp DESC LIMIT ?"
+        )
+        return await self._async_run(self._search, sql, params)
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import contextlib
 import logging
 import os
+import tempfile
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import IO, Any, Optional, Union
+from urllib.parse import urlsplit
 
 import aiohttp
 import voluptuous as vol
@@ -21,8 +27,19 @@ from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.service import async_set_service_schema
 
-from .const import DOMAIN
-from .signal import SignalClient
+from .attachments import AttachmentRegistry
+from .const import (
+    ATTR_ATTACHMENT_HANDLES,
+    CONF_MAX_ATTACHMENT_BATCH_MB,
+    CONF_MAX_ATTACHMENTS_PER_MESSAGE,
+    CONF_SPOOL_THRESHOLD_MB,
+    CONF_TIMEOUT_CEILING,
+    CONF_TIMEOUT_FLOOR,
+    DATA_ATTACHMENT_REGISTRY,
+    DOMAIN,
+)
+from .signal import AdaptiveTimeout, SignalClient
+from .signal.timeouts import DEFAULT_TIMEOUT_CEILING, DEFAULT_TIMEOUT_FLOOR
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -30,6 +47,19 @@ SERVICE_SEND_MESSAGE = "send_message"
 
 # Attachment constraints
 CONF_MAX_ALLOWED_DOWNLOAD_SIZE_BYTES = 52428800  # 50 MB
+# Downloads larger than this are spooled to a temporary file instead of RAM
+DEFAULT_SPOOL_THRESHOLD_MB = 5
+# Attachments are split into several messages above these limits (by default)
+DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE = 32
+DEFAULT_MAX_ATTACHMENT_BATCH_MB = 30  # Of base64 data
+# Signal clients hide the typing indicator after ~15 seconds: refresh it before
+TYPING_INDICATOR_REFRESH_SECONDS = 10
+# Block size used to base64 encode from files (must be a multiple of 3)
+ENCODE_BLOCK_SIZE = 3 * 65536
+# Chunk size of URL downloads
+DOWNLOAD_CHUNK_SIZE = 65536
+# Downloaded chunks are buffered and written to the spool by blocks of this size
+SPOOL_WRITE_BLOCK_SIZE = 1048576
 ATTR_FILENAMES = "attachments"
 ATTR_URLS = "urls"
 ATTR_VERIFY_SSL = "verify_ssl"
@@ -54,7 +84,28 @@ async def async_setup_entry(
     default_recipients = hass.data[DOMAIN][entry.entry_id].get("default_recipients", [])
 
     # Create the notification service
-    service = SignalGatewayNotificationService(hass, client, default_recipients)
+    service = SignalGatewayNotificationService(
+        hass,
+        client,
+        default_recipients,
+        spool_threshold=entry.data.get(
+            CONF_SPOOL_THRESHOLD_MB, DEFAULT_SPOOL_THRESHOLD_MB
+        )
+        * 1048576,
+        max_attachments_per_message=entry.data.get(
+            CONF_MAX_ATTACHMENTS_PER_MESSAGE, DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE
+        ),
+        max_attachment_batch_bytes=entry.data.get(
+            CONF_MAX_ATTACHMENT_BATCH_MB, DEFAULT_MAX_ATTACHMENT_BATCH_MB
+        )
+        * 1048576,
+        download_timeouts=AdaptiveTimeout(
+            entry.data.get(CONF_TIMEOUT_FLOOR, DEFAULT_TIMEOUT_FLOOR),
+            entry.data.get(CONF_TIMEOUT_CEILING, DEFAULT_TIMEOUT_CEILING),
+        ),
+        attachment_registry=hass.data.get(DATA_ATTACHMENT_REGISTRY),
+    )
+    hass.data[DOMAIN][entry.entry_id]["notify_service"] = service
 
     # Register the Home Assistant service
     async def handle_send_message(call):
@@ -72,6 +123,7 @@ async def async_setup_entry(
             target=call.data.get("target"),
             attachments=data_params.get("attachments"),
             urls=data_params.get("urls"),
+            attachment_handles=data_params.get(ATTR_ATTACHMENT_HANDLES),
             verify_ssl=data_params.get("verify_ssl", True),
             text_mode=data_params.get("text_mode", "normal"),
         )
@@ -97,6 +149,7 @@ async def async_setup_entry(
                     {
                         vol.Optional("attachments"): [cv.string],
                         vol.Optional("urls"): [cv.string],
+                        vol.Optional(ATTR_ATTACHMENT_HANDLES): [cv.string],
                         vol.Optional("verify_ssl"): cv.boolean,
                         vol.Optional("text_mode"): vol.In(["normal", "styled"]),
                     }
@@ -157,6 +210,14 @@ async def async_setup_entry(
                                     "description": "List of URLs to download and attach",
                                     "example": ["https://example.com/image.jpg"],
                                 },
+                                ATTR_ATTACHMENT_HANDLES: {
+                                    "name": "Attachment handles",
+                                    "description": (
+                                        "List of attachments registered with "
+                                        "signal_gateway.register_attachment"
+                                    ),
+                                    "example": ["logo"],
+                                },
                                 "verify_ssl": {
                                     "name": "Verify SSL",
                                     "description": "Verify SSL certificates (default: true)",
@@ -198,16 +259,41 @@ async def async_unload_notify_service(hass: HomeAssistant, entry: ConfigEntry) -
     return True
 
 
-class SignalGatewayNotificationService(BaseNotificationService):
+class SignalGatewayNotificationService(
+    BaseNotificationService
+):  # pylint: disable=too-many-instance-attributes
     """Signal Gateway notification service for Home Assistant."""
 
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
     def __init__(
-        self, hass: HomeAssistant, client: SignalClient, default_recipients: list[str]
+        self,
+        hass: HomeAssistant,
+        client: SignalClient,
+        default_recipients: list[str],
+        spool_threshold: int = DEFAULT_SPOOL_THRESHOLD_MB * 1048576,
+        max_attachments_per_message: int = DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE,
+        max_attachment_batch_bytes: int = DEFAULT_MAX_ATTACHMENT_BATCH_MB * 1048576,
+        typing_indicator: bool = True,
+        download_timeouts: Optional[AdaptiveTimeout] = None,
+        attachment_registry: Optional[AttachmentRegistry] = None,
     ) -> None:
         """Initialize the notification service."""
         self.hass = hass
         self._client: SignalClient = client
         self._default_recipients: list[str] = default_recipients
+        self._spool_threshold: int = spool_threshold
+        self._max_attachments_per_message: int = max_attachments_per_message
+        self._max_attachment_batch_bytes: int = max_attachment_batch_bytes
+        self._typing_indicator: bool = typing_indicator
+        self._attachment_registry = attachment_registry
+        # Keep references to background tasks so they are not garbage collected
+        self._typing_tasks: set[asyncio.Task[None]] = set()
+        # Learned per-host download performance, used to size download timeouts
+        self.download_timeouts = download_timeouts or AdaptiveTimeout()
+
+    def set_default_recipients(self, recipients: list[str]) -> None:
+        """Set the recipients used when a message has no target."""
+        self._default_recipients = recipients
 
     def send_message(self, message, **kwargs):
         raise NotImplementedError("Use async_send_message instead")
@@ -279,6 +365,36 @@ class SignalGatewayNotificationService(BaseNotificationService):
 
         return path
 
+    @staticmethod
+    def _encode_stream_to_base64(stream: IO[bytes]) -> str:
+        """Encode a binary stream as base64, reading it block by block.
+
+        The whole content is never held as raw bytes at once: each block is
+        encoded separately, which is valid because the block size is a
+        multiple of 3 (no padding is emitted until the last block).
+
+        The encoded content is still built in memory, since it is sent in the
+        JSON body of /v2/send: an attachment peaks at about 8/3 of its size
+        while the encoded blocks are joined.
+
+        Args:
+            stream: Binary file-like object to read from its current position
+
+        Returns:
+            Base64 encoded stream contents
+
+        Examples:
+            >>> import io
+            >>> SignalGatewayNotificationService._encode_stream_to_base64(
+            ...     io.BytesIO(b"hello")
+            ... )
+            'aGVsbG8='
+        """
+        parts = []
+        while block := stream.read(ENCODE_BLOCK_SIZE):
+            parts.append(base64.b64encode(block).decode("ascii"))
+        return "".join(parts)
+
     def _encode_file_to_base64(self, path: Path) -> str:
         """Read a file and encode it as base64.
 
@@ -292,36 +408,15 @@ class SignalGatewayNotificationService(BaseNotificationService):
             OSError: If the file cannot be read
         """
         with open(path, "rb") as f:
-            file_content = f.read()
-            base64_content = str(base64.b64encode(file_content), encoding="utf-8")
+            base64_content = self._encode_stream_to_base64(f)
             _LOGGER.debug(
                 "Encoded attachment %s (%d bytes, %d base64 chars)",
                 path.name,
-                len(file_content),
+                f.tell(),
                 len(base64_content),
             )
             return base64_content
 
-    def _encode_attachments_from_paths(self, file_paths: list[str]) -> list[str]:
-        """Validate file paths and encode them as base64.
-
-        Args:
-            file_paths: List of file paths to encode
-
-        Returns:
-            List of base64 encoded file contents
-
-        Raises:
-            ValueError: If a file doesn't exist or isn't readable
-        """
-        base64_attachments = []
-        for file_path in file_paths:
-            path = self._normalize_file_path(file_path)
-            base64_content = self._encode_file_to_base64(path)
-            base64_attachments.append(base64_content)
-
-        return base64_attachments
-
     def _validate_content_length(
         self, content_length: Optional[str], max_size: int
     ) -> None:
@@ -344,30 +439,64 @@ class SignalGatewayNotificationService(BaseNotificationService):
 
     async def _download_in_chunks(
         self, response: aiohttp.ClientResponse, max_size: int
-    ) -> bytes:
+    ) -> IO[bytes]:
         """Download response content in chunks with size validation.
 
+        Content is kept in memory up to the spool threshold, then transparently
+        moved to a temporary file on disk. Chunks are written by blocks of
+        SPOOL_WRITE_BLOCK_SIZE, each block from one executor job.
+
         Args:
             response: aiohttp response to download from
             max_size: Maximum allowed download size in bytes
 
         Returns:
-            Downloaded content as bytes
+            Temporary file holding the downloaded content, rewound to its start.
+            The caller is responsible for closing it.
 
         Raises:
             ValueError: If downloaded size exceeds max size
         """
+        run = self.hass.async_add_executor_job
         size = 0
-        chunks = bytearray()
-        async for chunk in response.content.iter_chunked(1024):
-            size += len(chunk)
-            if size > max_size:
-                raise ValueError(
-                    f"Attachment too large (downloaded: {size} bytes). "
-                    f"Max size: {max_size} bytes"
-                )
-            chunks.extend(chunk)
-        return bytes(chunks)
+        block = bytearray()
+        spool = tempfile.SpooledTemporaryFile(  # pylint: disable=consider-using-with
+            max_size=self._spool_threshold
+        )
+        try:
+            async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_size:
+                    raise ValueError(
+                        f"Attachment too large (downloaded: {size} bytes). "
+                        f"Max size: {max_size} bytes"
+                    )
+                block += chunk
+                if len(block) >= SPOOL_WRITE_BLOCK_SIZE:
+                    await run(spool.write, bytes(block))
+                    block.clear()
+            if block:
+                await run(spool.write, bytes(block))
+            await run(spool.seek, 0)
+        except BaseException:
+            await run(spool.close)
+            raise
+        return spool
+
+    @classmethod
+    def _encode_spool(cls, spool: IO[bytes]) -> tuple[int, str]:
+        """Encode a downloaded file as base64, then close it.
+
+        Args:
+            spool: Temporary file returned by _download_in_chunks
+
+        Returns:
+            Size of the file in bytes and its base64 encoded contents
+        """
+        with spool:
+            size = spool.seek(0, os.SEEK_END)
+            spool.seek(0)
+            return size, cls._encode_stream_to_base64(spool)
 
     async def _download_and_encode_url(
         self, session: aiohttp.ClientSession, url: str, max_size: int
@@ -386,56 +515,49 @@ class SignalGatewayNotificationService(BaseNotificationService):
             ValueError: If download fails or file is too large
         """
         _LOGGER.debug("Downloading attachment from URL: %s", url)
-        async with session.get(
-            url,
-            timeout=aiohttp.ClientTimeout(total=30),
-        ) as resp:
-            resp.raise_for_status()
-
-            # Validate Content-Length if available
-            self._validate_content_length(resp.headers.get("Content-Length"), max_size)
-
-            # Download in chunks
-            chunks = await self._download_in_chunks(resp, max_size)
-
-            # Encode as base64
-            base64_content = str(base64.b64encode(chunks), encoding="utf-8")
-            _LOGGER.debug(
-                "Downloaded and encoded attachment from %s (%d bytes, %d base64 chars)",
+        host = urlsplit(url).netloc
+        # The body size is unknown until the headers are received: bound the
+        # connection and each read first, then the whole body from its size
+        read_timeout = self.download_timeouts.timeout(host)
+        expected_size = 0
+        start = time.monotonic()
+        try:
+            async with session.get(
                 url,
-                len(chunks),
-                len(base64_content),
-            )
-            return base64_content
-
-    async def _download_attachments_from_urls(
-        self,
-        urls: list[str],
-        verify_ssl: bool = True,
-        max_size: int = CONF_MAX_ALLOWED_DOWNLOAD_SIZE_BYTES,
-    ) -> Optional[list[str]]:
-        """Download attachments from URLs and encode as base64.
-
-        Args:
-            urls: List of URLs to download
-            verify_ssl: Whether to verify SSL certificates
-            max_size: Maximum allowed download size in bytes
-
-        Returns:
-            List of base64 encoded file contents
-
-        Raises:
-            ValueError: If file is too large (raised by sub-methods)
-            aiohttp.ClientError: If download fails (network/HTTP errors)
-        """
-        base64_attachments = []
-        session = async_get_clientsession(self.hass, verify_ssl=verify_ssl)
-
-        for url in urls:
-            base64_content = await self._download_and_encode_url(session, url, max_size)
-            base64_attachments.append(base64_content)
-
-        return base64_attachments if base64_attachments else None
+                timeout=aiohttp.ClientTimeout(
+                    total=self.download_timeouts.ceiling,
+                    sock_connect=read_timeout,
+                    sock_read=read_timeout,
+                ),
+            ) as resp:
+                resp.raise_for_status()
+
+                # Validate Content-Length if available
+                content_length = resp.headers.get("Content-Length")
+                self._validate_content_length(content_length, max_size)
+                expected_size = int(content_length) if content_length else max_size
+
+                # Download in chunks (spooled to disk above the threshold)
+                async with asyncio.timeout(
+                    self.download_timeouts.timeout(host, expected_size)
+                ):
+                    spool = await self._download_in_chunks(resp, max_size)
+        except TimeoutError:
+            self.download_timeouts.record_timeout(host, expected_size)
+            raise
+        elapsed = time.monotonic() - start
+
+        size, base64_content = await self.hass.async_add_executor_job(
+            self._encode_spool, spool
+        )
+        self.download_timeouts.record(host, size, elapsed)
+        _LOGGER.debug(
+            "Downloaded and encoded attachment from %s (%d bytes, %d base64 chars)",
+            url,
+            size,
+            len(base64_content),
+        )
+        return base64_content
 
     def _normalize_targets(
         self, target: Optional[Union[str, list[str]]]
@@ -476,50 +598,144 @@ class SignalGatewayNotificationService(BaseNotificationService):
             return f"{title}\n{message}"
         return message
 
-    async def _process_attachments(
+    def _get_registered_attachments(self, handles: list[str]) -> list[str]:
+        """Get the base64 content of registered attachments.
+
+        Args:
+            handles: Handles of attachments registered with register_attachment
+
+        Returns:
+            List of base64 encoded attachments
+
+        Raises:
+            ValueError: If a handle is not registered
+        """
+        if self._attachment_registry is None:
+            raise ValueError("Registered attachments are not available")
+        return [self._attachment_registry.get(handle) for handle in handles]
+
+    async def _iter_attachments(
         self,
         attachments: Optional[list[Any]],
         urls: Optional[list[str]],
         verify_ssl: bool,
-    ) -> Optional[list[str]]:
-        """Process and encode all attachments from files and URLs.
+        attachment_handles: Optional[list[str]] = None,
+    ) -> AsyncIterator[str]:
+        """Encode the attachments from files, URLs and handles, one at a time.
+
+        Local files and handles are validated before the first attachment is
+        yielded, so an invalid one fails the message before anything is sent.
 
         Args:
             attachments: List of local file paths
             urls: List of URLs to download
             verify_ssl: Whether to verify SSL certificates
+            attachment_handles: List of registered attachment handles
 
-        Returns:
-            List of base64 encoded attachments, or None if no attachments
+        Yields:
+            Base64 encoded attachments, in order (files, URLs, then handles)
 
         Raises:
             ValueError: If file validation fails (not found, too large, not readable)
+                or an attachment handle is unknown
             OSError: If file I/O fails
             aiohttp.ClientError: If URL download fails
-
-        Note:
-            Exceptions are propagated to notify the user of attachment failures.
-            Message will not be sent if attachment processing fails.
         """
-        base64_attachments = []
+        run = self.hass.async_add_executor_job
+        # Registered attachments are already encoded (no file I/O)
+        registered = (
+            self._get_registered_attachments(attachment_handles)
+            if attachment_handles
+            else []
+        )
+        paths = (
+            await run(lambda: [self._normalize_file_path(a) for a in attachments])
+            if attachments
+            else []
+        )
 
-        # Encode local file paths to base64
-        if attachments:
-            local_base64 = self._encode_attachments_from_paths(attachments)
-            base64_attachments.extend(local_base64)
-            _LOGGER.debug("Encoded %d local attachments", len(local_base64))
+        for path in paths:
+            yield await run(self._encode_file_to_base64, path)
 
-        # Download from URLs and encode to base64
         if urls:
-            url_base64 = await self._download_attachments_from_urls(urls, verify_ssl)
-            if url_base64:
-                base64_attachments.extend(url_base64)
+            session = async_get_clientsession(self.hass, verify_ssl=verify_ssl)
+            for url in urls:
+                yield await self._download_and_encode_url(
+                    session, url, CONF_MAX_ALLOWED_DOWNLOAD_SIZE_BYTES
+                )
+
+        for base64_content in registered:
+            yield base64_content
+
+    async def _iter_attachment_batches(
+        self, base64_attachments: AsyncIterator[str]
+    ) -> AsyncGenerator[list[str], None]:
+        """Group attachments into batches within the count and size limits.
+
+        Attachments keep their order. A batch is yielded as soon as it is full
+        or the next attachment does not fit in it, and an attachment larger than
+        the size limit on its own is sent alone in its batch.
+
+        Args:
+            base64_attachments: Base64 encoded attachments, in order
+
+        Yields:
+            Attachment batches
+        """
+        current: list[str] = []
+        current_size = 0
+        async for attachment in base64_attachments:
+            size = len(attachment)
+            if current and current_size + size > self._max_attachment_batch_bytes:
+                yield current
+                current, current_size = [], 0
+            current.append(attachment)
+            current_size += size
+            if len(current) >= self._max_attachments_per_message:
+                yield current
+                current, current_size = [], 0
+        if current:
+            yield current
+
+    async def _set_typing(self, recipients: list[str], typing: bool) -> None:
+        """Show or hide the typing indicator for all recipients concurrently.
+
+        Errors are logged and never raised: the indicator is best effort.
+        """
+        results = await asyncio.gather(
+            *(
+                self._client.set_typing_indicator(
+                    self._fix_phone_number(recipient), typing
+                )
+                for recipient in recipients
+            ),
+            return_exceptions=True,
+        )
+        for recipient, result in zip(recipients, results):
+            if isinstance(result, Exception):
                 _LOGGER.debug(
-                    "Downloaded and encoded %d attachments from URLs",
-                    len(url_base64),
+                    "Failed to update typing indicator for %s: %s", recipient, result
                 )
 
-        return base64_attachments if base64_attachments else None
+    async def _show_typing(self, recipients: list[str]) -> None:
+        """Show the typing indicator until cancelled, then hide it."""
+        try:
+            while True:
+                await self._set_typing(recipients, True)
+                await asyncio.sleep(TYPING_INDICATOR_REFRESH_SECONDS)
+        except asyncio.CancelledError:
+            await self._set_typing(recipients, False)
+
+    def _start_typing(self, recipients: list[str]) -> asyncio.Task[None]:
+        """Start showing the typing indicator in the background.
+
+        Returns:
+            Task to cancel once the message is sent, which hides the indicator
+        """
+        task = asyncio.create_task(self._show_typing(recipients))
+        self._typing_tasks.add(task)
+        task.add_done_callback(self._typing_tasks.discard)
+        return task
 
     async def _send_to_recipient(
         self,
@@ -564,6 +780,7 @@ class SignalGatewayNotificationService(BaseNotificationService):
         urls: Optional[list[str]] = None,
         verify_ssl: bool = True,
         text_mode: str = "normal",
+        attachment_handles: Optional[list[str]] = None,
         **kwargs: Any,
     ) -> None:
         """Send a notification via Signal.
@@ -576,6 +793,7 @@ class SignalGatewayNotificationService(BaseNotificationService):
             urls: List of URLs to download and attach
             verify_ssl: Whether to verify SSL certificates when downloading URLs
             text_mode: Text formatting mode (\"normal\" or \"styled\", default: \"normal\")
+            attachment_handles: List of registered attachment handles to attach
         """
         if not message:
             _LOGGER.error("Message is required")
@@ -589,13 +807,77 @@ class SignalGatewayNotificationService(BaseNotificationService):
         # Prepare message
         full_message = self._prepare_message(message, title)
 
-        # Process attachments (will raise exception on failure)
-        base64_attachments = await self._process_attachments(
-            attachments, urls, verify_ssl
-        )
-
-        # Send to each recipient
-        for recipient in targets:
-            await self._send_to_recipient(
-                recipient, full_message, base64_attachments, text_mode
+        # Let recipients know a message is coming while attachments are processed
+        typing_task = None
+        if self._typing_indicator and (attachments or urls):
+            typing_task = self._start_typing(targets)
+        try:
+            await self._process_and_send(
+                targets,
+                full_message,
+                attachments,
+                urls,
+                verify_ssl,
+                text_mode,
+                attachment_handles,
             )
+        finally:
+            if typing_task:
+                typing_task.cancel()
+
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    async def _process_and_send(
+        self,
+        targets: list[str],
+        message: str,
+        attachments: Optional[list[Any]],
+        urls: Optional[list[str]],
+        verify_ssl: bool,
+        text_mode: str,
+        attachment_handles: Optional[list[str]] = None,
+    ) -> None:
+        """Process attachments and send the message to all targets.
+
+        Attachments are sent in batches within the count and size limits. Each
+        batch is sent to every target before the next one, which is prepared
+        (downloaded and encoded) meanwhile. If a later batch fails, the batches
+        already sent are not recalled.
+
+        Args:
+            targets: Target phone numbers or group IDs
+            message: Full message to send
+            attachments: List of local file paths to attach
+            urls: List of URLs to download and attach
+            verify_ssl: Whether to verify SSL certificates when downloading URLs
+            text_mode: Text formatting mode (\"normal\" or \"styled\")
+            attachment_handles: List of registered attachment handles
+        """
+        batches = self._iter_attachment_batches(
+            self._iter_attachments(attachments, urls, verify_ssl, attachment_handles)
+        )
+        # The text goes with the first batch: if its attachments cannot be
+        # prepared, the exception is raised before anything is sent
+        batch = await anext(batches, None)
+        text = message
+        pending: Optional[asyncio.Future[Optional[list[str]]]] = None
+        try:
+            while True:
+                # Prepare the next batch while this one is sent. The batches are
+                # still sent one after the other, so they arrive in order.
+                if batch is not None:
+                    pending = asyncio.ensure_future(anext(batches, None))
+                for recipient in targets:
+                    await self._send_to_recipient(recipient, text, batch, text_mode)
+                if pending is None:
+                    break
+                batch, pending = await pending, None
+                if batch is None:
+                    break
+                text = ""
+                _LOGGER.debug("Sending another batch of %d attachments", len(batch))
+        finally:
+            if pending is not None:
+                pending.cancel()
+                with contextlib.suppress(asyncio.CancelledError, Exception):
+                    await pending
+            await batches.aclose()
@@ -0,0 +1,127 @@
+"""Receive Signal messages only while something consumes them.
+
+In on-demand mode, the listener is started when a listener of the Signal
+events appears on the event bus (an automation, a script, the developer
+tools...) or when another integration subscribes to the client, and it is
+stopped after a grace period once nothing listens anymore.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    DOMAIN,
+    EVENT_SIGNAL_ATTACHMENTS,
+    EVENT_SIGNAL_COMMAND,
+    EVENT_SIGNAL_RECEIVED,
+)
+from .signal import SignalClient
+
+_LOGGER = logging.getLogger(__name__)
+
+# Events whose bus listeners keep the listener started
+ON_DEMAND_EVENT_TYPES = (
+    EVENT_SIGNAL_RECEIVED,
+    EVENT_SIGNAL_COMMAND,
+    EVENT_SIGNAL_ATTACHMENTS,
+)
+# Interval between two checks of the event bus listeners
+ON_DEMAND_CHECK_INTERVAL = timedelta(seconds=10)
+# Time without any listener before the listener is stopped
+ON_DEMAND_GRACE_PERIOD = timedelta(minutes=5)
+
+
+class OnDemandReceiver:  # pylint: disable=too-many-instance-attributes
+    """Start and stop the listener of a client according to the demand.
+
+    The event bus does not notify new listeners: they are counted by
+    `async_update`, called every ON_DEMAND_CHECK_INTERVAL from `async_start`
+    until `async_cancel`.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, client: SignalClient, always_needed: bool = False
+    ) -> None:
+        """Initialize the receiver.
+
+        Args:
+            hass: Home Assistant instance
+            client: Signal client whose listener is started and stopped
+            always_needed: True if received messages are used by the
+                integration itself (message store, auto-replies, command
+                services), which keeps the listener started
+        """
+        self.hass = hass
+        self.client = client
+        self.always_needed = always_needed
+        self.grace_period = ON_DEMAND_GRACE_PERIOD.total_seconds()
+        self._idle_since: Optional[float] = None
+        self._cancel_timer: Optional[CALLBACK_TYPE] = None
+        self._cancelled = False
+        self.starts = 0
+        self.stops = 0
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the on-demand statistics."""
+        return {
+            "listening": self.client.listening,
+            "always_needed": self.always_needed,
+            "starts": self.starts,
+            "stops": self.stops,
+        }
+
+    async def async_start(self) -> None:
+        """Check the demand now and every ON_DEMAND_CHECK_INTERVAL."""
+        self._cancel_timer = async_track_time_interval(
+            self.hass,
+            self.async_update,
+            ON_DEMAND_CHECK_INTERVAL,
+            name=f"{DOMAIN} on-demand receive",
+        )
+        await self.async_update()
+
+    @callback
+    def async_cancel(self) -> None:
+        """Stop checking the demand, before the client is stopped for good."""
+        self._cancelled = True
+        if self._cancel_timer is not None:
+            self._cancel_timer()
+            self._cancel_timer = None
+
+    def has_demand(self) -> bool:
+        """Return True if received messages have a consumer."""
+        if self.always_needed or self.client.subscribers:
+            return True
+        listeners = self.hass.bus.async_listeners()
+        return any(listeners.get(event_type) for event_type in ON_DEMAND_EVENT_TYPES)
+
+    async def async_update(self, _now: Optional[datetime] = None) -> None:
+        """Start or stop the listener according to the current demand."""
+        if self._cancelled:
+            return
+        if self.has_demand():
+            self._idle_since = None
+            if not self.client.listening:
+                _LOGGER.info("Signal events have listeners, starting the listener")
+                self.starts += 1
+                await self.client.start_listening()
+            return
+
+        if not self.client.listening:
+            return
+        now = time.monotonic()
+        if self._idle_since is None:
+            self._idle_since = now
+        elif now - self._idle_since >= self.grace_period:
+            _LOGGER.info("Signal events have no listener, stopping the listener")
+            self._idle_since = None
+            self.stops += 1
+            await self.client.stop_listening()
@@ -0,0 +1,93 @@
+"""Sensor platform for Signal Gateway."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime, timezone
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import CONF_WEBSOCKET_ENABLED, DOMAIN
+from .entity import SignalGatewayEntity
+from .signal import SignalClient
+
+
+def _timestamp(value: float | None) -> datetime | None:
+    return datetime.fromtimestamp(value, timezone.utc) if value is not None else None
+
+
+# Sensor descriptions and the functions reading their value from the client
+SENSORS: tuple[tuple[SensorEntityDescription, Callable[[SignalClient], Any]], ...] = (
+    (
+        SensorEntityDescription(
+            key="reconnects",
+            translation_key="reconnects",
+            state_class=SensorStateClass.TOTAL_INCREASING,
+            entity_category=EntityCategory.DIAGNOSTIC,
+        ),
+        lambda client: client.reconnects,
+    ),
+    (
+        SensorEntityDescription(
+            key="last_message",
+            translation_key="last_message",
+            device_class=SensorDeviceClass.TIMESTAMP,
+        ),
+        lambda client: _timestamp(client.last_message_time),
+    ),
+    (
+        SensorEntityDescription(
+            key="receive_latency",
+            translation_key="receive_latency",
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            native_unit_of_measurement=UnitOfTime.SECONDS,
+            suggested_display_precision=1,
+            entity_category=EntityCategory.DIAGNOSTIC,
+        ),
+        lambda client: client.receive_latency,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
+) -> None:
+    """Set up the WebSocket listener sensors."""
+    if not entry.data.get(CONF_WEBSOCKET_ENABLED, True):
+        return
+    client = hass.data[DOMAIN][entry.entry_id]["client"]
+    async_add_entities(
+        SignalGatewaySensor(client, entry, description, value_fn)
+        for description, value_fn in SENSORS
+    )
+
+
+class SignalGatewaySensor(SignalGatewayEntity, SensorEntity):
+    """Sensor fed by the WebSocket listener state."""
+
+    def __init__(
+        self,
+        client: SignalClient,
+        entry: ConfigEntry,
+        description: SensorEntityDescription,
+        value_fn: Callable[[SignalClient], Any],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(client, entry, description)
+        self._value_fn = value_fn
+
+    @property
+    def native_value(self) -> Any:
+        """Return the sensor value."""
+        return self._value_fn(self.client)
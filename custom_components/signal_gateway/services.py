@@ -0,0 +1,311 @@
+"""Integration-wide services for Signal Gateway."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_set_service_schema
+from homeassistant.util import dt as dt_util
+
+from .attachments import AttachmentRegistry
+from .const import (
+    ATTR_COMPRESS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_GROUP_ID,
+    ATTR_HANDLE,
+    ATTR_LIMIT,
+    ATTR_PATH,
+    ATTR_QUERY,
+    ATTR_SENDER,
+    ATTR_SINCE,
+    ATTR_UNTIL,
+    DATA_ATTACHMENT_REGISTRY,
+    DOMAIN,
+    SERVICE_RECONNECT,
+    SERVICE_REGISTER_ATTACHMENT,
+    SERVICE_SEARCH_MESSAGES,
+    SERVICE_UNREGISTER_ATTACHMENT,
+)
+from .message_store import MAX_SEARCH_RESULTS
+from .signal.filters import normalize_group_id
+
+_LOGGER = logging.getLogger(__name__)
+
+REGISTER_ATTACHMENT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_HANDLE): cv.slug,
+        vol.Optional(ATTR_COMPRESS, default=False): cv.boolean,
+    }
+)
+
+UNREGISTER_ATTACHMENT_SCHEMA = vol.Schema({vol.Required(ATTR_HANDLE): cv.string})
+
+RECONNECT_SCHEMA = vol.Schema({vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string})
+
+SEARCH_MESSAGES_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_QUERY): cv.string,
+        vol.Optional(ATTR_SENDER): cv.string,
+        vol.Optional(ATTR_GROUP_ID): cv.string,
+        vol.Optional(ATTR_SINCE): cv.datetime,
+        vol.Optional(ATTR_UNTIL): cv.datetime,
+        vol.Optional(ATTR_LIMIT, default=20): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_SEARCH_RESULTS)
+        ),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+    }
+)
+
+
+def _timestamp_ms(value: Any) -> Any:
+    """Convert a service datetime to a message timestamp (milliseconds)."""
+    if value is None:
+        return None
+    return int(dt_util.as_utc(value).timestamp() * 1000)
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Set up the attachment registry and the integration-wide services."""
+    registry = AttachmentRegistry(hass)
+    await registry.async_load()
+    hass.data[DATA_ATTACHMENT_REGISTRY] = registry
+
+    async def handle_register_attachment(call: ServiceCall) -> ServiceResponse:
+        """Handle register attachment service call."""
+        try:
+            attachment = await registry.async_register(
+                call.data[ATTR_PATH],
+                handle=call.data.get(ATTR_HANDLE),
+                compress=call.data[ATTR_COMPRESS],
+            )
+        except (ValueError, OSError) as err:
+            raise HomeAssistantError(str(err)) from err
+        return {
+            **attachment.as_dict(),
+            "total_memory_usage": registry.memory_usage,
+        }
+
+    async def handle_unregister_attachment(call: ServiceCall) -> None:
+        """Handle unregister attachment service call."""
+        if not await registry.async_unregister(call.data[ATTR_HANDLE]):
+            raise HomeAssistantError(
+                f"Unknown attachment handle: {call.data[ATTR_HANDLE]}"
+            )
+
+    async def handle_reconnect(call: ServiceCall) -> None:
+        """Handle reconnect service call."""
+        entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        entries = hass.data.get(DOMAIN, {})
+        if entry_id is not None and entry_id not in entries:
+            raise HomeAssistantError(f"Unknown Signal Gateway entry: {entry_id}")
+        for other_entry_id, data in entries.items():
+            if entry_id is None or other_entry_id == entry_id:
+                await data["client"].reconnect()
+
+    async def handle_search_messages(call: ServiceCall) -> ServiceResponse:
+        """Handle search messages service call."""
+        entry_id = call.data.get(ATTR_CONFIG_ENTRY_ID)
+        entries = hass.data.get(DOMAIN, {})
+        if entry_id is not None and entry_id not in entries:
+            raise HomeAssistantError(f"Unknown Signal Gateway entry: {entry_id}")
+        stores = {
+            other_entry_id: data["message_store"]
+            for other_entry_id, data in entries.items()
+            if data.get("message_store") and entry_id in (None, other_entry_id)
+        }
+        if not stores:
+            raise HomeAssistantError(
+                "Message storage is not enabled (see the integration options)"
+            )
+
+        group_id = call.data.get(ATTR_GROUP_ID)
+        limit = call.data[ATTR_LIMIT]
+        messages: list[Any] = []
+        for store_entry_id, store in stores.items():
+            for message in await store.async_search(
+                query=call.data.get(ATTR_QUERY),
+                sender=call.data.get(ATTR_SENDER),
+                group_id=normalize_group_id(group_id) if group_id else None,
+                since=_timestamp_ms(call.data.get(ATTR_SINCE)),
+                until=_timestamp_ms(call.data.get(ATTR_UNTIL)),
+                limit=limit,
+            ):
+                messages.append({**message, ATTR_CONFIG_ENTRY_ID: store_entry_id})
+        messages.sort(key=lambda message: message["timestamp"], reverse=True)
+        return {"messages": messages[:limit]}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REGISTER_ATTACHMENT,
+        handle_register_attachment,
+        schema=REGISTER_ATTACHMENT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_UNREGISTER_ATTACHMENT,
+        handle_unregister_attachment,
+        schema=UNREGISTER_ATTACHMENT_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_RECONNECT, handle_reconnect, schema=RECONNECT_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SEARCH_MESSAGES,
+        handle_search_messages,
+        schema=SEARCH_MESSAGES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+
+    # Set service schemas for GUI
+    async_set_service_schema(
+        hass,
+        DOMAIN,
+        SERVICE_REGISTER_ATTACHMENT,
+        {
+            "name": "Register attachment",
+            "description": (
+                "Load and encode a file once so notifications can reference it "
+                "with data.attachment_handles"
+            ),
+            "fields": {
+                ATTR_PATH: {
+                    "name": "Path",
+                    "description": "Local path of the file to register",
+                    "required": True,
+                    "example": "/config/www/logo.png",
+                    "selector": {"text": {}},
+                },
+                ATTR_HANDLE: {
+                    "name": "Handle",
+                    "description": (
+                        "Name used to reference the attachment "
+                        "(defaults to the file name)"
+                    ),
+                    "required": False,
+                    "example": "logo",
+                    "selector": {"text": {}},
+                },
+                ATTR_COMPRESS: {
+                    "name": "Compress",
+                    "description": "Downscale and re-encode the image as JPEG",
+                    "required": False,
+                    "default": False,
+                    "selector": {"boolean": {}},
+                },
+            },
+        },
+    )
+    async_set_service_schema(
+        hass,
+        DOMAIN,
+        SERVICE_UNREGISTER_ATTACHMENT,
+        {
+            "name": "Unregister attachment",
+            "description": "Remove a registered attachment",
+            "fields": {
+                ATTR_HANDLE: {
+                    "name": "Handle",
+                    "description": "Handle of the attachment to remove",
+                    "required": True,
+                    "example": "logo",
+                    "selector": {"text": {}},
+                },
+            },
+        },
+    )
+    async_set_service_schema(
+        hass,
+        DOMAIN,
+        SERVICE_RECONNECT,
+        {
+            "name": "Reconnect",
+            "description": "Reconnect the Signal WebSocket listener immediately",
+            "fields": {
+                ATTR_CONFIG_ENTRY_ID: {
+                    "name": "Config entry",
+                    "description": (
+                        "Signal Gateway entry to reconnect (all entries if omitted)"
+                    ),
+                    "required": False,
+                    "selector": {"config_entry": {"integration": DOMAIN}},
+                },
+            },
+        },
+    )
+    async_set_service_schema(
+        hass,
+        DOMAIN,
+        SERVICE_SEARCH_MESSAGES,
+        {
+            "name": "Search messages",
+            "description": (
+                "Search the received messages kept by the message store, "
+                "most recent first"
+            ),
+            "fields": {
+                ATTR_QUERY: {
+                    "name": "Query",
+                    "description": "Words the message must contain",
+                    "required": False,
+                    "example": "door open",
+                    "selector": {"text": {}},
+                },
+                ATTR_SENDER: {
+                    "name": "Sender",
+                    "description": "Phone number or UUID of the sender",
+                    "required": False,
+                    "example": "+33612345678",
+                    "selector": {"text": {}},
+                },
+                ATTR_GROUP_ID: {
+                    "name": "Group",
+                    "description": "Group ID (group.<id> or internal ID)",
+                    "required": False,
+                    "selector": {"text": {}},
+                },
+                ATTR_SINCE: {
+                    "name": "Since",
+                    "description": "Only return messages received after this time",
+                    "required": False,
+                    "selector": {"datetime": {}},
+                },
+                ATTR_UNTIL: {
+                    "name": "Until",
+                    "description": "Only return messages received before this time",
+                    "required": False,
+                    "selector": {"datetime": {}},
+                },
+                ATTR_LIMIT: {
+                    "name": "Limit",
+                    "description": "Maximum number of messages returned",
+                    "required": False,
+                    "default": 20,
+                    "selector": {
+                        "number": {"min": 1, "max": MAX_SEARCH_RESULTS, "mode": "box"}
+                    },
+                },
+                ATTR_CONFIG_ENTRY_ID: {
+                    "name": "Config entry",
+                    "description": (
+                        "Signal Gateway entry to search (all entries if omitted)"
+                    ),
+                    "required": False,
+                    "selector": {"config_entry": {"integration": DOMAIN}},
+                },
+            },
+        },
+    )
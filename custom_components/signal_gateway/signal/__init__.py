@@ -3,11 +3,27 @@
 from __future__ import annotations
 
 from .client import SignalClient
+from .commands import CommandRouter
+from .dedup import DedupIndex
+from .envelope import Envelope
+from .filters import MessageFilter
 from .http_client import SignalHTTPClient
+from .listener import SignalListener
+from .polling_listener import SignalPollingListener
+from .rate_limit import RateLimiter
+from .timeouts import AdaptiveTimeout
 from .websocket_listener import SignalWebSocketListener
 
 __all__ = [
+    "AdaptiveTimeout",
+    "CommandRouter",
+    "DedupIndex",
+    "Envelope",
+    "MessageFilter",
+    "RateLimiter",
     "SignalClient",
     "SignalHTTPClient",
+    "SignalListener",
+    "SignalPollingListener",
     "SignalWebSocketListener",
 ]
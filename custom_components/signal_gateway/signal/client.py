@@ -2,29 +2,63 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Any, Callable, Optional
 
 import aiohttp
 
+from .dedup import DedupIndex
 from .http_client import SignalHTTPClient
+from .listener import SignalListener
+from .polling_listener import SignalPollingListener
+from .subscriptions import DEFAULT_QUEUE_SIZE, Subscription
+from .timeouts import AdaptiveTimeout
 from .websocket_listener import SignalWebSocketListener
 
 _LOGGER = None  # Will be initialized if needed
 
 
-class SignalClient:
-    """Unified client for Signal-cli-rest-api with HTTP and WebSocket support."""
+class SignalClient:  # pylint: disable=too-many-public-methods
+    """Unified client for Signal-cli-rest-api with HTTP and WebSocket support.
 
-    def __init__(self, api_url: str, phone_number: str, session: aiohttp.ClientSession):
+    Received messages are delivered to the message handler, called inline by
+    the listener, and to any number of subscribers, each consuming its own
+    bounded queue (see `subscribe` and `messages`).
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        api_url: str,
+        phone_number: str,
+        session: aiohttp.ClientSession,
+        polling: bool = False,
+        dedup: Optional[DedupIndex] = None,
+        timeouts: Optional[AdaptiveTimeout] = None,
+    ):
         """Initialize the Signal client.
 
         Args:
             api_url: Base URL of the Signal-cli-rest-api service
             phone_number: Phone number associated with this Signal account
             session: aiohttp ClientSession for HTTP requests
+            polling: Receive messages by polling the REST API instead of the
+                WebSocket (for the normal and native modes)
+            dedup: Index of the envelopes already received, kept across clients
+                so that switching transports does not deliver them again
+            timeouts: Estimator of the API request timeouts (a new one with the
+                default bounds if None)
         """
-        self._http_client = SignalHTTPClient(api_url, phone_number, session)
-        self._ws_listener = SignalWebSocketListener(api_url, phone_number, session)
+        self._http_client = SignalHTTPClient(
+            api_url, phone_number, session, timeouts=timeouts
+        )
+        listener_class: type[SignalListener] = (
+            SignalPollingListener if polling else SignalWebSocketListener
+        )
+        self._ws_listener = listener_class(api_url, phone_number, session, dedup)
+        self._ws_listener.set_message_handler(self._deliver)
+        self._message_handler: Optional[Callable[[dict[str, Any]], Any]] = None
+        self._subscriptions: list[Subscription] = []
 
     async def send_message(
         self,
@@ -48,18 +82,217 @@ class SignalClient:
             target, message, base64_attachments, text_mode
         )
 
+    async def set_typing_indicator(self, recipient: str, typing: bool = True) -> None:
+        """Show or hide the typing indicator for a recipient.
+
+        Args:
+            recipient: Phone number or group ID the indicator is shown to
+            typing: True to show the indicator, False to hide it
+        """
+        await self._http_client.set_typing_indicator(recipient, typing)
+
+    def iter_attachment(
+        self, attachment_id: str, size: int = 0
+    ) -> AsyncIterator[bytes]:
+        """Stream the content of a received attachment.
+
+        Args:
+            attachment_id: ID of the attachment (from the received envelope)
+            size: Expected size in bytes, used to compute the timeout
+
+        Returns:
+            Async iterator over chunks of the attachment content
+        """
+        return self._http_client.iter_attachment(attachment_id, size)
+
+    @property
+    def timeout_estimates(self) -> dict[str, dict[str, Any]]:
+        """Return the learned latency and throughput of the API endpoints."""
+        return self._http_client.timeouts.estimates()
+
+    @property
+    def listener_stats(self) -> dict[str, Any]:
+        """Return the WebSocket listener and subscribers statistics."""
+        return {
+            **self._ws_listener.stats,
+            "subscribers": [subscription.stats for subscription in self._subscriptions],
+        }
+
+    @property
+    def listening(self) -> bool:
+        """Return True if the listener is started (connected or reconnecting)."""
+        return self._ws_listener.running
+
+    @property
+    def subscribers(self) -> int:
+        """Return the number of active subscriptions."""
+        return len(self._subscriptions)
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the WebSocket listener is connected."""
+        return self._ws_listener.connected
+
+    @property
+    def reconnects(self) -> int:
+        """Return the number of WebSocket reconnections."""
+        return self._ws_listener.reconnects
+
+    @property
+    def last_message_time(self) -> Optional[float]:
+        """Return the arrival time (POSIX timestamp) of the last received message."""
+        return self._ws_listener.last_message_time
+
+    @property
+    def receive_latency(self) -> Optional[float]:
+        """Return the delivery delay (in seconds) of the last received message."""
+        return self._ws_listener.receive_latency
+
+    def add_state_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback called when the listener state changes.
+
+        Args:
+            listener: Callback without arguments
+
+        Returns:
+            Callable removing the listener
+        """
+        return self._ws_listener.add_state_listener(listener)
+
     def set_message_handler(self, handler: Callable[[dict[str, Any]], Any]) -> None:
         """Set the callback handler for incoming WebSocket messages.
 
+        The handler is awaited by the listener before the next message is
+        dispatched. Consumers that may be slow should subscribe instead.
+
         Args:
             handler: Async callable that receives message dictionaries
         """
-        self._ws_listener.set_message_handler(handler)
+        self._message_handler = handler
+
+    async def _deliver(self, msg: dict[str, Any]) -> None:
+        """Queue a received message for the subscribers and call the handler."""
+        for subscription in self._subscriptions:
+            subscription.offer(msg)
+        if self._message_handler is not None:
+            await self._message_handler(msg)
+
+    def _subscribe(
+        self,
+        message_filter: Optional[Callable[[dict[str, Any]], bool]],
+        queue_size: int,
+        name: Optional[str],
+    ) -> Subscription:
+        subscription = Subscription(message_filter, queue_size, name)
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def subscribe(
+        self,
+        handler: Callable[[dict[str, Any]], Any],
+        message_filter: Optional[Callable[[dict[str, Any]], bool]] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        name: Optional[str] = None,
+    ) -> Callable[[], None]:
+        """Call a handler for each received message, in a dedicated task.
+
+        Messages that passed the filters of the listener are queued for the
+        subscriber; the oldest queued message is dropped when the queue is
+        full, so a slow handler does not delay the other consumers.
+
+        Args:
+            handler: Callable or coroutine function receiving message dictionaries
+            message_filter: Callable returning False for messages to skip
+            queue_size: Maximum number of messages waiting for the handler
+            name: Name of the subscriber, reported in the listener statistics
+
+        Returns:
+            Callable ending the subscription
+        """
+        subscription = self._subscribe(message_filter, queue_size, name)
+        subscription.start(handler)
+        return lambda: self._unsubscribe(subscription)
+
+    async def messages(
+        self,
+        message_filter: Optional[Callable[[dict[str, Any]], bool]] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        name: Optional[str] = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Iterate over the received messages.
+
+        The subscription starts with the iteration and ends when the iterator
+        is closed (use `contextlib.aclosing` to end it as soon as the loop is
+        left) or when the client stops listening.
+
+        Args:
+            message_filter: Callable returning False for messages to skip
+            queue_size: Maximum number of messages waiting to be consumed
+            name: Name of the subscriber, reported in the listener statistics
+
+        Yields:
+            Received message dictionaries
+        """
+        subscription = self._subscribe(message_filter, queue_size, name)
+        try:
+            async for msg in subscription:
+                yield msg
+        finally:
+            self._unsubscribe(subscription)
+
+    def set_message_filter(
+        self, message_filter: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> None:
+        """Set the filter deciding which incoming messages reach the handler.
+
+        Args:
+            message_filter: Callable returning False for messages to drop, or
+                None to deliver every message
+        """
+        self._ws_listener.set_message_filter(message_filter)
+
+    def set_rate_limiter(
+        self, rate_limiter: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> None:
+        """Set the flood protection of incoming messages.
+
+        Args:
+            rate_limiter: Callable returning False for messages over the limits,
+                or None to disable flood protection
+        """
+        self._ws_listener.set_rate_limiter(rate_limiter)
+
+    def set_auto_responder(
+        self, responder: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> None:
+        """Set the auto-responder evaluated on incoming messages.
+
+        Args:
+            responder: Callable scheduling a reply and returning True if the
+                message matched a rule, or None to disable auto-replies
+        """
+        self._ws_listener.set_auto_responder(responder)
+
+    def configure_listener(self, **settings: Any) -> None:
+        """Override tuning settings of the listener (see `SignalListener.configure`)."""
+        self._ws_listener.configure(**settings)
 
     async def start_listening(self) -> None:
         """Connect to the WebSocket and start listening for incoming messages."""
         await self._ws_listener.connect()
 
+    async def reconnect(self) -> None:
+        """Close the WebSocket connection and reconnect immediately."""
+        await self._ws_listener.reconnect()
+
     async def stop_listening(self) -> None:
-        """Disconnect from the WebSocket."""
+        """Disconnect from the WebSocket and end the subscriptions."""
         await self._ws_listener.disconnect()
+        subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            await subscription.async_close()
@@ -0,0 +1,132 @@
+"""Routing of incoming command messages (such as "/lights off")."""
+
+from __future__ import annotations
+
+import re
+from typing import Optional
+
+SERVICE_PATTERN = re.compile(r"^[a-z0-9_]+\.[a-z0-9_]+$")
+
+
+def parse_commands(commands_str: str) -> dict[str, Optional[str]]:
+    """Parse command rules "prefix" or "prefix: domain.service", one per line.
+
+    Prefixes are case-insensitive. A rule without service fires an event.
+
+    Raises:
+        ValueError: If a rule is malformed
+
+    Examples:
+        >>> parse_commands("/lights off: script.lights_off\\n/Alarm arm\\n")
+        {'/lights off': 'script.lights_off', '/alarm arm': None}
+        >>> parse_commands("")
+        {}
+    """
+    commands: dict[str, Optional[str]] = {}
+    for line in commands_str.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        prefix, separator, service = line.rpartition(":")
+        if not separator:
+            prefix, service = line, ""
+        prefix = " ".join(prefix.lower().split())
+        service = service.strip()
+        if not prefix:
+            raise ValueError(f"Invalid command rule (empty command): {line}")
+        if separator and not SERVICE_PATTERN.match(service):
+            raise ValueError(
+                f"Invalid command rule (expected 'command: domain.service'): {line}"
+            )
+        commands[prefix] = service or None
+    return commands
+
+
+class _CommandNode:  # pylint: disable=too-few-public-methods
+    """Node of the command trie."""
+
+    __slots__ = ("children", "command")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _CommandNode] = {}
+        self.command: Optional[str] = None
+
+
+class CommandRouter:
+    """Match incoming messages against registered command prefixes.
+
+    Prefixes are stored in a character trie, so a message is matched in a
+    single pass whatever the number of commands. The longest command ending
+    on a word boundary wins.
+
+    Examples:
+        >>> router = CommandRouter({"/lights": None, "/lights off": "script.off"})
+        >>> router.match("/lights off kitchen")
+        ('/lights off', 'kitchen')
+        >>> router.match("/LIGHTS")
+        ('/lights', '')
+        >>> router.match("/lightsaber") is None
+        True
+        >>> router.service("/lights off")
+        'script.off'
+    """
+
+    def __init__(self, commands: Optional[dict[str, Optional[str]]] = None) -> None:
+        """Initialize the router.
+
+        Args:
+            commands: Command prefixes mapped to the service to call (or None)
+        """
+        self._root = _CommandNode()
+        self._services: dict[str, Optional[str]] = {}
+        for prefix, service in (commands or {}).items():
+            self.add(prefix, service)
+
+    def __len__(self) -> int:
+        """Return the number of registered commands."""
+        return len(self._services)
+
+    def add(self, prefix: str, service: Optional[str] = None) -> None:
+        """Register a command prefix.
+
+        Args:
+            prefix: Command prefix (case-insensitive)
+            service: Service to call ("domain.service"), or None to fire an event
+        """
+        prefix = prefix.lower()
+        node = self._root
+        for char in prefix:
+            node = node.children.setdefault(char, _CommandNode())
+        node.command = prefix
+        self._services[prefix] = service
+
+    def service(self, command: str) -> Optional[str]:
+        """Return the service to call for a matched command, if any."""
+        return self._services.get(command)
+
+    def match(self, text: Optional[str]) -> Optional[tuple[str, str]]:
+        """Find the command starting a message.
+
+        Args:
+            text: Message text
+
+        Returns:
+            The matched command and the remaining arguments, or None
+        """
+        if not text:
+            return None
+        text = text.lstrip()
+        node = self._root
+        matched: Optional[str] = None
+        end = 0
+        for index, char in enumerate(text.lower()):
+            child = node.children.get(char)
+            if child is None:
+                break
+            node = child
+            following = index + 1
+            if node.command and (following >= len(text) or text[following].isspace()):
+                matched, end = node.command, following
+        if matched is None:
+            return None
+        return matched, text[end:].strip()
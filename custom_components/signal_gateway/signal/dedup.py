@@ -0,0 +1,90 @@
+"""Deduplication of envelopes delivered more than once."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any, Optional
+
+
+def envelope_key(msg: dict[str, Any]) -> Optional[tuple[Any, Any]]:
+    """Return the key identifying an envelope: its source and timestamp.
+
+    Returns:
+        The key, or None if the envelope has no timestamp
+
+    Examples:
+        >>> envelope_key({"envelope": {"sourceUuid": "uuid-1", "timestamp": 42}})
+        ('uuid-1', 42)
+        >>> envelope_key({"envelope": {"source": "+336", "dataMessage": {}}}) is None
+        True
+    """
+    envelope = msg.get("envelope") or {}
+    timestamp = envelope.get("timestamp") or (envelope.get("dataMessage") or {}).get(
+        "timestamp"
+    )
+    if timestamp is None:
+        return None
+    source = (
+        envelope.get("sourceUuid")
+        or envelope.get("sourceNumber")
+        or envelope.get("source")
+    )
+    return source, timestamp
+
+
+class DedupIndex:
+    """Remember recently seen keys within a time window and a size limit.
+
+    Keys are kept in insertion order, so expired keys are evicted from the
+    front and every operation is O(1) amortized. The oldest keys are also
+    evicted when max_size is reached, which bounds the memory used.
+
+    Examples:
+        >>> index = DedupIndex(window=60, max_size=2)
+        >>> index.check("a"), index.check("b"), index.check("a")
+        (False, False, True)
+        >>> index.check("c"), index.check("a")
+        (False, False)
+        >>> index.hits
+        1
+    """
+
+    def __init__(self, window: float = 600.0, max_size: int = 1024) -> None:
+        """Initialize the index.
+
+        Args:
+            window: Time (in seconds) a key is remembered
+            max_size: Maximum number of keys remembered
+        """
+        self.window = window
+        self.max_size = max_size
+        self.hits = 0
+        self._seen: OrderedDict[Hashable, float] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of remembered keys."""
+        return len(self._seen)
+
+    def check(self, key: Hashable) -> bool:
+        """Check if a key was seen recently, and remember it.
+
+        Returns:
+            True if the key is a duplicate
+        """
+        now = time.monotonic()
+        seen = self._seen
+        while seen:
+            oldest_key, oldest_time = next(iter(seen.items()))
+            if now - oldest_time < self.window:
+                break
+            del seen[oldest_key]
+
+        if key in seen:
+            self.hits += 1
+            return True
+        seen[key] = now
+        if len(seen) > self.max_size:
+            seen.popitem(last=False)
+        return False
@@ -0,0 +1,265 @@
+"""Compact model of the envelopes received from Signal-cli-rest-api.
+
+The raw envelope holds many fields that automations never read. Sub-objects
+are only built when accessed, and the event payload is a flat, size-bounded
+dictionary.
+"""
+
+from __future__ import annotations
+
+import base64
+from typing import Any, Optional
+
+# Bounds of the event payload
+MAX_EVENT_MESSAGE_LENGTH: int = 4096  # characters of the message body
+MAX_EVENT_QUOTE_LENGTH: int = 256  # characters of the quoted text
+MAX_EVENT_ITEMS: int = 32  # attachments and mentions
+
+_UNSET: Any = object()
+
+
+def _truncate(text: Optional[str], max_length: int) -> Optional[str]:
+    """Truncate a text to a maximum length.
+
+    Examples:
+        >>> _truncate("hello world", 5)
+        'hello…'
+        >>> _truncate("hello", 5)
+        'hello'
+        >>> _truncate(None, 5) is None
+        True
+    """
+    if text is None or len(text) <= max_length:
+        return text
+    return text[:max_length] + "…"
+
+
+class Sender:  # pylint: disable=too-few-public-methods
+    """Sender of an envelope."""
+
+    __slots__ = ("number", "uuid", "name", "device")
+
+    def __init__(self, envelope: dict[str, Any]) -> None:
+        """Initialize the sender from the raw envelope."""
+        self.number: Optional[str] = envelope.get("sourceNumber") or envelope.get(
+            "source"
+        )
+        self.uuid: Optional[str] = envelope.get("sourceUuid")
+        self.name: Optional[str] = envelope.get("sourceName")
+        self.device: Optional[int] = envelope.get("sourceDevice")
+
+    @property
+    def id(self) -> Optional[str]:  # pylint: disable=invalid-name
+        """Return the phone number of the sender, or its UUID if hidden."""
+        return self.number or self.uuid
+
+
+class Group:  # pylint: disable=too-few-public-methods
+    """Group a message was sent to."""
+
+    __slots__ = ("id", "type")
+
+    def __init__(self, group_info: dict[str, Any]) -> None:
+        """Initialize the group from the raw group info."""
+        self.id: str = group_info.get("groupId", "")  # pylint: disable=invalid-name
+        self.type: Optional[str] = group_info.get("type")
+
+    @property
+    def target(self) -> str:
+        """Return the group ID to use as a notification target.
+
+        Examples:
+            >>> Group({"groupId": "abcd"}).target
+            'group.YWJjZA=='
+        """
+        return "group." + base64.b64encode(self.id.encode("utf-8")).decode("ascii")
+
+
+class Attachment:  # pylint: disable=too-few-public-methods
+    """Metadata of a received attachment (the content is not downloaded)."""
+
+    __slots__ = ("id", "content_type", "filename", "size")
+
+    def __init__(self, attachment: dict[str, Any]) -> None:
+        """Initialize the attachment from the raw attachment metadata."""
+        self.id: Optional[str] = attachment.get("id")  # pylint: disable=invalid-name
+        self.content_type: Optional[str] = attachment.get("contentType")
+        self.filename: Optional[str] = attachment.get("filename")
+        self.size: Optional[int] = attachment.get("size")
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the attachment as a dictionary."""
+        return {
+            "id": self.id,
+            "content_type": self.content_type,
+            "filename": self.filename,
+            "size": self.size,
+        }
+
+
+class Quote:  # pylint: disable=too-few-public-methods
+    """Message quoted by a reply."""
+
+    __slots__ = ("id", "author", "text")
+
+    def __init__(self, quote: dict[str, Any]) -> None:
+        """Initialize the quote from the raw quote."""
+        self.id: Optional[int] = quote.get("id")  # pylint: disable=invalid-name
+        self.author: Optional[str] = quote.get("authorNumber") or quote.get(
+            "authorUuid"
+        )
+        self.text: Optional[str] = quote.get("text")
+
+
+class Mention:  # pylint: disable=too-few-public-methods
+    """Mention of a user in the message body."""
+
+    __slots__ = ("number", "uuid", "start", "length")
+
+    def __init__(self, mention: dict[str, Any]) -> None:
+        """Initialize the mention from the raw mention."""
+        self.number: Optional[str] = mention.get("number")
+        self.uuid: Optional[str] = mention.get("uuid")
+        self.start: int = mention.get("start", 0)
+        self.length: int = mention.get("length", 0)
+
+
+class Envelope:
+    """Received data message, with sub-objects built on first access.
+
+    Examples:
+        >>> envelope = Envelope({"envelope": {
+        ...     "sourceNumber": "+33600000000",
+        ...     "timestamp": 1700000000000,
+        ...     "dataMessage": {"message": "Hello", "groupInfo": {"groupId": "abcd"}},
+        ... }})
+        >>> envelope.sender.id, envelope.body, envelope.group.id
+        ('+33600000000', 'Hello', 'abcd')
+        >>> envelope.as_event_data()["reply_to"]
+        'group.YWJjZA=='
+    """
+
+    __slots__ = (
+        "_raw",
+        "_sender",
+        "_group",
+        "_attachments",
+        "_quote",
+        "_mentions",
+    )
+
+    def __init__(self, msg: dict[str, Any]) -> None:
+        """Initialize the envelope from a raw received message.
+
+        Args:
+            msg: Message received from Signal-cli-rest-api (with an "envelope" key)
+        """
+        self._raw: dict[str, Any] = msg.get("envelope") or {}
+        self._sender: Any = _UNSET
+        self._group: Any = _UNSET
+        self._attachments: Any = _UNSET
+        self._quote: Any = _UNSET
+        self._mentions: Any = _UNSET
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        """Return the raw envelope."""
+        return self._raw
+
+    @property
+    def _data_message(self) -> dict[str, Any]:
+        return self._raw.get("dataMessage") or {}
+
+    @property
+    def timestamp(self) -> Optional[int]:
+        """Return the timestamp of the message (milliseconds since epoch)."""
+        return self._data_message.get("timestamp") or self._raw.get("timestamp")
+
+    @property
+    def body(self) -> Optional[str]:
+        """Return the message text."""
+        return self._data_message.get("message")
+
+    @property
+    def sender(self) -> Sender:
+        """Return the sender of the message."""
+        if self._sender is _UNSET:
+            self._sender = Sender(self._raw)
+        return self._sender
+
+    @property
+    def group(self) -> Optional[Group]:
+        """Return the group of the message, or None for a direct message."""
+        if self._group is _UNSET:
+            group_info = self._data_message.get("groupInfo")
+            self._group = Group(group_info) if group_info else None
+        return self._group
+
+    @property
+    def attachments(self) -> list[Attachment]:
+        """Return the attachments of the message."""
+        if self._attachments is _UNSET:
+            self._attachments = [
+                Attachment(attachment)
+                for attachment in self._data_message.get("attachments") or []
+            ]
+        return self._attachments
+
+    @property
+    def quote(self) -> Optional[Quote]:
+        """Return the quoted message if the message is a reply."""
+        if self._quote is _UNSET:
+            quote = self._data_message.get("quote")
+            self._quote = Quote(quote) if quote else None
+        return self._quote
+
+    @property
+    def mentions(self) -> list[Mention]:
+        """Return the mentions of the message."""
+        if self._mentions is _UNSET:
+            self._mentions = [
+                Mention(mention) for mention in self._data_message.get("mentions") or []
+            ]
+        return self._mentions
+
+    def as_event_data(self, include_envelope: bool = False) -> dict[str, Any]:
+        """Return the flat, size-bounded payload of the received event.
+
+        Args:
+            include_envelope: Whether to add the full raw envelope
+
+        Returns:
+            The event data
+        """
+        sender = self.sender
+        group = self.group
+        quote = self.quote
+        data: dict[str, Any] = {
+            "timestamp": self.timestamp,
+            "sender": sender.id,
+            "sender_uuid": sender.uuid,
+            "sender_name": sender.name,
+            "message": _truncate(self.body, MAX_EVENT_MESSAGE_LENGTH),
+            "group_id": group.id if group else None,
+            "reply_to": group.target if group else sender.id,
+            "attachments": [
+                attachment.as_dict()
+                for attachment in self.attachments[:MAX_EVENT_ITEMS]
+            ],
+            "mentions": [
+                mention.number or mention.uuid
+                for mention in self.mentions[:MAX_EVENT_ITEMS]
+            ],
+            "quote": (
+                {
+                    "id": quote.id,
+                    "author": quote.author,
+                    "text": _truncate(quote.text, MAX_EVENT_QUOTE_LENGTH),
+                }
+                if quote
+                else None
+            ),
+        }
+        if include_envelope:
+            data["envelope"] = self._raw
+        return data
@@ -0,0 +1,162 @@
+"""Filtering of incoming Signal messages before they are dispatched."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import re
+from typing import Any, Iterable, Optional
+
+
+def normalize_group_id(group_id: str) -> str:
+    """Return the internal ID of a group.
+
+    Signal-cli-rest-api sends to groups using "group.<base64 internal id>" while
+    received messages carry the internal ID. Both forms are accepted.
+
+    Examples:
+        >>> normalize_group_id("group.YWJjZA==")
+        'abcd'
+        >>> normalize_group_id("abcd")
+        'abcd'
+    """
+    if group_id.startswith("group."):
+        try:
+            return base64.b64decode(group_id[6:], validate=True).decode("utf-8")
+        except (binascii.Error, UnicodeDecodeError):
+            return group_id
+    return group_id
+
+
+def parse_group_sampling(sampling_str: str) -> dict[str, int]:
+    """Parse per-group sampling rules "group_id: N" separated by newlines/commas.
+
+    Only one message out of N is kept for the group.
+
+    Raises:
+        ValueError: If a rule is malformed
+
+    Examples:
+        >>> parse_group_sampling("group.YWJjZA==: 10\\nefgh:2, ijkl: 3")
+        {'abcd': 10, 'efgh': 2, 'ijkl': 3}
+        >>> parse_group_sampling("")
+        {}
+    """
+    sampling = {}
+    for line in sampling_str.replace(",", "\n").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        group_id, separator, rate = line.rpartition(":")
+        if not separator or not group_id.strip():
+            raise ValueError(f"Invalid sampling rule (expected 'group_id: N'): {line}")
+        try:
+            every = int(rate)
+        except ValueError as err:
+            raise ValueError(f"Invalid sampling rate: {line}") from err
+        if every < 1:
+            raise ValueError(f"Sampling rate must be at least 1: {line}")
+        sampling[normalize_group_id(group_id.strip())] = every
+    return sampling
+
+
+class MessageFilter:
+    """Decide whether an incoming message is delivered.
+
+    Rules are compiled once (frozensets and a compiled regex) so evaluating a
+    message is cheap. Group rules only apply to group messages.
+    """
+
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        sender_allowlist: Iterable[str] = (),
+        sender_denylist: Iterable[str] = (),
+        group_allowlist: Iterable[str] = (),
+        message_regex: Optional[str] = None,
+        group_sampling: Optional[dict[str, int]] = None,
+    ) -> None:
+        """Initialize the filter.
+
+        Args:
+            sender_allowlist: Only deliver messages from these senders
+            sender_denylist: Never deliver messages from these senders
+            group_allowlist: Only deliver group messages from these groups
+            message_regex: Only deliver messages whose text matches this regex
+            group_sampling: Only deliver one message out of N for these groups
+
+        Raises:
+            re.error: If the message regex is invalid
+        """
+        self._sender_allowlist = frozenset(sender_allowlist)
+        self._sender_denylist = frozenset(sender_denylist)
+        self._group_allowlist = frozenset(
+            normalize_group_id(group_id) for group_id in group_allowlist
+        )
+        self._message_regex = re.compile(message_regex) if message_regex else None
+        self._group_sampling = dict(group_sampling or {})
+        self._sampling_counters: dict[str, int] = {}
+        self.rejected: dict[str, int] = {
+            "sender": 0,
+            "group": 0,
+            "message": 0,
+            "sampling": 0,
+        }
+
+    @property
+    def is_empty(self) -> bool:
+        """Return True if the filter accepts every message."""
+        return not (
+            self._sender_allowlist
+            or self._sender_denylist
+            or self._group_allowlist
+            or self._message_regex
+            or self._group_sampling
+        )
+
+    def _sender_allowed(self, envelope: dict[str, Any]) -> bool:
+        senders = {
+            envelope.get("source"),
+            envelope.get("sourceNumber"),
+            envelope.get("sourceUuid"),
+        }
+        senders.discard(None)
+        if self._sender_denylist and not self._sender_denylist.isdisjoint(senders):
+            return False
+        if self._sender_allowlist and self._sender_allowlist.isdisjoint(senders):
+            return False
+        return True
+
+    def _sampled(self, group_id: str) -> bool:
+        every = self._group_sampling.get(group_id)
+        if every is None:
+            return True
+        count = self._sampling_counters.get(group_id, 0)
+        self._sampling_counters[group_id] = count + 1
+        return count % every == 0
+
+    def __call__(self, msg: dict[str, Any]) -> bool:
+        """Return True if the message must be delivered."""
+        envelope = msg.get("envelope", {})
+        data_message = envelope.get("dataMessage") or {}
+
+        if not self._sender_allowed(envelope):
+            self.rejected["sender"] += 1
+            return False
+
+        group_id = (data_message.get("groupInfo") or {}).get("groupId")
+        if group_id and self._group_allowlist and group_id not in self._group_allowlist:
+            self.rejected["group"] += 1
+            return False
+
+        if self._message_regex and not self._message_regex.search(
+            data_message.get("message") or ""
+        ):
+            self.rejected["message"] += 1
+            return False
+
+        if group_id and not self._sampled(group_id):
+            self.rejected["sampling"] += 1
+            return False
+
+        return True
@@ -2,26 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import time
+from collections.abc import AsyncIterator
 from typing import Any, Optional
 
 import aiohttp
 
+from .timeouts import AdaptiveTimeout
+
 _LOGGER = logging.getLogger(__name__)
 
+ATTACHMENT_CHUNK_SIZE = 65536
+# Timeout (in seconds) of the requests describing the API
+PROBE_TIMEOUT = 5
+
 
-class SignalHTTPClient:  # pylint: disable=too-few-public-methods
+class SignalHTTPClient:
     """HTTP client for Signal-cli-rest-api.
 
     See https://github.com/bbernhard/signal-cli-rest-api
     """
 
-    def __init__(self, api_url: str, phone_number: str, session: aiohttp.ClientSession):
+    def __init__(
+        self,
+        api_url: str,
+        phone_number: str,
+        session: aiohttp.ClientSession,
+        timeouts: Optional[AdaptiveTimeout] = None,
+    ):
         """Initialize the HTTP client."""
         self.api_url = api_url.rstrip("/")
         self.phone_number = phone_number
         self.session = session
+        self.timeouts = timeouts or AdaptiveTimeout()
 
     async def send_message(
         self,
@@ -60,11 +76,17 @@ class SignalHTTPClient:  # pylint: disable=too-few-public-methods
             len(base64_attachments) if base64_attachments else 0,
         )
 
+        payload_size = len(message) + sum(
+            len(attachment) for attachment in base64_attachments or []
+        )
+        timeout = self.timeouts.timeout("/v2/send", payload_size)
+        start = time.monotonic()
+
         try:
             async with self.session.post(
                 f"{self.api_url}/v2/send",
                 json=payload,
-                timeout=aiohttp.ClientTimeout(total=30),
+                timeout=aiohttp.ClientTimeout(total=timeout),
             ) as response:
                 response_text = await response.text()
 
@@ -84,12 +106,128 @@ class SignalHTTPClient:  # pylint: disable=too-few-public-methods
                         f"Signal API error: {response.status} - {response_text}"
                     )
 
+                self.timeouts.record("/v2/send", payload_size, time.monotonic() - start)
                 try:
                     return await response.json()
                 except (aiohttp.ContentTypeError, json.JSONDecodeError):
                     # If JSON parsing fails, return the text
                     _LOGGER.warning("Response is not valid JSON: %s", response_text)
                     return {"success": True, "response": response_text}
+        except TimeoutError:
+            _LOGGER.error("Signal API did not answer within %.0f seconds", timeout)
+            self.timeouts.record_timeout("/v2/send", payload_size)
+            raise
         except aiohttp.ClientError as err:
             _LOGGER.error("Error connecting to Signal API: %s", err)
             raise
+
+    async def set_typing_indicator(self, recipient: str, typing: bool = True) -> None:
+        """Show or hide the typing indicator for a recipient.
+
+        Args:
+            recipient: Phone number or group ID the indicator is shown to
+            typing: True to show the indicator, False to hide it
+
+        Raises:
+            RuntimeError: If the API returns an error status
+            aiohttp.ClientError: If the API cannot be reached
+        """
+        method = self.session.put if typing else self.session.delete
+        endpoint = "/v1/typing-indicator"
+        start = time.monotonic()
+        try:
+            async with method(
+                f"{self.api_url}{endpoint}/{self.phone_number}",
+                json={"recipient": recipient},
+                timeout=aiohttp.ClientTimeout(total=self.timeouts.timeout(endpoint)),
+            ) as response:
+                if response.status >= 300:
+                    response_text = await response.text()
+                    raise RuntimeError(
+                        f"Signal API error: {response.status} - {response_text}"
+                    )
+        except TimeoutError:
+            self.timeouts.record_timeout(endpoint, 0)
+            raise
+        self.timeouts.record(endpoint, 0, time.monotonic() - start)
+
+    async def iter_attachment(
+        self, attachment_id: str, size: int = 0
+    ) -> AsyncIterator[bytes]:
+        """Stream the content of a received attachment.
+
+        Args:
+            attachment_id: ID of the attachment (from the received envelope)
+            size: Expected size in bytes, used to compute the timeout
+
+        Yields:
+            Chunks of the attachment content
+
+        Raises:
+            RuntimeError: If the API returns an error status
+            aiohttp.ClientError: If the API cannot be reached
+        """
+        endpoint = "/v1/attachments"
+        start = time.monotonic()
+        received = 0
+        try:
+            async with self.session.get(
+                f"{self.api_url}{endpoint}/{attachment_id}",
+                timeout=aiohttp.ClientTimeout(
+                    total=self.timeouts.timeout(endpoint, size)
+                ),
+            ) as response:
+                if response.status >= 300:
+                    response_text = await response.text()
+                    raise RuntimeError(
+                        f"Signal API error: {response.status} - {response_text}"
+                    )
+                async for chunk in response.content.iter_chunked(ATTACHMENT_CHUNK_SIZE):
+                    received += len(chunk)
+                    yield chunk
+        except TimeoutError:
+            self.timeouts.record_timeout(endpoint, size)
+            raise
+        self.timeouts.record(endpoint, received, time.monotonic() - start)
+
+    async def _get_about(self) -> dict[str, Any]:
+        async with self.session.get(
+            f"{self.api_url}/v1/about",
+            timeout=aiohttp.ClientTimeout(total=PROBE_TIMEOUT),
+        ) as response:
+            if response.status >= 300:
+                response_text = await response.text()
+                raise RuntimeError(
+                    f"Signal API error: {response.status} - {response_text}"
+                )
+            about = await response.json()
+        if not isinstance(about, dict):
+            raise RuntimeError(f"Unexpected /v1/about response: {about}")
+        return about
+
+    async def _get_health(self) -> bool:
+        async with self.session.get(
+            f"{self.api_url}/v1/health",
+            timeout=aiohttp.ClientTimeout(total=PROBE_TIMEOUT),
+        ) as response:
+            return response.status < 300
+
+    async def probe(self) -> dict[str, Any]:
+        """Query the mode, version and health of the API.
+
+        Returns:
+            The API mode ("normal", "native" or "json-rpc"), version and build,
+            and whether signal-cli is healthy
+
+        Raises:
+            RuntimeError: If the API returns an error status
+            aiohttp.ClientError: If the API cannot be reached
+            TimeoutError: If the API does not answer within PROBE_TIMEOUT
+        """
+        about, healthy = await asyncio.gather(self._get_about(), self._get_health())
+        return {
+            "mode": about.get("mode"),
+            "version": about.get("version"),
+            "build": about.get("build"),
+            "healthy": healthy,
+        }
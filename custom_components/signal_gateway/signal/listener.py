@@ -0,0 +1,310 @@
+"""Base class of the receivers of Signal messages."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import Counter, deque
+import logging
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+
+import aiohttp
+
+from .dedup import DedupIndex, envelope_key
+
+_LOGGER = logging.getLogger(__name__)
+
+# Reasons of a disconnection shared by every transport
+DISCONNECT_CLOSED = "closed"  # Connection closed by the server
+DISCONNECT_CONNECTION_ERROR = "connection_error"  # Connection failed or broken
+# Number of recent disconnections kept for diagnostics
+DISCONNECT_HISTORY_SIZE = 10
+
+
+class SignalListener:  # pylint: disable=too-many-instance-attributes
+    """Receive Signal messages and deliver them to a message handler.
+
+    Subclasses implement `_listen`, which receives envelopes from the API until
+    the listener is stopped and passes each of them to `_handle_data`. Received
+    messages are deduplicated, then go through the filter, the flood protection
+    and the auto-responder before reaching the handler.
+    """
+
+    # Maximum number of consecutive reconnection attempts (None: never give up)
+    max_retries: Optional[int] = None
+    retry_delay: float = 1.0  # Initial delay (in seconds) between reconnections
+    max_retry_delay: float = 60.0  # Cap of the exponential backoff (in seconds)
+    # Envelopes redelivered (after a reconnection) within this time are dropped
+    dedup_window: float = 600.0
+    dedup_size: int = 1024  # Maximum number of envelopes remembered
+
+    def __init__(
+        self,
+        api_url: str,
+        phone_number: str,
+        session: aiohttp.ClientSession,
+        dedup: Optional[DedupIndex] = None,
+    ) -> None:
+        """Initialize the listener.
+
+        Args:
+            api_url: Base URL of the Signal-cli-rest-api service
+            phone_number: Phone number associated with this Signal account
+            session: aiohttp ClientSession for HTTP requests
+            dedup: Index of the envelopes already received, shared with the
+                listeners that replace this one (a new one if None)
+        """
+        self.api_url = api_url.rstrip("/")
+        self.phone_number = phone_number
+        self.session = session
+        self._task: Optional[asyncio.Task[None]] = None
+        self._message_handler: Optional[Callable[[dict[str, Any]], Any]] = None
+        self._message_filter: Optional[Callable[[dict[str, Any]], bool]] = None
+        self._auto_responder: Optional[Callable[[dict[str, Any]], bool]] = None
+        self._rate_limiter: Optional[Callable[[dict[str, Any]], bool]] = None
+        self._running = False
+        self._dedup = (
+            dedup
+            if dedup is not None
+            else DedupIndex(self.dedup_window, self.dedup_size)
+        )
+        self._reconnects = 0
+        self._connected = False
+        self._last_message_time: Optional[float] = None
+        self._receive_latency: Optional[float] = None
+        self._state_listeners: list[Callable[[], None]] = []
+        self._last_frame_at: Optional[float] = None
+        self._disconnect_reasons: Counter[str] = Counter()
+        self._recent_disconnects: deque[dict[str, Any]] = deque(
+            maxlen=DISCONNECT_HISTORY_SIZE
+        )
+        self._parsed_frames = 0
+        self._filtered_messages = 0
+        self._rate_limited_messages = 0
+
+    @property
+    def running(self) -> bool:
+        """Return True if the listener is started (connected or reconnecting)."""
+        return self._running
+
+    @property
+    def connected(self) -> bool:
+        """Return True if the listener is connected to the API."""
+        return self._connected
+
+    @property
+    def reconnects(self) -> int:
+        """Return the number of reconnections since the listener started."""
+        return self._reconnects
+
+    @property
+    def last_message_time(self) -> Optional[float]:
+        """Return the arrival time (POSIX timestamp) of the last data message."""
+        return self._last_message_time
+
+    @property
+    def receive_latency(self) -> Optional[float]:
+        """Return the delay (in seconds) between sending and receiving the last message."""
+        return self._receive_latency
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the connection and delivery statistics."""
+        return {
+            "connected": self._connected,
+            "last_message_time": self._last_message_time,
+            "receive_latency": self._receive_latency,
+            "reconnects": self._reconnects,
+            "disconnect_reasons": dict(self._disconnect_reasons),
+            "recent_disconnects": list(self._recent_disconnects),
+            "parsed_frames": self._parsed_frames,
+            "filtered_messages": self._filtered_messages,
+            "rate_limited_messages": self._rate_limited_messages,
+            "duplicate_envelopes": self._dedup.hits,
+        }
+
+    def set_message_handler(self, handler: Callable[[dict[str, Any]], Any]) -> None:
+        """Set the callback handler for incoming messages."""
+        self._message_handler = handler
+
+    def configure(self, **settings: Any) -> None:
+        """Override tuning settings (class attributes) of this listener.
+
+        Settings the transport does not have (e.g. the WebSocket heartbeat of a
+        polling listener) are ignored. They apply from the next connection.
+
+        Args:
+            **settings: Values of the tuning attributes, by name
+        """
+        tunables = {
+            name
+            for cls in type(self).__mro__
+            for name in vars(cls).get("__annotations__", {})
+        }
+        for name, value in settings.items():
+            if name in tunables:
+                setattr(self, name, value)
+
+    def add_state_listener(self, listener: Callable[[], None]) -> Callable[[], None]:
+        """Register a callback called when the connection or message state changes.
+
+        Args:
+            listener: Callback without arguments
+
+        Returns:
+            Callable removing the listener
+        """
+        self._state_listeners.append(listener)
+        return lambda: self._state_listeners.remove(listener)
+
+    def _notify_state(self) -> None:
+        """Call the state listeners."""
+        for listener in list(self._state_listeners):
+            listener()
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self._connected:
+            self._connected = connected
+            self._notify_state()
+
+    def set_message_filter(
+        self, message_filter: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> None:
+        """Set the filter deciding which received messages reach the handler.
+
+        Args:
+            message_filter: Callable returning False for messages to drop, or
+                None to deliver every message
+        """
+        self._message_filter = message_filter
+
+    def set_rate_limiter(
+        self, rate_limiter: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> None:
+        """Set the flood protection evaluated after the message filter.
+
+        Args:
+            rate_limiter: Callable returning False for messages over the limits,
+                or None to disable flood protection
+        """
+        self._rate_limiter = rate_limiter
+
+    def set_auto_responder(
+        self, responder: Optional[Callable[[dict[str, Any]], bool]]
+    ) -> None:
+        """Set the auto-responder evaluated right after a message is parsed.
+
+        Args:
+            responder: Callable scheduling a reply and returning True if the
+                message matched a rule, or None to disable auto-replies
+        """
+        self._auto_responder = responder
+
+    async def connect(self) -> None:
+        """Start listening in a background task."""
+        if self._running:
+            _LOGGER.warning("Signal listener is already running")
+            return
+        self._running = True
+        self._task = asyncio.create_task(self._listen())
+
+    async def disconnect(self) -> None:
+        """Stop listening."""
+        self._running = False
+
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error while stopping the Signal listener: %s", err)
+            finally:
+                self._task = None
+
+    async def reconnect(self) -> None:
+        """Close the current connection and reconnect immediately."""
+        if self._task is None:
+            _LOGGER.warning("Signal listener is not started, cannot reconnect")
+            return
+        _LOGGER.info("Reconnecting to Signal")
+        await self.disconnect()
+        await self.connect()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Return the delay before a reconnection attempt.
+
+        The delay grows exponentially up to max_retry_delay. Half of it is
+        random, so several listeners do not reconnect at the same time.
+        """
+        delay = min(self.retry_delay * 2 ** (attempt - 1), self.max_retry_delay)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def _listen(self) -> None:
+        """Receive messages until the listener is stopped."""
+        raise NotImplementedError
+
+    def _disconnect_cause(self, error: Optional[Exception]) -> str:
+        """Return the reason of a disconnection."""
+        return DISCONNECT_CONNECTION_ERROR if error is not None else DISCONNECT_CLOSED
+
+    def _record_disconnect(self, error: Optional[Exception]) -> None:
+        """Record the reason of a disconnection and how long the link was dead.
+
+        The dead time is the time elapsed since the last received frame, i.e.
+        how long a silent connection took to be detected.
+        """
+        reason = self._disconnect_cause(error)
+        dead_for = (
+            round(time.monotonic() - self._last_frame_at, 3)
+            if self._last_frame_at is not None
+            else None
+        )
+        self._disconnect_reasons[reason] += 1
+        self._recent_disconnects.append(
+            {
+                "time": time.time(),
+                "reason": reason,
+                "error": str(error) if error else None,
+                "dead_for": dead_for,
+            }
+        )
+
+    def is_received_msg(self, msg: Dict) -> bool:
+        """Check if the message is a 'receive' type message."""
+        envelope = msg.get("envelope", {})
+        return (
+            envelope.get("dataMessage") is not None
+            and envelope["dataMessage"].get("message") is not None
+        )
+
+    def _record_arrival(self, msg: dict[str, Any]) -> None:
+        """Record the arrival time and the latency of a data message."""
+        now = time.time()
+        sent = msg["envelope"]["dataMessage"].get("timestamp")
+        self._last_message_time = now
+        self._receive_latency = round(max(now - sent / 1000, 0), 3) if sent else None
+        self._notify_state()
+
+    async def _handle_data(self, data: dict[str, Any]) -> None:
+        """Deliver a parsed message to the auto-responder and the handler."""
+        try:
+            if self._message_handler and self.is_received_msg(data):
+                key = envelope_key(data)
+                if key is not None and self._dedup.check(key):
+                    _LOGGER.debug("Dropped duplicate envelope %s", key)
+                    return
+                self._record_arrival(data)
+                if self._message_filter and not self._message_filter(data):
+                    self._filtered_messages += 1
+                    return
+                if self._rate_limiter and not self._rate_limiter(data):
+                    self._rate_limited_messages += 1
+                    return
+                if self._auto_responder:
+                    self._auto_responder(data)
+                await self._message_handler(data)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.error("Error handling Signal message: %s", err)
@@ -0,0 +1,123 @@
+"""REST polling receiver for Signal-cli-rest-api in normal or native mode."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Optional
+
+import aiohttp
+
+from .dedup import DedupIndex
+from .listener import SignalListener
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SignalPollingListener(SignalListener):
+    """Receive Signal messages by polling GET /v1/receive/{number}.
+
+    Only the normal and native modes of Signal-cli-rest-api support receiving
+    over REST; the json-rpc mode requires the WebSocket. Received messages go
+    through the same deduplication, filter, auto-responder and handler as
+    WebSocket frames.
+
+    The interval between polls is reset to poll_interval_min when messages are
+    received and doubled up to poll_interval_max while idle.
+    """
+
+    poll_interval_min: float = 1.0  # Interval (in seconds) after activity
+    poll_interval_max: float = 30.0  # Interval (in seconds) when idle
+    receive_timeout: int = 1  # Time (in seconds) signal-cli waits for messages
+
+    def __init__(
+        self,
+        api_url: str,
+        phone_number: str,
+        session: aiohttp.ClientSession,
+        dedup: Optional[DedupIndex] = None,
+    ) -> None:
+        """Initialize the polling listener."""
+        super().__init__(api_url, phone_number, session, dedup)
+        self._poll_interval = self.poll_interval_min
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the receiver statistics."""
+        return {
+            **super().stats,
+            "poll_interval": self._poll_interval,
+        }
+
+    async def _poll(self, url: str) -> list[dict[str, Any]]:
+        """Fetch the pending messages.
+
+        Raises:
+            RuntimeError: If the API returns an error (e.g. json-rpc mode)
+            aiohttp.ClientError: If the API cannot be reached
+        """
+        async with self.session.get(
+            url,
+            params={"timeout": self.receive_timeout},
+            timeout=aiohttp.ClientTimeout(total=self.receive_timeout + 30),
+        ) as response:
+            if response.status >= 300:
+                raise RuntimeError(
+                    f"Signal API error: {response.status} - {await response.text()}"
+                )
+            messages = await response.json()
+        return messages if isinstance(messages, list) else []
+
+    async def _listen(self) -> None:
+        """Poll for messages until the listener is stopped."""
+        url = f"{self.api_url}/v1/receive/{self.phone_number}"
+        attempt = 0
+        self._poll_interval = self.poll_interval_min
+
+        try:
+            while self._running:
+                try:
+                    messages = await self._poll(url)
+                except Exception as err:  # pylint: disable=broad-except
+                    self._set_connected(False)
+                    self._record_disconnect(err)
+                    attempt += 1
+                    if self.max_retries is not None and attempt > self.max_retries:
+                        _LOGGER.error(
+                            "Failed to poll Signal messages after %d retries: %s",
+                            self.max_retries,
+                            err,
+                        )
+                        self._running = False
+                        break
+                    delay = self._backoff_delay(attempt)
+                    _LOGGER.warning(
+                        "Failed to poll Signal messages (attempt %d): %s. "
+                        "Retrying in %.1f seconds...",
+                        attempt,
+                        err,
+                        delay,
+                    )
+                    await asyncio.sleep(delay)
+                    self._reconnects += 1
+                    self._notify_state()
+                    continue
+
+                attempt = 0
+                self._last_frame_at = time.monotonic()
+                self._set_connected(True)
+                for msg in messages:
+                    self._parsed_frames += 1
+                    await self._handle_data(msg)
+
+                if messages:
+                    self._poll_interval = self.poll_interval_min
+                else:
+                    self._poll_interval = min(
+                        self._poll_interval * 2, self.poll_interval_max
+                    )
+                await asyncio.sleep(self._poll_interval)
+        finally:
+            self._set_connected(False)
+            _LOGGER.info("Signal polling receiver stopped")
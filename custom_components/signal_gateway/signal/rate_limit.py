@@ -0,0 +1,175 @@
+"""Flood protection of incoming messages with per-source token buckets."""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+# Maximum number of buckets, and of sources with their own dropped counts (per
+# kind). Idle (full) buckets are forgotten first, then the least recently used.
+MAX_SOURCES: int = 1024
+# Source under which the drops of the sources over MAX_SOURCES are counted
+OTHER_SOURCES = "*"
+
+
+class _TokenBucket:  # pylint: disable=too-few-public-methods
+    """Tokens available to a sender or a group."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float) -> None:
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """Limit the number of messages per minute of each sender and each group.
+
+    Each source has a bucket holding up to `rate` tokens, refilled continuously
+    at `rate` tokens per period. A message takes one token from the bucket of
+    its sender and, for group messages, one from the bucket of its group; it is
+    rejected if any of them is empty. A burst of `rate` messages is therefore
+    accepted, then one message every period / rate seconds.
+
+    At most MAX_SOURCES buckets are kept, in least recently used order like
+    the dedup index, and dropped messages are counted per source for at most
+    MAX_SOURCES sources of each kind (the others under OTHER_SOURCES).
+
+    Examples:
+        >>> limiter = RateLimiter(sender_rate=2)
+        >>> msg = {"envelope": {"sourceNumber": "+33600000000", "dataMessage": {}}}
+        >>> limiter(msg), limiter(msg), limiter(msg)
+        (True, True, False)
+        >>> limiter.dropped
+        {'senders': {'+33600000000': 1}, 'groups': {}}
+        >>> limiter.stats
+        {'senders': {'sources': 1, 'dropped': 1}, 'groups': {'sources': 0, 'dropped': 0}}
+    """
+
+    def __init__(
+        self, sender_rate: float = 0, group_rate: float = 0, period: float = 60.0
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            sender_rate: Messages per period accepted from each sender (0: no limit)
+            group_rate: Messages per period accepted in each group (0: no limit)
+            period: Period of the rates, in seconds
+        """
+        self.sender_rate = sender_rate
+        self.group_rate = group_rate
+        self.period = period
+        self._buckets: OrderedDict[tuple[str, str], _TokenBucket] = OrderedDict()
+        self._dropped: dict[str, Counter[str]] = {
+            "senders": Counter(),
+            "groups": Counter(),
+        }
+        self._pending: dict[str, Counter[str]] = {
+            "senders": Counter(),
+            "groups": Counter(),
+        }
+
+    @property
+    def is_empty(self) -> bool:
+        """Return True if no limit is configured."""
+        return not (self.sender_rate > 0 or self.group_rate > 0)
+
+    @property
+    def dropped(self) -> dict[str, dict[str, int]]:
+        """Return the number of dropped messages of each sender and group."""
+        return {kind: dict(counter) for kind, counter in self._dropped.items()}
+
+    @property
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Return the number of limited sources and dropped messages of each kind.
+
+        Unlike `dropped`, the senders and groups themselves are not reported.
+        """
+        return {
+            kind: {
+                "sources": len(counter) - (OTHER_SOURCES in counter),
+                "dropped": counter.total(),
+            }
+            for kind, counter in self._dropped.items()
+        }
+
+    def pop_summary(self) -> dict[str, dict[str, int]]:
+        """Return the messages dropped since the last call, and reset them.
+
+        Returns:
+            Dropped messages per sender and per group (empty if none)
+        """
+        if not any(self._pending.values()):
+            return {}
+        summary = {kind: dict(counter) for kind, counter in self._pending.items()}
+        for counter in self._pending.values():
+            counter.clear()
+        return summary
+
+    def _bucket(self, kind: str, source: str, rate: float, now: float) -> _TokenBucket:
+        """Return the refilled bucket of a source."""
+        bucket = self._buckets.get((kind, source))
+        if bucket is None:
+            if len(self._buckets) >= MAX_SOURCES:
+                self._prune(now)
+            bucket = self._buckets[(kind, source)] = _TokenBucket(rate, now)
+        else:
+            refill = (now - bucket.updated) * rate / self.period
+            bucket.tokens = min(rate, bucket.tokens + refill)
+            bucket.updated = now
+            self._buckets.move_to_end((kind, source))
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        """Forget the least recently used buckets to make room for a new one.
+
+        Buckets that are full again are forgotten first, from the least
+        recently used one: a new bucket is full too. If none is, the least
+        recently used bucket is forgotten anyway, its source getting a new burst.
+        """
+        while self._buckets:
+            (kind, _source), bucket = next(iter(self._buckets.items()))
+            rate = self.sender_rate if kind == "senders" else self.group_rate
+            refilled = bucket.tokens + (now - bucket.updated) * rate / self.period
+            if refilled < rate and len(self._buckets) < MAX_SOURCES:
+                break
+            self._buckets.popitem(last=False)
+
+    def _drop(self, kind: str, source: str) -> bool:
+        for counter in (self._dropped[kind], self._pending[kind]):
+            if source not in counter and len(counter) >= MAX_SOURCES - 1:
+                counter[OTHER_SOURCES] += 1
+            else:
+                counter[source] += 1
+        return False
+
+    def __call__(self, msg: dict[str, Any]) -> bool:
+        """Return True if the message is within the limits (and count it)."""
+        envelope = msg.get("envelope") or {}
+        now = time.monotonic()
+
+        sender_bucket: Optional[_TokenBucket] = None
+        sender = (
+            envelope.get("sourceNumber")
+            or envelope.get("source")
+            or envelope.get("sourceUuid")
+        )
+        if self.sender_rate > 0 and sender:
+            sender_bucket = self._bucket("senders", sender, self.sender_rate, now)
+            if sender_bucket.tokens < 1:
+                return self._drop("senders", sender)
+
+        group_bucket: Optional[_TokenBucket] = None
+        group_info = (envelope.get("dataMessage") or {}).get("groupInfo") or {}
+        group_id = group_info.get("groupId")
+        if self.group_rate > 0 and group_id:
+            group_bucket = self._bucket("groups", group_id, self.group_rate, now)
+            if group_bucket.tokens < 1:
+                return self._drop("groups", group_id)
+
+        if sender_bucket:
+            sender_bucket.tokens -= 1
+        if group_bucket:
+            group_bucket.tokens -= 1
+        return True
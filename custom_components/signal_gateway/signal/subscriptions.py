@@ -0,0 +1,156 @@
+"""Fan-out of received messages to independent subscribers."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import inspect
+import logging
+from typing import Any, Callable, Optional
+
+_LOGGER = logging.getLogger(__name__)
+
+# Maximum number of messages waiting in the queue of a subscriber
+DEFAULT_QUEUE_SIZE: int = 100
+
+
+class Subscription:  # pylint: disable=too-many-instance-attributes
+    """A consumer of received messages, with its own bounded queue and filter.
+
+    Messages are offered without waiting: when the queue is full, its oldest
+    message is dropped. A slow consumer therefore only loses its own messages
+    and never delays the listener or the other subscribers. Messages are
+    shared between subscribers and must not be modified.
+
+    A subscription is consumed either by a handler task (see `start`) or by
+    iterating over it, until it is closed.
+
+    Examples:
+        >>> subscription = Subscription(queue_size=2)
+        >>> for text in ("a", "b", "c"):
+        ...     subscription.offer({"text": text})
+        >>> subscription.dropped, subscription.queue_depth
+        (1, 2)
+    """
+
+    def __init__(
+        self,
+        message_filter: Optional[Callable[[dict[str, Any]], bool]] = None,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        name: Optional[str] = None,
+    ) -> None:
+        """Initialize the subscription.
+
+        Args:
+            message_filter: Callable returning False for messages to skip, or
+                None to receive every message
+            queue_size: Maximum number of messages waiting to be consumed
+            name: Name of the subscriber, reported in the statistics
+        """
+        self.name = name
+        self.message_filter = message_filter
+        # None marks the end of the subscription
+        self._queue: asyncio.Queue[Optional[dict[str, Any]]] = asyncio.Queue(
+            max(queue_size, 1)
+        )
+        self._task: Optional[asyncio.Task[None]] = None
+        self._closed = False
+        self.queued = 0
+        self.dropped = 0
+        self.filtered = 0
+
+    @property
+    def closed(self) -> bool:
+        """Return True once the subscription is closed."""
+        return self._closed
+
+    @property
+    def queue_depth(self) -> int:
+        """Return the number of messages waiting to be consumed."""
+        return self._queue.qsize()
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the subscription statistics."""
+        return {
+            "name": self.name,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "queued": self.queued,
+            "dropped": self.dropped,
+            "filtered": self.filtered,
+        }
+
+    def _put(self, item: Optional[dict[str, Any]]) -> None:
+        """Queue an item, dropping the oldest message if the queue is full."""
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(item)
+
+    def offer(self, msg: dict[str, Any]) -> None:
+        """Queue a received message if it passes the filter."""
+        if self._closed:
+            return
+        if self.message_filter is not None:
+            try:
+                accepted = self.message_filter(msg)
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error in filter of subscriber %s: %s", self.name, err)
+                accepted = False
+            if not accepted:
+                self.filtered += 1
+                return
+        self._put(msg)
+        self.queued += 1
+
+    def close(self) -> None:
+        """End the subscription.
+
+        Iterators receive the messages already queued, then stop. The handler
+        task, if any, is cancelled.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._put(None)
+        if self._task is not None:
+            self._task.cancel()
+
+    async def async_close(self) -> None:
+        """End the subscription and wait for the handler task to stop."""
+        self.close()
+        if self._task is not None:
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+
+    def start(self, handler: Callable[[dict[str, Any]], Any]) -> None:
+        """Consume the queued messages with a handler, in a dedicated task.
+
+        Args:
+            handler: Callable or coroutine function receiving each message
+        """
+        self._task = asyncio.create_task(self._run(handler))
+
+    async def _run(self, handler: Callable[[dict[str, Any]], Any]) -> None:
+        """Call the handler for each message until the subscription is closed."""
+        async for msg in self:
+            try:
+                result = handler(msg)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as err:  # pylint: disable=broad-except
+                _LOGGER.error("Error in handler of subscriber %s: %s", self.name, err)
+
+    def __aiter__(self) -> Subscription:
+        """Return the subscription, an async iterator over its messages."""
+        return self
+
+    async def __anext__(self) -> dict[str, Any]:
+        """Wait for the next message."""
+        msg = await self._queue.get()
+        if msg is None:
+            # Let other iterations of a closed subscription stop as well
+            self._queue.put_nowait(None)
+            raise StopAsyncIteration
+        return msg
@@ -0,0 +1,155 @@
+"""Adaptive request timeouts for Signal-cli-rest-api and attachment downloads."""
+
+from __future__ import annotations
+
+from typing import Any
+
+# Bounds of the computed timeouts (in seconds)
+DEFAULT_TIMEOUT_FLOOR: float = 10.0
+DEFAULT_TIMEOUT_CEILING: float = 300.0
+# Initial estimates, used until an endpoint has been observed
+DEFAULT_LATENCY: float = 2.0  # seconds
+DEFAULT_THROUGHPUT: float = 131072.0  # bytes per second
+# Upper bound of a throughput sample (100 Mbit/s): a transfer much faster than
+# the estimated latency would otherwise be divided by a near-zero duration
+MAX_THROUGHPUT: float = 12_500_000.0  # bytes per second
+# Requests smaller than this mostly measure latency, larger ones throughput
+LATENCY_SAMPLE_MAX_SIZE: int = 65536
+
+
+class _EndpointEstimate:  # pylint: disable=too-few-public-methods
+    """Rolling latency and throughput estimate of a single endpoint."""
+
+    __slots__ = (
+        "latency",
+        "throughput",
+        "latency_samples",
+        "throughput_samples",
+        "timeouts",
+    )
+
+    def __init__(self) -> None:
+        self.latency: float = DEFAULT_LATENCY
+        self.throughput: float = DEFAULT_THROUGHPUT
+        self.latency_samples: int = 0
+        self.throughput_samples: int = 0
+        self.timeouts: int = 0
+
+
+class AdaptiveTimeout:
+    """Compute request timeouts from payload size and observed performance.
+
+    An exponentially weighted moving average of latency and throughput is kept
+    per endpoint. The timeout of a request is the expected duration multiplied
+    by a safety factor, bounded by a floor and a ceiling. A request that timed
+    out halves the throughput estimate (or doubles the latency estimate), so
+    the next attempt gets a longer timeout.
+
+    Examples:
+        >>> timeouts = AdaptiveTimeout(floor=5, ceiling=60)
+        >>> timeouts.timeout("send", 0)
+        6.0
+        >>> timeouts.timeout("send", 100_000_000)
+        60
+        >>> timeouts.record("send", 1000, 0.5)
+        >>> timeouts.timeout("send", 0)
+        5
+        >>> timeouts.record_timeout("send", 0)
+        >>> timeouts.timeout("send", 0)
+        5
+        >>> timeouts.record_timeout("send", 0)
+        >>> timeouts.timeout("send", 0)
+        6.0
+    """
+
+    def __init__(
+        self,
+        floor: float = DEFAULT_TIMEOUT_FLOOR,
+        ceiling: float = DEFAULT_TIMEOUT_CEILING,
+        safety_factor: float = 3.0,
+        smoothing: float = 0.2,
+    ) -> None:
+        """Initialize the timeout estimator.
+
+        Args:
+            floor: Minimum timeout in seconds
+            ceiling: Maximum timeout in seconds
+            safety_factor: Multiplier applied to the expected request duration
+            smoothing: Weight of a new observation in the moving averages
+        """
+        self.floor = floor
+        self.ceiling = ceiling
+        self.safety_factor = safety_factor
+        self.smoothing = smoothing
+        self._estimates: dict[str, _EndpointEstimate] = {}
+
+    def _get(self, endpoint: str) -> _EndpointEstimate:
+        estimate = self._estimates.get(endpoint)
+        if estimate is None:
+            estimate = self._estimates[endpoint] = _EndpointEstimate()
+        return estimate
+
+    def timeout(self, endpoint: str, size: int = 0) -> float:
+        """Return the timeout (in seconds) for a request to an endpoint.
+
+        Args:
+            endpoint: Endpoint identifier (API path or remote host)
+            size: Payload size in bytes (uploaded or expected to be downloaded)
+        """
+        estimate = self._estimates.get(endpoint)
+        latency = estimate.latency if estimate else DEFAULT_LATENCY
+        throughput = estimate.throughput if estimate else DEFAULT_THROUGHPUT
+        expected = latency + size / throughput
+        return min(max(expected * self.safety_factor, self.floor), self.ceiling)
+
+    def record(self, endpoint: str, size: int, elapsed: float) -> None:
+        """Record a successful request to update the endpoint estimates.
+
+        Args:
+            endpoint: Endpoint identifier (API path or remote host)
+            size: Payload size in bytes
+            elapsed: Request duration in seconds
+        """
+        estimate = self._get(endpoint)
+        if size <= LATENCY_SAMPLE_MAX_SIZE:
+            # The first observation replaces the default estimate
+            alpha = self.smoothing if estimate.latency_samples else 1.0
+            estimate.latency += alpha * (elapsed - estimate.latency)
+            estimate.latency_samples += 1
+            return
+        transfer_time = elapsed - estimate.latency
+        if transfer_time <= 0:
+            # Faster than the estimated latency: the transfer time is unknown
+            return
+        # Always blended: a single lucky transfer must not shorten the
+        # timeouts of every following large request
+        throughput = min(size / transfer_time, MAX_THROUGHPUT)
+        estimate.throughput += self.smoothing * (throughput - estimate.throughput)
+        estimate.throughput_samples += 1
+
+    def record_timeout(self, endpoint: str, size: int) -> None:
+        """Record a request that timed out, to back off the endpoint estimates.
+
+        Args:
+            endpoint: Endpoint identifier (API path or remote host)
+            size: Payload size in bytes
+        """
+        estimate = self._get(endpoint)
+        estimate.timeouts += 1
+        if size <= LATENCY_SAMPLE_MAX_SIZE:
+            estimate.latency = min(estimate.latency * 2, self.ceiling)
+        else:
+            estimate.throughput = max(estimate.throughput / 2, size / self.ceiling)
+
+    def estimates(self) -> dict[str, dict[str, Any]]:
+        """Return the learned estimates of every endpoint, for diagnostics."""
+        return {
+            endpoint: {
+                "latency": round(estimate.latency, 3),
+                "throughput": round(estimate.throughput),
+                "samples": estimate.latency_samples + estimate.throughput_samples,
+                "timeouts": estimate.timeouts,
+                "timeout_no_payload": round(self.timeout(endpoint), 3),
+            }
+            for endpoint, estimate in self._estimates.items()
+        }
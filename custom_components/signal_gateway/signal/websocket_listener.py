@@ -3,115 +3,250 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
 import logging
-from typing import Any, Callable, Dict, Optional
+import time
+from typing import Any, Optional
 
 import aiohttp
 
+from .dedup import DedupIndex
+from .listener import DISCONNECT_CLOSED, SignalListener
+
 _LOGGER = logging.getLogger(__name__)
 
+# Overflow policies of the queue between the WebSocket reader and the dispatcher
+OVERFLOW_BLOCK = "block"  # Stop reading the WebSocket until there is room
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # Drop the oldest queued frame
+OVERFLOW_POLICIES = [OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST]
+
+# Reasons of a disconnection specific to the WebSocket
+DISCONNECT_ERROR = "error"  # Error frame received
+DISCONNECT_HEARTBEAT = "heartbeat_timeout"  # No answer to a heartbeat ping
+DISCONNECT_IDLE = "idle_timeout"  # Nothing, not even a pong, for idle_timeout
+
+# signal-cli serializes the envelope fields in a fixed order: the sender fields
+# (source, number, UUID, name, device, timestamp) come first, then the message
+# type key. The "dataMessage" key is therefore found within the first few
+# hundred characters, before the message body. This is an assumption on the
+# serialization, not on JSON: a frame whose key comes after RAW_SCAN_LIMIT
+# characters (e.g. after a very long source name, or from a server ordering
+# the fields differently) is skipped as a non-data frame, without any error.
+DATA_MESSAGE_KEY = '"dataMessage"'
+RAW_SCAN_LIMIT = 4096
+
+
+def is_data_frame(frame: str) -> bool:
+    """Check on the raw frame whether it may contain a data message.
+
+    Receipts, typing indicators and sync messages are skipped without being
+    decoded. A quote inside a JSON string is escaped, so the key cannot be
+    matched by message content. False positives are rejected after parsing.
+
+    Examples:
+        >>> is_data_frame('{"envelope":{"source":"+1","dataMessage":{"message":"hi"}}}')
+        True
+        >>> is_data_frame('{"envelope":{"source":"+1","receiptMessage":{"isRead":true}}}')
+        False
+        >>> is_data_frame('{"envelope":{"typingMessage":{"action":"STARTED"}}}')
+        False
+    """
+    return frame.find(DATA_MESSAGE_KEY, 0, RAW_SCAN_LIMIT) != -1
+
 
-class SignalWebSocketListener:
-    """Listen for incoming Signal messages via WebSocket."""
+class SignalWebSocketListener(
+    SignalListener
+):  # pylint: disable=too-many-instance-attributes
+    """Listen for incoming Signal messages via WebSocket.
 
-    max_retries: int = (
-        10  # Maximum number of connection retry attempts before giving up
-    )
-    retry_delay: int = 5  # Delay (in seconds) between connection retry attempts
+    Frames are read from the WebSocket and, unless they have no data message,
+    put in a bounded queue, from which a dispatcher task parses them and calls
+    the message handler. A slow handler therefore does not stop the WebSocket
+    from being read.
+    """
+
+    stable_connection_time: float = 60.0  # Connected time resetting the backoff
+    # Interval (in seconds) of the ping frames detecting half-open connections;
+    # the connection is closed if no pong is received within half of it
+    heartbeat: Optional[float] = 15.0
+    # Reconnect when nothing is received for this time (in seconds, None: never).
+    # Heartbeat pongs count as activity, so a quiet account is not disconnected
+    # as long as idle_timeout is longer than the heartbeat interval.
+    idle_timeout: Optional[float] = 60.0
+    compress: int = 0  # Deflate window bits to negotiate (0: no compression)
+    max_msg_size: int = 4194304  # Maximum size of a received frame (4 MB)
+    queue_size: int = 100  # Maximum number of frames waiting to be dispatched
+    overflow_policy: str = OVERFLOW_BLOCK  # What to do when the queue is full
 
     def __init__(
-        self, api_url: str, phone_number: str, session: aiohttp.ClientSession
+        self,
+        api_url: str,
+        phone_number: str,
+        session: aiohttp.ClientSession,
+        dedup: Optional[DedupIndex] = None,
     ) -> None:
         """Initialize the WebSocket listener."""
-        self.api_url = api_url.rstrip("/")
-        self.phone_number = phone_number
-        self.session = session
-        self._task: Optional[asyncio.Task[None]] = None
-        self._message_handler: Optional[Callable[[dict[str, Any]], Any]] = None
-        self._running = False
+        super().__init__(api_url, phone_number, session, dedup)
+        self._queue: asyncio.Queue[tuple[float, str]] = asyncio.Queue(self.queue_size)
+        self._queue_high_water = 0
+        self._dropped_frames = 0
+        self._disconnect_reason: Optional[str] = None
+        self._connected_at: Optional[float] = None
+        self._dispatched_frames = 0
+        self._skipped_frames = 0
+        self._last_dispatch_latency = 0.0
+        self._max_dispatch_latency = 0.0
 
-    def set_message_handler(self, handler: Callable[[dict[str, Any]], Any]) -> None:
-        """Set the callback handler for incoming messages."""
-        self._message_handler = handler
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the connection, delivery and dispatch queue statistics."""
+        return {
+            **super().stats,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "queue_high_water": self._queue_high_water,
+            "overflow_policy": self.overflow_policy,
+            "dropped_frames": self._dropped_frames,
+            "dispatched_frames": self._dispatched_frames,
+            "skipped_frames": self._skipped_frames,
+            "last_dispatch_latency": round(self._last_dispatch_latency, 6),
+            "max_dispatch_latency": round(self._max_dispatch_latency, 6),
+        }
 
     async def connect(self) -> None:
         """Connect to the WebSocket and start listening."""
-        if self._running:
-            _LOGGER.warning("WebSocket listener is already running")
-            return
-        self._running = True
-        self._task = asyncio.create_task(self._listen())
-
-    async def disconnect(self) -> None:
-        """Disconnect from the WebSocket."""
-        self._running = False
-
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
-            except Exception as err:  # pylint: disable=broad-except
-                _LOGGER.error("Error while disconnecting WebSocket: %s", err)
-            finally:
-                self._task = None
+        if not self._running:
+            self._queue = asyncio.Queue(self.queue_size)
+        await super().connect()
 
     async def _listen(self) -> None:
-        """Listen for messages from the WebSocket."""
+        """Listen for messages from the WebSocket, reconnecting when it closes."""
         ws_url = f"{self.api_url.replace('http', 'ws')}/v1/receive/{self.phone_number}"
-        retry_count = 0
+        attempt = 0
+        dispatcher = asyncio.create_task(self._dispatch())
 
         try:
             while self._running:
+                self._connected_at = None
+                self._last_frame_at = None
+                self._disconnect_reason = None
                 try:
                     await self._connect_and_listen(ws_url)
-                    retry_count = 0  # Reset retry count on successful connection
+                    error: Optional[Exception] = None
                 except asyncio.CancelledError:
                     # Task was cancelled, exit cleanly
                     _LOGGER.info("WebSocket listener task cancelled")
                     raise
                 except Exception as err:  # pylint: disable=broad-except
-                    if self._running:
-                        retry_count += 1
-                        if retry_count > self.max_retries:
-                            _LOGGER.error(
-                                "Failed to connect to Signal WebSocket after %d retries: %s",
-                                self.max_retries,
-                                err,
-                            )
-                            self._running = False
-                            break
+                    error = err
+                if not self._running:
+                    break
+                self._set_connected(False)
+                self._record_disconnect(error)
 
-                        _LOGGER.warning(
-                            "Failed to connect to Signal WebSocket (attempt %d/%d): %s. "
-                            "Retrying in %d seconds...",
-                            retry_count,
-                            self.max_retries,
-                            err,
-                            self.retry_delay,
-                        )
-                        try:
-                            await asyncio.sleep(self.retry_delay)
-                        except asyncio.CancelledError:
-                            _LOGGER.info(
-                                "WebSocket listener task cancelled during retry delay"
-                            )
-                            raise
-                    else:
-                        break
+                # Reset the backoff after a connection that stayed up long enough
+                # (from the end of the handshake, which may be slow to fail)
+                if (
+                    self._connected_at is not None
+                    and time.monotonic() - self._connected_at
+                    >= self.stable_connection_time
+                ):
+                    attempt = 0
+                attempt += 1
+                if self.max_retries is not None and attempt > self.max_retries:
+                    _LOGGER.error(
+                        "Failed to connect to Signal WebSocket after %d retries: %s",
+                        self.max_retries,
+                        error,
+                    )
+                    self._running = False
+                    break
+
+                delay = self._backoff_delay(attempt)
+                _LOGGER.warning(
+                    "Signal WebSocket disconnected (attempt %d): %s. "
+                    "Reconnecting in %.1f seconds...",
+                    attempt,
+                    error or "connection closed",
+                    delay,
+                )
+                try:
+                    await asyncio.sleep(delay)
+                except asyncio.CancelledError:
+                    _LOGGER.info("WebSocket listener task cancelled during retry delay")
+                    raise
+                self._reconnects += 1
+                self._notify_state()
+            # Deliver the frames already read before stopping
+            await self._queue.join()
         finally:
+            self._set_connected(False)
+            dispatcher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await dispatcher
             _LOGGER.info("WebSocket listener stopped")
 
+    def _disconnect_cause(self, error: Optional[Exception]) -> str:
+        """Return the reason of a disconnection, as detected while listening."""
+        return self._disconnect_reason or super()._disconnect_cause(error)
+
+    async def _dispatch(self) -> None:
+        """Dispatch queued frames to the message handler, one at a time."""
+        while True:
+            enqueued_at, frame = await self._queue.get()
+            await self._handle_message(frame)
+            self._queue.task_done()
+            latency = time.monotonic() - enqueued_at
+            self._dispatched_frames += 1
+            self._last_dispatch_latency = latency
+            self._max_dispatch_latency = max(self._max_dispatch_latency, latency)
+
+    async def _enqueue(self, frame: str) -> None:
+        """Queue a frame for dispatch, applying the overflow policy when full."""
+        if self._queue.full():
+            if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._dropped_frames += 1
+                _LOGGER.debug("Dispatch queue full, dropped the oldest frame")
+        await self._queue.put((time.monotonic(), frame))
+        self._queue_high_water = max(self._queue_high_water, self._queue.qsize())
+
     async def _connect_and_listen(self, ws_url: str) -> None:
         """Connect to WebSocket and listen for messages."""
         # Use ws_close=None to avoid timeout on connection close
         timeout = aiohttp.ClientWSTimeout(ws_close=None)
-        async with self.session.ws_connect(ws_url, timeout=timeout) as websocket:
+        async with self.session.ws_connect(
+            ws_url,
+            timeout=timeout,
+            heartbeat=self.heartbeat,
+            compress=self.compress,
+            max_msg_size=self.max_msg_size,
+            # Pings and pongs are handled here, so they reset the idle deadline
+            autoping=False,
+        ) as websocket:
             _LOGGER.info("Connected to Signal WebSocket")
+            self._connected_at = self._last_frame_at = time.monotonic()
+            self._set_connected(True)
+            frames = aiter(websocket)
             try:
-                async for msg in websocket:
+                while True:
+                    try:
+                        async with asyncio.timeout(self.idle_timeout):
+                            msg = await anext(frames)
+                    except StopAsyncIteration:
+                        self._disconnect_reason = DISCONNECT_CLOSED
+                        break
+                    except TimeoutError:
+                        _LOGGER.warning(
+                            "Nothing received from Signal WebSocket for %s seconds, "
+                            "reconnecting",
+                            self.idle_timeout,
+                        )
+                        self._disconnect_reason = DISCONNECT_IDLE
+                        break
+                    self._last_frame_at = time.monotonic()
                     if not self._running:
                         break
                     if not await self._process_ws_message(msg, websocket):
@@ -131,31 +266,36 @@ class SignalWebSocketListener:
             bool: True to continue listening, False to stop.
         """
         if msg.type == aiohttp.WSMsgType.TEXT:
-            await self._handle_message(msg.data)
+            # Receipts, typing indicators and sync messages take no queue space
+            if is_data_frame(msg.data):
+                await self._enqueue(msg.data)
+            else:
+                self._skipped_frames += 1
+            return True
+        if msg.type == aiohttp.WSMsgType.PING:
+            await websocket.pong(msg.data)
             return True
         if msg.type == aiohttp.WSMsgType.ERROR:
-            _LOGGER.error("WebSocket error: %s", websocket.exception())
+            exception = websocket.exception()
+            if isinstance(exception, aiohttp.ServerTimeoutError):
+                _LOGGER.warning("Signal WebSocket heartbeat timed out: %s", exception)
+                self._disconnect_reason = DISCONNECT_HEARTBEAT
+            else:
+                _LOGGER.error("WebSocket error: %s", exception)
+                self._disconnect_reason = DISCONNECT_ERROR
             return False
         if msg.type in (aiohttp.WSMsgType.CLOSED, aiohttp.WSMsgType.CLOSING):
             _LOGGER.info("WebSocket connection closed")
+            self._disconnect_reason = DISCONNECT_CLOSED
             return False
         return True
 
-    def is_received_msg(self, msg: Dict) -> bool:
-        """Check if the message is a 'receive' type message."""
-        envelope = msg.get("envelope", {})
-        return (
-            envelope.get("dataMessage") is not None
-            and envelope["dataMessage"].get("message") is not None
-        )
-
     async def _handle_message(self, message: str) -> None:
         try:
+            self._parsed_frames += 1
             data = json.loads(message)
-            _LOGGER.debug("Received WebSocket data: %s", data)
-            if self._message_handler and self.is_received_msg(data):
-                await self._message_handler(data)
         except json.JSONDecodeError as err:
             _LOGGER.error("Failed to parse WebSocket message: %s", err)
-        except Exception as err:  # pylint: disable=broad-except
-            _LOGGER.error("Error handling WebSocket message: %s", err)
+            return
+        _LOGGER.debug("Received WebSocket data: %s", data)
+        await self._handle_data(data)
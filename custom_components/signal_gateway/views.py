@@ -0,0 +1,40 @@
+"""HTTP view serving the attachments received with Signal messages."""
+
+from __future__ import annotations
+
+from aiohttp import hdrs, web
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.helpers.http import KEY_HASS
+
+from .attachment_cache import attachment_filename
+from .const import DOMAIN
+
+# The content of an attachment never changes for a given ID
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+class AttachmentView(HomeAssistantView):
+    """Serve received attachments by ID, from the local attachment cache.
+
+    Attachments missing from the cache are downloaded from signal-cli first
+    (with the concurrency limit of the cache). Files are served by aiohttp,
+    which handles Range requests, ETags and conditional requests.
+    """
+
+    url = "/api/signal_gateway/attachments/{entry_id}/{attachment_id}"
+    name = "api:signal_gateway:attachments"
+    requires_auth = True
+
+    async def get(
+        self, request: web.Request, entry_id: str, attachment_id: str
+    ) -> web.StreamResponse:
+        """Return the content of an attachment."""
+        hass = request.app[KEY_HASS]
+        cache = hass.data.get(DOMAIN, {}).get(entry_id, {}).get("attachment_cache")
+        if cache is None or attachment_filename(attachment_id) is None:
+            raise web.HTTPNotFound()
+
+        path = await cache.async_fetch({"id": attachment_id})
+        if path is None:
+            raise web.HTTPBadGateway(text="Attachment could not be downloaded")
+        return web.FileResponse(path, headers={hdrs.CACHE_CONTROL: CACHE_CONTROL})
@@ -1,5 +1,7 @@
 """Test configuration for Signal Gateway integration."""
 
+from unittest.mock import AsyncMock, patch
+
 import pytest
 
 
@@ -18,3 +20,16 @@ def auto_enable_custom_integrations(enable_custom_integrations):
     Provided by pytest-homeassistant-custom-component package.
     """
     yield
+
+
+@pytest.fixture(autouse=True)
+def mock_probe_api():
+    """Do not query signal-cli-rest-api during setups and config flows.
+
+    The probe returns None (API unreachable) unless a test sets a return value.
+    """
+    probe = AsyncMock(return_value=None)
+    with patch("custom_components.signal_gateway.async_probe_api", probe), patch(
+        "custom_components.signal_gateway.config_flow.async_probe_api", probe
+    ):
+        yield probe
@@ -15,11 +15,15 @@ async def test_signal_client_send_message():
     assert result == {"success": True}
 
 
-def test_signal_client_set_message_handler():
+@pytest.mark.asyncio
+async def test_signal_client_set_message_handler():
     session = AsyncMock()
     client = SignalClient(
         api_url="http://localhost:8080", phone_number="+33612345678", session=session
     )
-    handler = lambda msg: None
+    handler = AsyncMock()
     client.set_message_handler(handler)
-    assert client._ws_listener._message_handler == handler
+    assert client._message_handler == handler
+    msg = {"envelope": {"dataMessage": {"message": "hi"}}}
+    await client._ws_listener._message_handler(msg)
+    handler.assert_awaited_once_with(msg)
@@ -0,0 +1,60 @@
+"""Tests for the command router."""
+
+import pytest
+
+from custom_components.signal_gateway.signal.commands import (
+    CommandRouter,
+    parse_commands,
+)
+
+
+def test_longest_command_wins():
+    """Test that the longest matching command is selected."""
+    router = CommandRouter(
+        {"/alarm": None, "/alarm arm": None, "/alarm arm night": "script.night"}
+    )
+    assert router.match("/alarm arm night now") == ("/alarm arm night", "now")
+    assert router.match("/alarm arm away") == ("/alarm arm", "away")
+    assert router.match("/alarm") == ("/alarm", "")
+    assert router.service("/alarm arm night") == "script.night"
+    assert router.service("/alarm arm") is None
+
+
+def test_command_must_end_on_word_boundary():
+    """Test that a command is not matched inside a longer word."""
+    router = CommandRouter({"/light": None, "ping": None})
+    assert router.match("/lights off") is None
+    assert router.match("pingpong") is None
+    assert router.match("  Ping\tme") == ("ping", "me")
+
+
+def test_no_match():
+    """Test messages which are not commands."""
+    router = CommandRouter({"/lights off": None})
+    assert router.match("hello /lights off") is None
+    assert router.match("/lights") is None
+    assert router.match("") is None
+    assert router.match(None) is None
+
+
+def test_router_length():
+    """Test that an empty router is falsy."""
+    assert not CommandRouter()
+    assert len(CommandRouter({"/a": None, "/b": None})) == 2
+
+
+def test_parse_commands_normalizes_prefixes():
+    """Test that prefixes are lowercased and whitespace normalized."""
+    assert parse_commands("  /Lights   OFF :  light.turn_off \n\n/status") == {
+        "/lights off": "light.turn_off",
+        "/status": None,
+    }
+
+
+@pytest.mark.parametrize(
+    "rules", [": script.test", "/lights: not a service", "/lights: light."]
+)
+def test_parse_commands_invalid(rules):
+    """Test that malformed command rules are rejected."""
+    with pytest.raises(ValueError):
+        parse_commands(rules)
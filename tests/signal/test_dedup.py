@@ -0,0 +1,55 @@
+"""Tests for the deduplication of redelivered envelopes."""
+
+from unittest.mock import patch
+
+from custom_components.signal_gateway.signal.dedup import DedupIndex, envelope_key
+
+
+def test_envelope_key_prefers_uuid():
+    """Test that the sender UUID identifies the source when available."""
+    msg = {
+        "envelope": {
+            "sourceUuid": "uuid-1",
+            "sourceNumber": "+33600000000",
+            "timestamp": 42,
+        }
+    }
+    assert envelope_key(msg) == ("uuid-1", 42)
+    assert envelope_key({"envelope": {"source": "+336", "timestamp": 42}}) == (
+        "+336",
+        42,
+    )
+
+
+def test_envelope_key_without_timestamp():
+    """Test that envelopes without timestamp are never deduplicated."""
+    assert envelope_key({"envelope": {"source": "+336"}}) is None
+    assert envelope_key({}) is None
+
+
+def test_dedup_index_window_expiry():
+    """Test that keys are forgotten after the window."""
+    index = DedupIndex(window=10, max_size=100)
+    with patch(
+        "custom_components.signal_gateway.signal.dedup.time.monotonic"
+    ) as monotonic:
+        monotonic.return_value = 100.0
+        assert index.check("a") is False
+        monotonic.return_value = 105.0
+        assert index.check("a") is True
+        assert index.check("b") is False
+        monotonic.return_value = 111.0
+        # "a" expired, "b" is still remembered
+        assert index.check("a") is False
+        assert index.check("b") is True
+    assert index.hits == 2
+
+
+def test_dedup_index_size_limit():
+    """Test that the oldest keys are evicted when the index is full."""
+    index = DedupIndex(window=600, max_size=3)
+    for key in range(10):
+        assert index.check(key) is False
+    assert len(index) == 3
+    assert index.check(9) is True
+    assert index.check(0) is False
@@ -0,0 +1,111 @@
+"""Tests for the received envelope model."""
+
+from custom_components.signal_gateway.signal.envelope import (
+    MAX_EVENT_ITEMS,
+    MAX_EVENT_MESSAGE_LENGTH,
+    Envelope,
+    Group,
+)
+
+
+def make_msg(**data_message):
+    return {
+        "envelope": {
+            "source": "+33600000000",
+            "sourceNumber": "+33600000000",
+            "sourceUuid": "uuid-1",
+            "sourceName": "Alice",
+            "sourceDevice": 1,
+            "timestamp": 1700000000000,
+            "serverReceivedTimestamp": 1700000000100,
+            "dataMessage": {"timestamp": 1700000000000, **data_message},
+        },
+        "account": "+33611111111",
+    }
+
+
+def test_sub_objects_are_built_lazily():
+    """Test that sub-objects are only built on access, then cached."""
+    envelope = Envelope(make_msg(message="Hi", groupInfo={"groupId": "abcd"}))
+    assert not isinstance(envelope._group, Group)
+    assert envelope.group.id == "abcd"
+    assert isinstance(envelope._group, Group)
+    assert envelope.group is envelope.group
+    assert envelope.sender is envelope.sender
+
+
+def test_direct_message_event_data():
+    """Test the event payload of a direct message."""
+    data = Envelope(make_msg(message="Hello")).as_event_data()
+    assert data == {
+        "timestamp": 1700000000000,
+        "sender": "+33600000000",
+        "sender_uuid": "uuid-1",
+        "sender_name": "Alice",
+        "message": "Hello",
+        "group_id": None,
+        "reply_to": "+33600000000",
+        "attachments": [],
+        "mentions": [],
+        "quote": None,
+    }
+
+
+def test_group_reply_event_data():
+    """Test the event payload of a group reply with attachments and mentions."""
+    data = Envelope(
+        make_msg(
+            message="￼ look",
+            groupInfo={"groupId": "abcd", "type": "DELIVER"},
+            attachments=[
+                {
+                    "id": "att1",
+                    "contentType": "image/jpeg",
+                    "filename": "photo.jpg",
+                    "size": 1234,
+                    "width": 800,
+                }
+            ],
+            mentions=[{"number": "+33622222222", "uuid": "uuid-2", "start": 0}],
+            quote={"id": 42, "authorNumber": "+33622222222", "text": "Original"},
+        )
+    ).as_event_data()
+    assert data["group_id"] == "abcd"
+    assert data["reply_to"] == "group.YWJjZA=="
+    assert data["attachments"] == [
+        {
+            "id": "att1",
+            "content_type": "image/jpeg",
+            "filename": "photo.jpg",
+            "size": 1234,
+        }
+    ]
+    assert data["mentions"] == ["+33622222222"]
+    assert data["quote"] == {"id": 42, "author": "+33622222222", "text": "Original"}
+
+
+def test_event_data_is_size_bounded():
+    """Test that long texts and lists are truncated."""
+    data = Envelope(
+        make_msg(
+            message="x" * (MAX_EVENT_MESSAGE_LENGTH + 100),
+            attachments=[{"id": str(i)} for i in range(MAX_EVENT_ITEMS + 5)],
+        )
+    ).as_event_data()
+    assert len(data["message"]) == MAX_EVENT_MESSAGE_LENGTH + 1
+    assert len(data["attachments"]) == MAX_EVENT_ITEMS
+
+
+def test_event_data_with_envelope():
+    """Test that the raw envelope is only added on request."""
+    msg = make_msg(message="Hello")
+    assert "envelope" not in Envelope(msg).as_event_data()
+    assert Envelope(msg).as_event_data(include_envelope=True)["envelope"] is (
+        msg["envelope"]
+    )
+
+
+def test_sender_without_number():
+    """Test that the UUID identifies senders hiding their phone number."""
+    msg = {"envelope": {"sourceUuid": "uuid-1", "dataMessage": {"message": "Hi"}}}
+    assert Envelope(msg).as_event_data()["sender"] == "uuid-1"
@@ -0,0 +1,81 @@
+"""Tests for incoming message filters."""
+
+import pytest
+
+from custom_components.signal_gateway.signal.filters import (
+    MessageFilter,
+    parse_group_sampling,
+)
+
+
+def make_msg(text="hello", source="+1111111111", group_id=None):
+    data_message = {"message": text, "timestamp": 1234567890}
+    if group_id:
+        data_message["groupInfo"] = {"groupId": group_id, "type": "DELIVER"}
+    return {
+        "envelope": {
+            "source": source,
+            "sourceNumber": source,
+            "sourceUuid": "uuid-" + source,
+            "dataMessage": data_message,
+        }
+    }
+
+
+def test_empty_filter_accepts_everything():
+    """Test that an empty filter accepts all messages."""
+    message_filter = MessageFilter()
+    assert message_filter.is_empty
+    assert message_filter(make_msg())
+
+
+def test_sender_allowlist():
+    """Test that only allowed senders are accepted (number or UUID)."""
+    message_filter = MessageFilter(sender_allowlist=["+1111111111", "uuid-+3333"])
+    assert message_filter(make_msg(source="+1111111111"))
+    assert message_filter(make_msg(source="+3333"))
+    assert not message_filter(make_msg(source="+2222222222"))
+    assert message_filter.rejected["sender"] == 1
+
+
+def test_sender_denylist():
+    """Test that denied senders are rejected."""
+    message_filter = MessageFilter(sender_denylist=["+2222222222"])
+    assert message_filter(make_msg(source="+1111111111"))
+    assert not message_filter(make_msg(source="+2222222222"))
+
+
+def test_group_allowlist_accepts_both_id_forms():
+    """Test the group allowlist with internal and API group IDs."""
+    # "group.YWJjZA==" is the API form of the internal ID "abcd"
+    message_filter = MessageFilter(group_allowlist=["group.YWJjZA==", "efgh"])
+    assert message_filter(make_msg(group_id="abcd"))
+    assert message_filter(make_msg(group_id="efgh"))
+    assert not message_filter(make_msg(group_id="ijkl"))
+    # Direct messages are not affected
+    assert message_filter(make_msg())
+    assert message_filter.rejected["group"] == 1
+
+
+def test_message_regex():
+    """Test that only matching messages are accepted."""
+    message_filter = MessageFilter(message_regex=r"^/\w+")
+    assert message_filter(make_msg(text="/lights off"))
+    assert not message_filter(make_msg(text="hello"))
+    assert message_filter.rejected["message"] == 1
+
+
+def test_group_sampling():
+    """Test that only one message out of N is accepted for sampled groups."""
+    message_filter = MessageFilter(group_sampling={"abcd": 3})
+    results = [message_filter(make_msg(group_id="abcd")) for _ in range(7)]
+    assert results == [True, False, False, True, False, False, True]
+    assert all(message_filter(make_msg(group_id="efgh")) for _ in range(3))
+    assert message_filter.rejected["sampling"] == 4
+
+
+@pytest.mark.parametrize("rules", ["abcd", "abcd: x", "abcd: 0", ": 3"])
+def test_parse_group_sampling_invalid(rules):
+    """Test that malformed sampling rules are rejected."""
+    with pytest.raises(ValueError):
+        parse_group_sampling(rules)
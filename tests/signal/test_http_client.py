@@ -100,3 +100,214 @@ async def test_http_client_send_message_default_normal():
     payload = call_args.kwargs["json"]
     assert payload["text_mode"] == "normal"
     assert result == {"result": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_http_client_send_message_adaptive_timeout():
+    """Test that the send timeout depends on payload size and is learned."""
+    response = AsyncMock()
+    response.status = 200
+    response.json = AsyncMock(return_value={"result": "ok"})
+
+    mock_cm = AsyncMock()
+    mock_cm.__aenter__.return_value = response
+
+    session = AsyncMock()
+    session.post = Mock(return_value=mock_cm)
+
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+    await client.send_message("+33698765432", "Hello")
+    small_timeout = session.post.call_args.kwargs["timeout"].total
+
+    await client.send_message(
+        "+33698765432", "Hello", base64_attachments=["a" * 20_000_000]
+    )
+    large_timeout = session.post.call_args.kwargs["timeout"].total
+
+    assert small_timeout == client.timeouts.floor
+    assert large_timeout > small_timeout
+    # The mocked upload is faster than the latency: no throughput sample
+    assert client.timeouts.estimates()["/v2/send"]["samples"] == 1
+
+
+@pytest.mark.asyncio
+async def test_http_client_send_message_timeout_backs_off():
+    """Test that a timed out send lengthens the next send timeout."""
+    session = AsyncMock()
+    session.post = Mock(side_effect=TimeoutError)
+
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+    payload = ["a" * 2_000_000]
+    before = client.timeouts.timeout("/v2/send", 2_000_005)
+
+    with pytest.raises(TimeoutError):
+        await client.send_message("+33698765432", "Hello", base64_attachments=payload)
+
+    assert client.timeouts.timeout("/v2/send", 2_000_005) > before
+    assert client.timeouts.estimates()["/v2/send"]["timeouts"] == 1
+
+
+@pytest.mark.asyncio
+async def test_http_client_set_typing_indicator():
+    """Test showing and hiding the typing indicator."""
+    response = AsyncMock()
+    response.status = 204
+
+    mock_cm = AsyncMock()
+    mock_cm.__aenter__.return_value = response
+
+    session = AsyncMock()
+    session.put = Mock(return_value=mock_cm)
+    session.delete = Mock(return_value=mock_cm)
+
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+    await client.set_typing_indicator("+33698765432")
+    await client.set_typing_indicator("+33698765432", typing=False)
+
+    assert (
+        session.put.call_args.args[0]
+        == "http://localhost:8080/v1/typing-indicator/+33612345678"
+    )
+    assert session.put.call_args.kwargs["json"] == {"recipient": "+33698765432"}
+    session.delete.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_http_client_set_typing_indicator_error():
+    """Test that API errors on the typing indicator are raised."""
+    response = AsyncMock()
+    response.status = 400
+    response.text = AsyncMock(return_value="Bad Request")
+
+    mock_cm = AsyncMock()
+    mock_cm.__aenter__.return_value = response
+
+    session = AsyncMock()
+    session.put = Mock(return_value=mock_cm)
+
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+    with pytest.raises(RuntimeError, match="Signal API error: 400"):
+        await client.set_typing_indicator("+33698765432")
+
+
+@pytest.mark.asyncio
+async def test_http_client_iter_attachment():
+    """Test that received attachments are streamed by chunks."""
+
+    async def iter_chunked(size):
+        for chunk in (b"abc", b"def"):
+            yield chunk
+
+    response = AsyncMock()
+    response.status = 200
+    response.content = Mock()
+    response.content.iter_chunked = iter_chunked
+
+    mock_cm = AsyncMock()
+    mock_cm.__aenter__.return_value = response
+
+    session = AsyncMock()
+    session.get = Mock(return_value=mock_cm)
+
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+    chunks = [chunk async for chunk in client.iter_attachment("abc.jpg", 6)]
+
+    assert chunks == [b"abc", b"def"]
+    assert (
+        session.get.call_args.args[0] == "http://localhost:8080/v1/attachments/abc.jpg"
+    )
+    assert "/v1/attachments" in client.timeouts.estimates()
+
+
+@pytest.mark.asyncio
+async def test_http_client_iter_attachment_error():
+    """Test that an API error is raised when the attachment is unknown."""
+    response = AsyncMock()
+    response.status = 404
+    response.text = AsyncMock(return_value="not found")
+
+    mock_cm = AsyncMock()
+    mock_cm.__aenter__.return_value = response
+
+    session = AsyncMock()
+    session.get = Mock(return_value=mock_cm)
+
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+    with pytest.raises(RuntimeError, match="404"):
+        async for _ in client.iter_attachment("missing"):
+            pass
+
+
+def probe_session(about_status=200, about=None, health_status=204):
+    """Return a session answering /v1/about and /v1/health."""
+
+    def get(url, **kwargs):
+        response = AsyncMock()
+        if url.endswith("/v1/about"):
+            response.status = about_status
+            response.json = AsyncMock(return_value=about)
+            response.text = AsyncMock(return_value="error")
+        else:
+            response.status = health_status
+        mock_cm = AsyncMock()
+        mock_cm.__aenter__.return_value = response
+        return mock_cm
+
+    session = AsyncMock()
+    session.get = Mock(side_effect=get)
+    return session
+
+
+@pytest.mark.asyncio
+async def test_http_client_probe():
+    """Test that the API mode, version and health are reported."""
+    session = probe_session(
+        about={
+            "versions": ["v1", "v2"],
+            "build": 2,
+            "mode": "json-rpc",
+            "version": "0.92",
+            "capabilities": {"v2/send": ["quotes", "mentions"]},
+        },
+        health_status=503,
+    )
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080", phone_number="+33612345678", session=session
+    )
+
+    assert await client.probe() == {
+        "mode": "json-rpc",
+        "version": "0.92",
+        "build": 2,
+        "healthy": False,
+    }
+    urls = {call.args[0] for call in session.get.call_args_list}
+    assert urls == {
+        "http://localhost:8080/v1/about",
+        "http://localhost:8080/v1/health",
+    }
+    assert session.get.call_args.kwargs["timeout"].total == 5
+
+
+@pytest.mark.asyncio
+async def test_http_client_probe_error():
+    """Test that an API error is raised when /v1/about fails."""
+    client = SignalHTTPClient(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=probe_session(about_status=500),
+    )
+    with pytest.raises(RuntimeError, match="500"):
+        await client.probe()
@@ -0,0 +1,147 @@
+"""Tests for the REST polling receiver."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.signal_gateway.signal.client import SignalClient
+from custom_components.signal_gateway.signal.listener import SignalListener
+from custom_components.signal_gateway.signal.polling_listener import (
+    SignalPollingListener,
+)
+from custom_components.signal_gateway.signal.websocket_listener import (
+    SignalWebSocketListener,
+)
+
+# Not affected by the patching of asyncio.sleep
+_sleep = asyncio.sleep
+
+
+def make_msg(text, timestamp, source="+1111111111"):
+    return {
+        "envelope": {
+            "source": source,
+            "sourceNumber": source,
+            "timestamp": timestamp,
+            "dataMessage": {"message": text, "timestamp": timestamp},
+        },
+        "account": "+33612345678",
+    }
+
+
+def make_response(status=200, payload=None):
+    response = MagicMock()
+    response.status = status
+    response.json = AsyncMock(return_value=payload)
+    response.text = AsyncMock(return_value="error")
+    context = MagicMock()
+    context.__aenter__ = AsyncMock(return_value=response)
+    context.__aexit__ = AsyncMock(return_value=None)
+    return context
+
+
+def make_listener(responses):
+    session = MagicMock()
+    session.get = MagicMock(side_effect=responses)
+    listener = SignalPollingListener("http://localhost:8080", "+33612345678", session)
+    listener.poll_interval_min = 0.001
+    listener.poll_interval_max = 0.004
+    listener.retry_delay = 0.001
+    return listener, session
+
+
+async def run_until(listener, condition, timeout=2):
+    listener._running = True
+    task = asyncio.create_task(listener._listen())
+    try:
+        async with asyncio.timeout(timeout):
+            while not condition():
+                await _sleep(0.001)
+    finally:
+        listener._running = False
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+
+@pytest.mark.asyncio
+async def test_polled_messages_reach_handler_once():
+    """Test that polled envelopes are delivered, without duplicates."""
+    first = make_msg("hello", 1000)
+    second = make_msg("world", 2000)
+    responses = [
+        make_response(payload=[first]),
+        make_response(payload=[first, second]),
+    ] + [make_response(payload=[]) for _ in range(100)]
+    listener, session = make_listener(responses)
+    handler = AsyncMock()
+    listener.set_message_handler(handler)
+
+    await run_until(listener, lambda: session.get.call_count >= 4)
+
+    assert [call.args[0] for call in handler.await_args_list] == [first, second]
+    assert listener.stats["duplicate_envelopes"] == 1
+    url = session.get.call_args.args[0]
+    assert url == "http://localhost:8080/v1/receive/+33612345678"
+
+
+@pytest.mark.asyncio
+async def test_poll_interval_adapts_to_activity():
+    """Test that the interval backs off when idle and resets on activity."""
+    responses = [make_response(payload=[]) for _ in range(4)] + [
+        make_response(payload=[make_msg("hi", 1000)])
+    ]
+    responses += [make_response(payload=[]) for _ in range(100)]
+    listener, session = make_listener(responses)
+    listener.set_message_handler(AsyncMock())
+    intervals = []
+
+    async def recording_sleep(delay):
+        intervals.append(delay)
+        await _sleep(0)
+
+    listener_module = "custom_components.signal_gateway.signal.polling_listener"
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(f"{listener_module}.asyncio.sleep", recording_sleep)
+        await run_until(listener, lambda: session.get.call_count >= 6)
+
+    assert intervals[:5] == [0.002, 0.004, 0.004, 0.004, 0.001]
+
+
+@pytest.mark.asyncio
+async def test_poll_errors_are_retried():
+    """Test that API errors are recorded and polling continues."""
+    responses = [make_response(status=400)] + [
+        make_response(payload=[]) for _ in range(100)
+    ]
+    listener, session = make_listener(responses)
+    listener.set_message_handler(AsyncMock())
+
+    await run_until(listener, lambda: listener.connected)
+
+    assert listener.reconnects == 1
+    assert listener.stats["disconnect_reasons"] == {"connection_error": 1}
+
+
+def test_client_polling_mode():
+    """Test that the client uses the polling receiver in polling mode."""
+    client = SignalClient("http://localhost:8080", "+33612345678", MagicMock())
+    assert not isinstance(client._ws_listener, SignalPollingListener)
+    client = SignalClient(
+        "http://localhost:8080", "+33612345678", MagicMock(), polling=True
+    )
+    assert isinstance(client._ws_listener, SignalPollingListener)
+
+
+def test_polling_listener_has_no_websocket_state():
+    """Test that the polling receiver does not report WebSocket settings."""
+    listener, _ = make_listener([])
+    assert isinstance(listener, SignalListener)
+    assert not isinstance(listener, SignalWebSocketListener)
+    assert not hasattr(listener, "heartbeat")
+    assert not hasattr(listener, "_disconnect_reason")
+    stats = listener.stats
+    assert "overflow_policy" not in stats
+    assert "queue_depth" not in stats
+    assert "poll_interval" in stats
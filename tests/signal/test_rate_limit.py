@@ -0,0 +1,114 @@
+"""Tests for the flood protection of incoming messages."""
+
+from unittest.mock import patch
+
+import pytest
+
+from custom_components.signal_gateway.signal import rate_limit
+from custom_components.signal_gateway.signal.rate_limit import RateLimiter
+
+
+def make_msg(sender, group_id=None):
+    data_message = {"message": "spam"}
+    if group_id:
+        data_message["groupInfo"] = {"groupId": group_id}
+    return {"envelope": {"sourceNumber": sender, "dataMessage": data_message}}
+
+
+@pytest.fixture
+def monotonic():
+    with patch(
+        "custom_components.signal_gateway.signal.rate_limit.time.monotonic"
+    ) as mock_monotonic:
+        mock_monotonic.return_value = 1000.0
+        yield mock_monotonic
+
+
+def test_sender_bucket_refills(monotonic):
+    """Test that a burst is accepted, then one message per period / rate."""
+    limiter = RateLimiter(sender_rate=3)
+    assert [limiter(make_msg("+1")) for _ in range(4)] == [True, True, True, False]
+    # Other senders have their own bucket
+    assert limiter(make_msg("+2"))
+
+    monotonic.return_value += 20  # one token (60 s / 3)
+    assert limiter(make_msg("+1"))
+    assert not limiter(make_msg("+1"))
+
+    monotonic.return_value += 3600  # the bucket never exceeds the burst
+    assert [limiter(make_msg("+1")) for _ in range(4)] == [True, True, True, False]
+    assert limiter.dropped == {"senders": {"+1": 3}, "groups": {}}
+
+
+def test_group_bucket_is_shared_by_senders(monotonic):
+    """Test that group messages are limited per group, whatever the sender."""
+    limiter = RateLimiter(sender_rate=10, group_rate=2)
+    assert limiter(make_msg("+1", "abcd"))
+    assert limiter(make_msg("+2", "abcd"))
+    assert not limiter(make_msg("+3", "abcd"))
+    # Direct messages are not limited by the group
+    assert limiter(make_msg("+3"))
+    assert limiter.dropped == {"senders": {}, "groups": {"abcd": 1}}
+
+
+def test_rejected_message_takes_no_token(monotonic):
+    """Test that a message dropped by its group keeps the sender tokens."""
+    limiter = RateLimiter(sender_rate=2, group_rate=1)
+    assert limiter(make_msg("+1", "abcd"))
+    assert not limiter(make_msg("+1", "abcd"))
+    assert limiter(make_msg("+1"))
+    assert not limiter(make_msg("+1"))
+
+
+def test_pop_summary(monotonic):
+    """Test that the summary only holds drops since the last call."""
+    limiter = RateLimiter(sender_rate=1)
+    assert limiter.pop_summary() == {}
+    for _ in range(3):
+        limiter(make_msg("+1"))
+    assert limiter.pop_summary() == {"senders": {"+1": 2}, "groups": {}}
+    assert limiter.pop_summary() == {}
+    assert limiter.dropped == {"senders": {"+1": 2}, "groups": {}}
+
+
+def test_idle_buckets_are_pruned(monotonic, monkeypatch):
+    """Test that full buckets are forgotten when there are many sources."""
+    monkeypatch.setattr(rate_limit, "MAX_SOURCES", 3)
+    limiter = RateLimiter(sender_rate=2)
+    for sender in ("+1", "+2", "+3"):
+        limiter(make_msg(sender))
+    monotonic.return_value += 60
+    limiter(make_msg("+4"))
+    assert len(limiter._buckets) == 1
+
+
+def test_least_recently_used_bucket_is_evicted(monotonic, monkeypatch):
+    """Test that the number of buckets is capped when none is idle."""
+    monkeypatch.setattr(rate_limit, "MAX_SOURCES", 3)
+    limiter = RateLimiter(sender_rate=2)
+    for sender in ("+1", "+2", "+3", "+1", "+4"):
+        limiter(make_msg(sender))
+    assert list(limiter._buckets) == [
+        ("senders", "+3"),
+        ("senders", "+1"),
+        ("senders", "+4"),
+    ]
+
+
+def test_dropped_sources_are_capped(monotonic, monkeypatch):
+    """Test that drops of sources over the cap are counted together."""
+    monkeypatch.setattr(rate_limit, "MAX_SOURCES", 3)
+    limiter = RateLimiter(sender_rate=1)
+    for sender in ("+1", "+2", "+3", "+4"):
+        limiter(make_msg(sender))
+        limiter(make_msg(sender))
+    assert limiter.dropped["senders"] == {"+1": 1, "+2": 1, "*": 2}
+    assert limiter.stats["senders"] == {"sources": 2, "dropped": 4}
+    assert limiter.pop_summary()["senders"] == {"+1": 1, "+2": 1, "*": 2}
+
+
+def test_no_limit():
+    """Test that an unconfigured limiter accepts everything."""
+    limiter = RateLimiter()
+    assert limiter.is_empty
+    assert all(limiter(make_msg("+1", "abcd")) for _ in range(100))
@@ -0,0 +1,170 @@
+"""Tests for the subscribers of received messages."""
+
+import asyncio
+import contextlib
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.signal_gateway.signal.client import SignalClient
+from custom_components.signal_gateway.signal.subscriptions import Subscription
+
+
+def make_msg(text, group_id=None):
+    data_message = {"message": text}
+    if group_id:
+        data_message["groupInfo"] = {"groupId": group_id}
+    return {"envelope": {"sourceNumber": "+1", "dataMessage": data_message}}
+
+
+@pytest.fixture
+async def client():
+    client = SignalClient(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=AsyncMock(),
+    )
+    yield client
+    await client.stop_listening()
+
+
+async def deliver(client, *messages):
+    for msg in messages:
+        await client._deliver(msg)
+    # Let the subscriber tasks run
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_subscription_drops_oldest_when_full():
+    """Test that a full queue keeps the most recent messages."""
+    subscription = Subscription(queue_size=2)
+    for text in ("a", "b", "c"):
+        subscription.offer(make_msg(text))
+    subscription.close()
+
+    received = [msg["envelope"]["dataMessage"]["message"] async for msg in subscription]
+    # The end marker took the place of another message
+    assert received == ["c"]
+    assert subscription.dropped == 2
+    assert subscription.queued == 3
+
+
+@pytest.mark.asyncio
+async def test_subscription_filter_errors_skip_message():
+    """Test that a failing filter skips the message instead of raising."""
+    subscription = Subscription(message_filter=MagicMock(side_effect=KeyError("x")))
+    subscription.offer(make_msg("a"))
+    assert subscription.queue_depth == 0
+    assert subscription.filtered == 1
+
+
+@pytest.mark.asyncio
+async def test_subscribe_delivers_to_every_subscriber(client):
+    """Test that each subscriber receives the messages passing its filter."""
+    primary = AsyncMock()
+    client.set_message_handler(primary)
+    all_messages = []
+    group_messages = []
+    client.subscribe(all_messages.append, name="all")
+    client.subscribe(
+        group_messages.append,
+        message_filter=lambda msg: "groupInfo" in msg["envelope"]["dataMessage"],
+    )
+
+    await deliver(client, make_msg("a"), make_msg("b", group_id="g1"))
+
+    assert len(all_messages) == 2
+    assert len(group_messages) == 1
+    assert primary.await_count == 2
+    stats = client.listener_stats["subscribers"]
+    assert stats[0]["name"] == "all"
+    assert stats[0]["queued"] == 2
+    assert stats[1]["filtered"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_does_not_stall_others(client):
+    """Test that a blocked handler only loses its own messages."""
+    blocked = asyncio.Event()
+
+    async def slow_handler(msg):
+        await blocked.wait()
+
+    fast_messages = []
+    client.subscribe(slow_handler, queue_size=2, name="slow")
+    client.subscribe(fast_messages.append, name="fast")
+
+    await deliver(client, *(make_msg(str(i)) for i in range(10)))
+
+    assert len(fast_messages) == 10
+    slow, fast = client.listener_stats["subscribers"]
+    # The messages were queued at once: only the last two were kept
+    assert slow["dropped"] == 8
+    assert fast["dropped"] == 0
+    blocked.set()
+
+
+@pytest.mark.asyncio
+async def test_handler_errors_are_logged(client, caplog):
+    """Test that a failing handler keeps receiving messages."""
+    handler = MagicMock(side_effect=[ValueError("boom"), None])
+    client.subscribe(handler, name="broken")
+
+    await deliver(client, make_msg("a"), make_msg("b"))
+
+    assert handler.call_count == 2
+    assert "Error in handler of subscriber broken: boom" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_unsubscribe(client):
+    """Test that an ended subscription receives nothing more."""
+    handler = MagicMock()
+    unsubscribe = client.subscribe(handler)
+    await deliver(client, make_msg("a"))
+    unsubscribe()
+    await deliver(client, make_msg("b"))
+
+    handler.assert_called_once()
+    assert client.listener_stats["subscribers"] == []
+
+
+@pytest.mark.asyncio
+async def test_messages_iterator(client):
+    """Test iterating over the received messages."""
+
+    async def consume():
+        received = []
+        async with contextlib.aclosing(client.messages(name="iterator")) as messages:
+            async for msg in messages:
+                received.append(msg["envelope"]["dataMessage"]["message"])
+                if len(received) == 2:
+                    break
+        return received
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0)
+    assert len(client.listener_stats["subscribers"]) == 1
+
+    await deliver(client, make_msg("a"), make_msg("b"), make_msg("c"))
+
+    assert await task == ["a", "b"]
+    assert client.listener_stats["subscribers"] == []
+
+
+@pytest.mark.asyncio
+async def test_stop_listening_ends_iterators(client):
+    """Test that iterators stop once the client stops listening."""
+
+    async def consume():
+        return [msg async for msg in client.messages()]
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0)
+    await deliver(client, make_msg("a"))
+    await client.stop_listening()
+
+    assert len(await task) == 1
+    assert client.listener_stats["subscribers"] == []
@@ -0,0 +1,81 @@
+"""Tests for the adaptive timeout estimator."""
+
+from custom_components.signal_gateway.signal.timeouts import (
+    DEFAULT_TIMEOUT_CEILING,
+    DEFAULT_TIMEOUT_FLOOR,
+    MAX_THROUGHPUT,
+    AdaptiveTimeout,
+)
+
+
+def test_timeout_unknown_endpoint_uses_floor():
+    """Test that a small request to an unknown endpoint gets the floor."""
+    timeouts = AdaptiveTimeout()
+    assert timeouts.timeout("/v2/send") == DEFAULT_TIMEOUT_FLOOR
+
+
+def test_timeout_grows_with_payload_size():
+    """Test that larger payloads get longer timeouts, up to the ceiling."""
+    timeouts = AdaptiveTimeout()
+    small = timeouts.timeout("/v2/send", 1_000_000)
+    large = timeouts.timeout("/v2/send", 5_000_000)
+    assert DEFAULT_TIMEOUT_FLOOR < small < large
+    assert timeouts.timeout("/v2/send", 10**10) == DEFAULT_TIMEOUT_CEILING
+
+
+def test_record_learns_throughput():
+    """Test that a fast observed throughput shortens large request timeouts."""
+    timeouts = AdaptiveTimeout(floor=1)
+    before = timeouts.timeout("example.com", 10_000_000)
+
+    timeouts.record("example.com", 100, 0.1)  # latency sample
+    for _ in range(20):
+        timeouts.record("example.com", 10_000_000, 1.1)  # ~10 MB/s
+
+    after = timeouts.timeout("example.com", 10_000_000)
+    assert after < before
+    estimates = timeouts.estimates()["example.com"]
+    assert estimates["latency"] == 0.1
+    assert 9_000_000 < estimates["throughput"] < 11_000_000
+    assert estimates["samples"] == 21
+
+
+def test_record_fast_first_sample_does_not_collapse_timeouts():
+    """Test that one transfer faster than the latency keeps large timeouts."""
+    timeouts = AdaptiveTimeout()
+    before = timeouts.timeout("/v2/send", 67_000_000)
+
+    # Shorter than the default latency: the transfer time is unknown
+    timeouts.record("/v2/send", 2_000_000, 1.5)
+    assert timeouts.timeout("/v2/send", 67_000_000) == before
+
+    # Barely longer than the latency: the throughput sample is capped and blended
+    timeouts.record("/v2/send", 2_000_000, 2.001)
+    throughput = timeouts.estimates()["/v2/send"]["throughput"]
+    assert throughput < MAX_THROUGHPUT * timeouts.smoothing * 1.1
+    assert timeouts.timeout("/v2/send", 67_000_000) > 60
+
+
+def test_record_timeout_backs_off():
+    """Test that a timed out request lengthens the next timeouts."""
+    timeouts = AdaptiveTimeout()
+    timeouts.record("example.com", 100, 5.0)
+    small = timeouts.timeout("example.com")
+    large = timeouts.timeout("example.com", 2_000_000)
+
+    timeouts.record_timeout("example.com", 100)
+    timeouts.record_timeout("example.com", 2_000_000)
+
+    assert timeouts.timeout("example.com") == 2 * small
+    assert timeouts.timeout("example.com", 2_000_000) > large
+    assert timeouts.estimates()["example.com"]["timeouts"] == 2
+
+
+def test_record_is_per_endpoint():
+    """Test that estimates of an endpoint do not affect the others."""
+    timeouts = AdaptiveTimeout()
+    timeouts.record("slow.example.com", 100, 20.0)
+
+    assert timeouts.timeout("slow.example.com") == 60.0
+    assert timeouts.timeout("fast.example.com") == DEFAULT_TIMEOUT_FLOOR
+    assert list(timeouts.estimates()) == ["slow.example.com"]
@@ -16,6 +16,7 @@ class MockWebSocketClient:
         self.generator = message_generator_func()
         self.closed = False
         self._exception = None
+        self.pongs = []
 
     def set_message_generator(self, message_generator_func):
         self.generator = message_generator_func()
@@ -26,6 +27,9 @@ class MockWebSocketClient:
     async def close(self):
         self.closed = True
 
+    async def pong(self, data=b""):
+        self.pongs.append(data)
+
     def __aiter__(self):
         return self
 
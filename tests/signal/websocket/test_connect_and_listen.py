@@ -1,5 +1,4 @@
 import json
-from unittest.mock import AsyncMock
 import pytest
 import asyncio
 
@@ -36,33 +35,25 @@ async def test__connect_and_listen_running_becomes_false(
         ),
     ]
 
-    # configure the websocket mock
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080", phone_number="123", session=mock_session
+    )
+    listener._running = True
+
+    # configure the websocket mock, setting _running to False after the first message
     async def websockets_clients_generator(*args, **kwargs):
         async def websocket_messages_generator():
             for msg in messages:
                 yield msg
+                listener._running = False
 
         yield MockWebSocketClient(websocket_messages_generator)
 
     mock_websocket_connects.set_clients_generator(websockets_clients_generator)
 
-    listener = SignalWebSocketListener(
-        api_url="http://localhost:8080", phone_number="123", session=mock_session
-    )
-    listener._running = True
-
-    # On modifie le handler pour mettre _running à False après le premier appel
-    handler = AsyncMock()
-
-    async def handler_and_stop(msg):
-        listener._running = False
-        await handler(msg)
-
-    listener.set_message_handler(handler_and_stop)
-
     await listener._connect_and_listen("ws://fake")
-    # Le handler ne doit être appelé qu'une seule fois (le second message ne doit pas être traité)
-    handler.assert_awaited_once()
+    # Only the first message must be queued for dispatch
+    assert listener._queue.qsize() == 1
 
 
 @pytest.mark.asyncio
@@ -105,10 +96,6 @@ async def test__connect_and_listen_cancel_error(mock_websocket_connects, mock_se
     )
     listener._running = True
 
-    # On modifie le handler pour mettre _running à False après le premier appel
-    handler = AsyncMock()
-    listener.set_message_handler(handler)
-
     await listener._connect_and_listen("ws://fake")
-    # Le handler ne doit être appelé qu'une seule fois (le second message ne doit pas être traité)
-    handler.assert_awaited_once()
+    # Only the first message must be queued for dispatch
+    assert listener._queue.qsize() == 1
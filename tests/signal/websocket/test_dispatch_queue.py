@@ -0,0 +1,183 @@
+"""Tests for the queue between the WebSocket reader and the dispatcher."""
+
+import asyncio
+import json
+
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+
+from custom_components.signal_gateway.signal.websocket_listener import (
+    OVERFLOW_DROP_OLDEST,
+    RAW_SCAN_LIMIT,
+    SignalWebSocketListener,
+)
+
+from .conftest import MockWebSocketClient
+
+
+def data_frame(text, timestamp=1234567890):
+    return json.dumps(
+        {
+            "envelope": {
+                "dataMessage": {"message": text, "timestamp": timestamp},
+                "source": "+1234567890",
+            }
+        }
+    )
+
+
+RECEIPT_FRAME = json.dumps(
+    {"envelope": {"receiptMessage": {"isDelivery": True}, "source": "+1234567890"}}
+)
+
+
+def make_listener(mock_session, queue_size=2, overflow_policy=None):
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080", phone_number="123", session=mock_session
+    )
+    listener.queue_size = queue_size
+    if overflow_policy:
+        listener.overflow_policy = overflow_policy
+    listener._queue = asyncio.Queue(queue_size)
+    return listener
+
+
+def queued_frames(listener):
+    return [frame for _, frame in listener._queue._queue]
+
+
+def text_message(frame):
+    return aiohttp.WSMessage(aiohttp.WSMsgType.TEXT, frame, None)
+
+
+@pytest.mark.asyncio
+async def test_slow_handler_does_not_block_reader(
+    mock_websocket_connects, mock_session
+):
+    """Test that frames are read while the handler is still busy."""
+    release = asyncio.Event()
+    received = []
+
+    async def slow_handler(msg):
+        await release.wait()
+        received.append(msg["envelope"]["dataMessage"]["message"])
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def websocket_messages_generator():
+            for index, text in enumerate(("msg1", "msg2", "msg3")):
+                yield data_frame(text, 1234567890 + index)
+            await asyncio.Event().wait()
+
+        yield MockWebSocketClient(websocket_messages_generator)
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+
+    listener = make_listener(mock_session, queue_size=10)
+    listener.set_message_handler(slow_handler)
+    await listener.connect()
+
+    for _ in range(10):
+        await asyncio.sleep(0)
+    # The first frame is being dispatched, the two others are queued
+    assert received == []
+    assert listener.stats["queue_depth"] == 2
+
+    release.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert received == ["msg1", "msg2", "msg3"]
+    stats = listener.stats
+    assert stats["dispatched_frames"] == 3
+    assert stats["queue_depth"] == 0
+    assert stats["queue_high_water"] >= 2
+    assert stats["max_dispatch_latency"] >= stats["last_dispatch_latency"]
+
+    await listener.disconnect()
+
+
+@pytest.mark.asyncio
+async def test_overflow_drop_oldest(mock_session):
+    """Test that the oldest frame is dropped when the queue is full."""
+    listener = make_listener(mock_session, overflow_policy=OVERFLOW_DROP_OLDEST)
+
+    for text in ("msg1", "msg2", "msg3"):
+        await listener._enqueue(data_frame(text))
+
+    assert queued_frames(listener) == [data_frame("msg2"), data_frame("msg3")]
+    assert listener.stats["dropped_frames"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_data_frames_are_not_queued(mock_session):
+    """Test that frames without a data message are skipped before the queue."""
+    listener = make_listener(mock_session)
+    typing_frame = json.dumps({"envelope": {"typingMessage": {"action": "STARTED"}}})
+
+    for frame in (RECEIPT_FRAME, data_frame("msg1"), typing_frame, RECEIPT_FRAME):
+        assert await listener._process_ws_message(text_message(frame), MagicMock())
+
+    assert queued_frames(listener) == [data_frame("msg1")]
+    assert listener.stats["skipped_frames"] == 3
+    assert listener.stats["dropped_frames"] == 0
+
+
+@pytest.mark.asyncio
+async def test_data_message_key_beyond_scan_limit_is_skipped(mock_session):
+    """Test the field order assumption: the key must come before the limit.
+
+    signal-cli serializes the sender fields before the message type key, so a
+    data message whose key comes later (here after a huge source name) is
+    skipped like a receipt, without an error.
+    """
+    listener = make_listener(mock_session)
+    frame = json.dumps(
+        {
+            "envelope": {
+                "sourceName": "x" * RAW_SCAN_LIMIT,
+                "dataMessage": {"message": "lost", "timestamp": 1234567890},
+            }
+        }
+    )
+    assert frame.index('"dataMessage"') > RAW_SCAN_LIMIT
+
+    await listener._process_ws_message(text_message(frame), MagicMock())
+
+    assert queued_frames(listener) == []
+    assert listener.stats["skipped_frames"] == 1
+
+
+@pytest.mark.asyncio
+async def test_overflow_block(mock_session):
+    """Test that the reader waits for room with the default policy."""
+    listener = make_listener(mock_session)
+
+    await listener._enqueue(data_frame("msg1"))
+    await listener._enqueue(RECEIPT_FRAME)
+    put = asyncio.create_task(listener._enqueue(RECEIPT_FRAME))
+    await asyncio.sleep(0)
+    assert not put.done()
+
+    listener._queue.get_nowait()
+    await put
+    assert listener.stats["dropped_frames"] == 0
+    assert listener.stats["queue_depth"] == 2
+
+
+@pytest.mark.asyncio
+async def test_connect_applies_queue_size(monkeypatch, mock_session):
+    """Test that a queue size changed before connecting is applied."""
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080", phone_number="123", session=mock_session
+    )
+    listener.queue_size = 5
+
+    async def fake_listen():
+        pass
+
+    monkeypatch.setattr(listener, "_listen", fake_listen)
+    await listener.connect()
+
+    assert listener.stats["queue_size"] == 5
+    await listener.disconnect()
@@ -1,6 +1,6 @@
 import pytest
 import json
-from unittest.mock import AsyncMock
+from unittest.mock import AsyncMock, MagicMock, patch
 from custom_components.signal_gateway.signal.websocket_listener import (
     SignalWebSocketListener,
 )
@@ -41,7 +41,7 @@ async def test_handle_message_invalid_json(monkeypatch, caplog, mock_session):
         session=mock_session,
     )
     caplog.set_level("ERROR")
-    await listener._handle_message("not a json")
+    await listener._handle_message('{"envelope": {"dataMessage": {"message"')
     assert "Failed to parse WebSocket message" in caplog.text
 
 
@@ -68,4 +68,136 @@ async def test_handle_message_handler_exception(monkeypatch, caplog, mock_sessio
         }
     }
     await listener._handle_message(json.dumps(valid_msg))
-    assert "Error handling WebSocket message" in caplog.text
+    assert "Error handling Signal message" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_handle_message_filtered(mock_session):
+    """
+    Test that _handle_message drops messages rejected by the message filter.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=mock_session,
+    )
+    handler = AsyncMock()
+    listener.set_message_handler(handler)
+    listener.set_message_filter(lambda msg: msg["envelope"]["source"] != "+1234567890")
+    valid_msg = {
+        "envelope": {
+            "dataMessage": {"message": "Hello, World!", "timestamp": 1234567890},
+            "source": "+1234567890",
+        }
+    }
+    await listener._handle_message(json.dumps(valid_msg))
+    handler.assert_not_awaited()
+    assert listener.stats["filtered_messages"] == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_message_data_key_in_text_is_not_data(mock_session):
+    """
+    Test that a frame matching the key in a string value is parsed and ignored.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=mock_session,
+    )
+    handler = AsyncMock()
+    listener.set_message_handler(handler)
+    frame = json.dumps(
+        {
+            "envelope": {
+                "source": "+1",
+                "sourceName": "dataMessage",
+                "receiptMessage": {},
+            }
+        }
+    )
+    await listener._handle_message(frame)
+    handler.assert_not_awaited()
+    assert listener.stats["parsed_frames"] == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_message_auto_responder(mock_session):
+    """
+    Test that the auto-responder sees messages before the handler.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=mock_session,
+    )
+    calls = []
+    handler = AsyncMock(side_effect=lambda msg: calls.append("handler"))
+    listener.set_message_handler(handler)
+    listener.set_auto_responder(lambda msg: calls.append("responder") or True)
+    valid_msg = {
+        "envelope": {
+            "dataMessage": {"message": "ping", "timestamp": 1234567890},
+            "source": "+1234567890",
+        }
+    }
+    await listener._handle_message(json.dumps(valid_msg))
+    assert calls == ["responder", "handler"]
+
+
+@pytest.mark.asyncio
+async def test_handle_message_drops_duplicate_envelope(mock_session):
+    """
+    Test that an envelope redelivered after a reconnection is handled once.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=mock_session,
+    )
+    handler = AsyncMock()
+    listener.set_message_handler(handler)
+    frame = json.dumps(
+        {
+            "envelope": {
+                "dataMessage": {"message": "Hello", "timestamp": 1234567890},
+                "source": "+1234567890",
+                "timestamp": 1234567890,
+            }
+        }
+    )
+    await listener._handle_message(frame)
+    await listener._handle_message(frame)
+    handler.assert_awaited_once()
+    assert listener.stats["duplicate_envelopes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_handle_message_rate_limited(mock_session):
+    """
+    Test that messages over the flood protection limits are dropped.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=mock_session,
+    )
+    handler = AsyncMock()
+    responder = MagicMock()
+    listener.set_message_handler(handler)
+    listener.set_auto_responder(responder)
+    listener.set_rate_limiter(lambda msg: msg["envelope"]["source"] != "+2")
+    for source in ("+1", "+2"):
+        await listener._handle_message(
+            json.dumps(
+                {
+                    "envelope": {
+                        "dataMessage": {"message": "Hello", "timestamp": 1234567890},
+                        "source": source,
+                    }
+                }
+            )
+        )
+    handler.assert_awaited_once()
+    responder.assert_called_once()
+    assert listener.stats["rate_limited_messages"] == 1
@@ -0,0 +1,209 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import aiohttp
+import pytest
+
+from custom_components.signal_gateway.signal.listener import (
+    DISCONNECT_CLOSED,
+    DISCONNECT_CONNECTION_ERROR,
+)
+from custom_components.signal_gateway.signal.websocket_listener import (
+    DISCONNECT_HEARTBEAT,
+    DISCONNECT_IDLE,
+    SignalWebSocketListener,
+)
+
+from .conftest import MockWebSocketClient, MockWSMessage
+
+
+def make_listener(mock_session):
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080", phone_number="123", session=mock_session
+    )
+    listener._running = True
+    return listener
+
+
+@pytest.mark.asyncio
+async def test_transport_settings_are_passed(mock_websocket_connects, mock_session):
+    """
+    Test that heartbeat, compression and max message size are configurable.
+    """
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def no_message_generator():
+            return
+            yield
+
+        yield MockWebSocketClient(no_message_generator)
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+    listener = make_listener(mock_session)
+    listener.heartbeat = 5
+    listener.compress = 15
+    listener.max_msg_size = 1024
+    ws_connect = MagicMock(side_effect=mock_session.ws_connect)
+    mock_session.ws_connect = ws_connect
+
+    await listener._connect_and_listen("ws://fake")
+
+    kwargs = ws_connect.call_args.kwargs
+    assert kwargs["heartbeat"] == 5
+    assert kwargs["compress"] == 15
+    assert kwargs["max_msg_size"] == 1024
+
+
+@pytest.mark.asyncio
+async def test_idle_watchdog_closes_silent_connection(
+    mock_websocket_connects, mock_session
+):
+    """
+    Test that a connection without any frame for idle_timeout is abandoned.
+    """
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def silent_generator():
+            yield json.dumps({"envelope": {"receiptMessage": {}}})
+            await asyncio.sleep(10)
+            yield "never received"
+
+        yield MockWebSocketClient(silent_generator)
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+    listener = make_listener(mock_session)
+    listener.idle_timeout = 0.05
+
+    await asyncio.wait_for(listener._connect_and_listen("ws://fake"), timeout=2)
+
+    assert listener._disconnect_reason == DISCONNECT_IDLE
+    listener._record_disconnect(None)
+    disconnect = listener.stats["recent_disconnects"][-1]
+    assert disconnect["reason"] == DISCONNECT_IDLE
+    assert disconnect["dead_for"] >= 0.05
+    assert listener.stats["disconnect_reasons"] == {DISCONNECT_IDLE: 1}
+
+
+@pytest.mark.asyncio
+async def test_idle_watchdog_counts_pongs(mock_websocket_connects, mock_session):
+    """
+    Test that heartbeat pongs keep a connection without data frames alive.
+    """
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def pong_generator():
+            for _ in range(10):
+                await asyncio.sleep(0.02)
+                yield MockWSMessage(b"", aiohttp.WSMsgType.PONG)
+
+        yield MockWebSocketClient(pong_generator)
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+    listener = make_listener(mock_session)
+    listener.idle_timeout = 0.1
+
+    await asyncio.wait_for(listener._connect_and_listen("ws://fake"), timeout=2)
+
+    assert listener._disconnect_reason == DISCONNECT_CLOSED
+
+
+@pytest.mark.asyncio
+async def test_ping_is_answered(mock_websocket_connects, mock_session):
+    """
+    Test that pings from the server are answered, automatic pongs being disabled.
+    """
+    client_holder = {}
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def ping_generator():
+            yield MockWSMessage(b"hello", aiohttp.WSMsgType.PING)
+
+        client = MockWebSocketClient(ping_generator)
+        client_holder["client"] = client
+        yield client
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+    listener = make_listener(mock_session)
+    ws_connect = MagicMock(side_effect=mock_session.ws_connect)
+    mock_session.ws_connect = ws_connect
+
+    await listener._connect_and_listen("ws://fake")
+
+    assert ws_connect.call_args.kwargs["autoping"] is False
+    assert client_holder["client"].pongs == [b"hello"]
+
+
+def test_configure_overrides_tuning_attributes(mock_session):
+    """
+    Test that configure only sets the tuning attributes of the listener.
+    """
+    listener = make_listener(mock_session)
+
+    listener.configure(heartbeat=None, idle_timeout=30, poll_interval_max=5, running=1)
+
+    assert listener.heartbeat is None
+    assert listener.idle_timeout == 30
+    assert SignalWebSocketListener.idle_timeout == 60.0
+    assert not hasattr(listener, "poll_interval_max")
+    assert listener.running is True
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_timeout_reason(mock_websocket_connects, mock_session):
+    """
+    Test that a missing pong is recorded as a heartbeat timeout.
+    """
+    client_holder = {}
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def error_generator():
+            yield MockWSMessage(None, aiohttp.WSMsgType.ERROR)
+
+        client = MockWebSocketClient(error_generator)
+        client._exception = aiohttp.ServerTimeoutError("No PONG received")
+        client_holder["client"] = client
+        yield client
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+    listener = make_listener(mock_session)
+
+    await listener._connect_and_listen("ws://fake")
+
+    assert listener._disconnect_reason == DISCONNECT_HEARTBEAT
+
+
+@pytest.mark.asyncio
+async def test_listen_records_disconnect_reasons(monkeypatch, mock_session):
+    """
+    Test that _listen records why each connection ended.
+    """
+    listener = make_listener(mock_session)
+    listener.retry_delay = 0.001
+    outcomes = iter([None, ConnectionError("refused"), None])
+
+    async def connect_and_listen(ws_url):
+        outcome = next(outcomes)
+        if outcome is None:
+            listener._disconnect_reason = DISCONNECT_CLOSED
+            return
+        raise outcome
+
+    original_record = listener._record_disconnect
+
+    def record_disconnect(error):
+        original_record(error)
+        if sum(listener._disconnect_reasons.values()) == 2:
+            listener._running = False
+
+    monkeypatch.setattr(listener, "_connect_and_listen", connect_and_listen)
+    monkeypatch.setattr(listener, "_record_disconnect", record_disconnect)
+    await asyncio.wait_for(listener._listen(), timeout=5)
+
+    stats = listener.stats
+    assert stats["disconnect_reasons"] == {
+        DISCONNECT_CLOSED: 1,
+        DISCONNECT_CONNECTION_ERROR: 1,
+    }
+    assert stats["recent_disconnects"][-1]["error"] == "refused"
+    assert stats["recent_disconnects"][-1]["dead_for"] is None
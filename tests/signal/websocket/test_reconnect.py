@@ -0,0 +1,133 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+from custom_components.signal_gateway.signal.websocket_listener import (
+    SignalWebSocketListener,
+)
+
+
+def make_listener(mock_session):
+    return SignalWebSocketListener(
+        api_url="http://localhost:8080",
+        phone_number="+33612345678",
+        session=mock_session,
+    )
+
+
+def test_backoff_delay_is_capped_and_jittered(mock_session):
+    """
+    Test that the backoff grows exponentially, is capped, and half random.
+    """
+    listener = make_listener(mock_session)
+    listener.retry_delay = 1
+    listener.max_retry_delay = 30
+    for attempt, expected in [(1, 1), (2, 2), (3, 4), (5, 16), (6, 30), (20, 30)]:
+        delays = [listener._backoff_delay(attempt) for _ in range(50)]
+        assert all(expected / 2 <= delay <= expected for delay in delays)
+        assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_listen_never_gives_up(monkeypatch, mock_session):
+    """
+    Test that _listen keeps reconnecting when max_retries is not set.
+    """
+    listener = make_listener(mock_session)
+    listener.retry_delay = 0.001
+    listener.max_retry_delay = 0.001
+    attempts = 0
+
+    async def failing_connect_and_listen(ws_url):
+        nonlocal attempts
+        attempts += 1
+        if attempts == 25:
+            listener._running = False
+        raise ConnectionError("signal-cli restarting")
+
+    monkeypatch.setattr(listener, "_connect_and_listen", failing_connect_and_listen)
+    listener._running = True
+    await asyncio.wait_for(listener._listen(), timeout=5)
+
+    assert attempts == 25
+    assert listener.stats["reconnects"] == 24
+
+
+@pytest.mark.asyncio
+async def test_listen_resets_backoff_after_stable_connection(monkeypatch, mock_session):
+    """
+    Test that the attempt counter restarts after a long enough connection.
+    """
+    listener = make_listener(mock_session)
+    listener.stable_connection_time = 0.05
+    seen_attempts = []
+    durations = iter([0, 0, 0.06, 0])
+
+    async def connect_and_listen(ws_url):
+        listener._connected_at = time.monotonic()
+        await asyncio.sleep(next(durations, 0))
+
+    def backoff_delay(attempt):
+        seen_attempts.append(attempt)
+        if len(seen_attempts) == 4:
+            listener._running = False
+        return 0
+
+    monkeypatch.setattr(listener, "_connect_and_listen", connect_and_listen)
+    monkeypatch.setattr(listener, "_backoff_delay", backoff_delay)
+    listener._running = True
+    await asyncio.wait_for(listener._listen(), timeout=5)
+
+    assert seen_attempts == [1, 2, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_listen_slow_handshake_keeps_backoff(monkeypatch, mock_session):
+    """
+    Test that a slow failing handshake does not count as a stable connection.
+    """
+    listener = make_listener(mock_session)
+    listener.stable_connection_time = 0.05
+    seen_attempts = []
+
+    async def slow_failing_handshake(ws_url):
+        await asyncio.sleep(0.06)
+        raise ConnectionError("handshake timed out")
+
+    def backoff_delay(attempt):
+        seen_attempts.append(attempt)
+        if len(seen_attempts) == 3:
+            listener._running = False
+        return 0
+
+    monkeypatch.setattr(listener, "_connect_and_listen", slow_failing_handshake)
+    monkeypatch.setattr(listener, "_backoff_delay", backoff_delay)
+    listener._running = True
+    await asyncio.wait_for(listener._listen(), timeout=5)
+
+    assert seen_attempts == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_reconnect_restarts_listener(monkeypatch, mock_session):
+    """
+    Test that reconnect() restarts a started listener, even after it gave up.
+    """
+    listener = make_listener(mock_session)
+    listen = AsyncMock()
+    monkeypatch.setattr(listener, "_listen", listen)
+
+    await listener.reconnect()
+    listen.assert_not_called()
+
+    await listener.connect()
+    await asyncio.sleep(0)
+    listener._running = False  # Gave up
+    await listener.reconnect()
+    await asyncio.sleep(0)
+
+    assert listener._running
+    assert listen.await_count == 2
+    await listener.disconnect()
@@ -0,0 +1,73 @@
+import json
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from custom_components.signal_gateway.signal.websocket_listener import (
+    SignalWebSocketListener,
+)
+
+from .conftest import MockWebSocketClient
+
+
+@pytest.mark.asyncio
+async def test_connection_state_notifies_listeners(
+    mock_websocket_connects, mock_session
+):
+    """
+    Test that connecting and disconnecting notify the state listeners.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080", phone_number="123", session=mock_session
+    )
+    states = []
+    remove = listener.add_state_listener(lambda: states.append(listener.connected))
+
+    async def websockets_clients_generator(*args, **kwargs):
+        async def one_message_generator():
+            yield json.dumps({"envelope": {"receiptMessage": {}}})
+
+        yield MockWebSocketClient(one_message_generator)
+
+    mock_websocket_connects.set_clients_generator(websockets_clients_generator)
+    listener._running = True
+    await listener._connect_and_listen("ws://fake")
+    assert states == [True]
+
+    listener._set_connected(False)
+    assert states == [True, False]
+
+    remove()
+    listener._set_connected(True)
+    assert states == [True, False]
+
+
+@pytest.mark.asyncio
+async def test_message_arrival_and_latency(mock_session):
+    """
+    Test that the arrival time and the receive latency of messages are recorded.
+    """
+    listener = SignalWebSocketListener(
+        api_url="http://localhost:8080", phone_number="123", session=mock_session
+    )
+    listener.set_message_handler(AsyncMock())
+    state_listener = MagicMock()
+    listener.add_state_listener(state_listener)
+    sent = int((time.time() - 2.5) * 1000)
+
+    await listener._handle_message(
+        json.dumps(
+            {
+                "envelope": {
+                    "source": "+1234567890",
+                    "dataMessage": {"message": "hi", "timestamp": sent},
+                }
+            }
+        )
+    )
+
+    state_listener.assert_called_once()
+    assert 2.4 < listener.receive_latency < 5
+    assert listener.last_message_time == pytest.approx(time.time(), abs=1)
+    assert listener.stats["receive_latency"] == listener.receive_latency
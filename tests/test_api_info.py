@@ -0,0 +1,44 @@
+"""Tests for the probe of the API capabilities."""
+
+from unittest.mock import AsyncMock, patch
+
+import aiohttp
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.signal_gateway.api_info import async_probe_api
+
+ABOUT = {
+    "mode": "normal",
+    "version": "0.92",
+    "build": 2,
+}
+
+
+@pytest.mark.asyncio
+async def test_probe_api_warns_about_normal_mode(hass: HomeAssistant, caplog):
+    """Test that the normal mode and an unhealthy API are reported."""
+    with patch(
+        "custom_components.signal_gateway.api_info.SignalHTTPClient.probe",
+        AsyncMock(return_value={**ABOUT, "healthy": False}),
+    ):
+        info = await async_probe_api(hass, "http://localhost:8080", "+1234567890")
+
+    # The health status is not cached
+    assert info == ABOUT
+    assert "runs in normal mode" in caplog.text
+    assert "reports it is unhealthy" in caplog.text
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [aiohttp.ClientError("refused"), TimeoutError(), RuntimeError("404")]
+)
+async def test_probe_api_unreachable(hass: HomeAssistant, caplog, error):
+    """Test that an unreachable API returns no capabilities."""
+    with patch(
+        "custom_components.signal_gateway.api_info.SignalHTTPClient.probe",
+        AsyncMock(side_effect=error),
+    ):
+        assert await async_probe_api(hass, "http://localhost:8080", "+1") is None
+    assert "Cannot query signal-cli-rest-api" in caplog.text
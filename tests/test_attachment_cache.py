@@ -0,0 +1,161 @@
+"""Tests for the cache of received attachments."""
+
+import asyncio
+import os
+
+import pytest
+from homeassistant.core import HomeAssistant
+from unittest.mock import MagicMock
+
+from custom_components.signal_gateway import attachment_cache
+from custom_components.signal_gateway.attachment_cache import AttachmentCache
+
+
+class FakeClient:
+    """Signal client serving attachments from a dictionary."""
+
+    def __init__(self, contents, error=None):
+        self.contents = contents
+        self.error = error
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+
+    async def iter_attachment(self, attachment_id, size=0):
+        self.requests.append(attachment_id)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0)
+            if self.error:
+                raise self.error
+            content = self.contents[attachment_id]
+            for start in range(0, len(content), 4):
+                yield content[start : start + 4]
+        finally:
+            self.active -= 1
+
+
+def attachment(attachment_id, size=None):
+    return {"id": attachment_id, "content_type": "image/jpeg", "size": size}
+
+
+@pytest.mark.asyncio
+async def test_fetch_all_downloads_concurrently(hass: HomeAssistant, tmp_path):
+    """Test that attachments are downloaded in parallel within the limit."""
+    contents = {f"a{index}.jpg": b"x" * (index + 1) for index in range(6)}
+    client = FakeClient(contents)
+    cache = AttachmentCache(hass, client, tmp_path / "cache", max_parallel=2)
+    await cache.async_load()
+
+    result = await cache.async_fetch_all([attachment(name) for name in contents])
+
+    assert client.max_active == 2
+    for item in result:
+        assert (tmp_path / "cache" / item["id"]).read_bytes() == contents[item["id"]]
+        assert item["path"] == str(tmp_path / "cache" / item["id"])
+        assert item["content_type"] == "image/jpeg"
+    assert cache.stats["downloads"] == 6
+    assert cache.size == sum(len(content) for content in contents.values())
+
+
+@pytest.mark.asyncio
+async def test_cached_attachment_is_not_downloaded_again(hass: HomeAssistant, tmp_path):
+    """Test that a cached attachment is served from the directory."""
+    client = FakeClient({"a.jpg": b"content"})
+    cache = AttachmentCache(hass, client, tmp_path)
+
+    first = await cache.async_fetch(attachment("a.jpg"))
+    second = await cache.async_fetch(attachment("a.jpg"))
+
+    assert first == second
+    assert client.requests == ["a.jpg"]
+    assert cache.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_files_are_evicted(hass: HomeAssistant, tmp_path):
+    """Test that the oldest unused files are removed above the size limit."""
+    client = FakeClient({name: b"x" * 10 for name in ("a", "b", "c", "d")})
+    cache = AttachmentCache(hass, client, tmp_path, max_bytes=30)
+
+    for name in ("a", "b", "c"):
+        await cache.async_fetch(attachment(name))
+    # "a" is used again, "b" becomes the least recently used
+    await cache.async_fetch(attachment("a"))
+    await cache.async_fetch(attachment("d"))
+
+    assert sorted(os.listdir(tmp_path)) == ["a", "c", "d"]
+    assert len(cache) == 3
+    assert cache.size == 30
+
+
+@pytest.mark.asyncio
+async def test_load_existing_files(hass: HomeAssistant, tmp_path):
+    """Test that files downloaded before a restart are reused or evicted."""
+    (tmp_path / "old").write_bytes(b"x" * 10)
+    os.utime(tmp_path / "old", (1, 1))
+    (tmp_path / "new").write_bytes(b"x" * 10)
+    (tmp_path / "partial.part").write_bytes(b"x")
+
+    cache = AttachmentCache(hass, FakeClient({}), tmp_path, max_bytes=15)
+    await cache.async_load()
+
+    assert os.listdir(tmp_path) == ["new"]
+    assert await cache.async_fetch(attachment("new")) == str(tmp_path / "new")
+
+
+@pytest.mark.asyncio
+async def test_download_errors_leave_no_file(hass: HomeAssistant, tmp_path):
+    """Test that failed or oversized downloads are reported without path."""
+    cache = AttachmentCache(
+        hass, FakeClient({}, error=RuntimeError("Signal API error: 404")), tmp_path
+    )
+    assert await cache.async_fetch(attachment("missing")) is None
+    assert cache.errors == 1
+
+    cache = AttachmentCache(hass, FakeClient({"big": b"x" * 20}), tmp_path)
+    cache.max_file_bytes = 10
+    assert await cache.async_fetch(attachment("big")) is None
+    # The size announced in the envelope is checked before downloading
+    assert await cache.async_fetch(attachment("big", size=20)) is None
+    assert cache.errors == 1
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.asyncio
+async def test_download_is_written_by_blocks(
+    hass: HomeAssistant, tmp_path, monkeypatch
+):
+    """Test that downloaded chunks are buffered into larger writes."""
+    monkeypatch.setattr(attachment_cache, "WRITE_BLOCK_SIZE", 8)
+    writes = []
+    open_file = AttachmentCache._open
+
+    class RecordingFile:
+        def __init__(self, path):
+            self.file = open_file(path)
+
+        def write(self, data):
+            writes.append(len(data))
+            return self.file.write(data)
+
+        def close(self):
+            self.file.close()
+
+    monkeypatch.setattr(AttachmentCache, "_open", staticmethod(RecordingFile))
+    cache = AttachmentCache(hass, FakeClient({"a.jpg": b"x" * 20}), tmp_path)
+
+    assert await cache.async_fetch(attachment("a.jpg")) == str(tmp_path / "a.jpg")
+    # Chunks of 4 bytes, written by blocks of 8 bytes and the remainder
+    assert writes == [8, 8, 4]
+    assert (tmp_path / "a.jpg").read_bytes() == b"x" * 20
+
+
+@pytest.mark.asyncio
+async def test_unsafe_attachment_id_is_ignored(tmp_path):
+    """Test that attachment IDs cannot escape the cache directory."""
+    client = FakeClient({})
+    cache = AttachmentCache(MagicMock(), client, tmp_path)
+    assert await cache.async_fetch(attachment("../secrets.yaml")) is None
+    assert client.requests == []
@@ -0,0 +1,223 @@
+"""Tests for pre-registered attachments."""
+
+import base64
+import io
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+
+from custom_components.signal_gateway.attachments import (
+    ASSETS_DIRECTORY,
+    STORAGE_KEY,
+    AttachmentRegistry,
+    compress_image,
+)
+from custom_components.signal_gateway.const import (
+    DATA_ATTACHMENT_REGISTRY,
+    DOMAIN,
+    SERVICE_REGISTER_ATTACHMENT,
+    SERVICE_UNREGISTER_ATTACHMENT,
+)
+
+
+@pytest.fixture(autouse=True)
+def config_dir(hass: HomeAssistant, tmp_path):
+    """Write the asset files in a temporary configuration folder."""
+    hass.config.config_dir = str(tmp_path / "config")
+    return tmp_path / "config"
+
+
+@pytest.mark.asyncio
+async def test_register_and_get(hass: HomeAssistant, tmp_path):
+    """Test registering a file and getting its encoded content."""
+    asset = tmp_path / "Floor Plan.svg"
+    asset.write_bytes(b"<svg></svg>")
+
+    registry = AttachmentRegistry(hass)
+    attachment = await registry.async_register(str(asset))
+
+    assert attachment.handle == "floor_plan"
+    assert registry.get("floor_plan") == base64.b64encode(b"<svg></svg>").decode()
+    assert registry.memory_usage == len(attachment.base64_content)
+
+
+@pytest.mark.asyncio
+async def test_register_invalid_file(hass: HomeAssistant):
+    """Test registering a missing file."""
+    registry = AttachmentRegistry(hass)
+    with pytest.raises(ValueError, match="not found"):
+        await registry.async_register("/nonexistent.png")
+
+
+@pytest.mark.asyncio
+async def test_register_invalid_handle(hass: HomeAssistant, tmp_path):
+    """Test that handles naming other files are rejected."""
+    asset = tmp_path / "logo.png"
+    asset.write_bytes(b"logo")
+    registry = AttachmentRegistry(hass)
+    with pytest.raises(ValueError, match="Invalid attachment handle"):
+        await registry.async_register(str(asset), handle="../logo")
+
+
+@pytest.mark.asyncio
+async def test_get_unknown_handle(hass: HomeAssistant):
+    """Test getting an unknown handle."""
+    registry = AttachmentRegistry(hass)
+    with pytest.raises(ValueError, match="Unknown attachment handle"):
+        registry.get("missing")
+
+
+@pytest.mark.asyncio
+async def test_registry_persisted(
+    hass: HomeAssistant, hass_storage, tmp_path, config_dir
+):
+    """Test that registered attachments survive a restart."""
+    asset = tmp_path / "logo.png"
+    asset.write_bytes(b"logo")
+
+    registry = AttachmentRegistry(hass)
+    await registry.async_register(str(asset), handle="brand")
+    assert await registry.async_unregister("missing") is False
+
+    # Only the metadata is stored, the content is in its own file
+    assert hass_storage[STORAGE_KEY]["data"]["attachments"] == [
+        {"handle": "brand", "source": str(asset), "size": 4, "compressed": False}
+    ]
+    asset_path = config_dir / ".storage" / ASSETS_DIRECTORY / "brand"
+    assert asset_path.read_bytes() == b"logo"
+
+    reloaded = AttachmentRegistry(hass)
+    await reloaded.async_load()
+    assert reloaded.get("brand") == base64.b64encode(b"logo").decode()
+
+    assert await reloaded.async_unregister("brand") is True
+    assert reloaded.as_dict() == {"memory_usage": 0, "attachments": []}
+    assert not asset_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_registry_migrated_from_version_1(
+    hass: HomeAssistant, hass_storage, config_dir
+):
+    """Test that contents stored in the metadata are moved to asset files."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 1,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "attachments": [
+                {
+                    "handle": "brand",
+                    "source": "/config/www/logo.png",
+                    "size": 4,
+                    "compressed": False,
+                    "base64_content": base64.b64encode(b"logo").decode(),
+                }
+            ]
+        },
+    }
+
+    registry = AttachmentRegistry(hass)
+    await registry.async_load()
+
+    assert registry.get("brand") == base64.b64encode(b"logo").decode()
+    assert (config_dir / ".storage" / ASSETS_DIRECTORY / "brand").read_bytes() == (
+        b"logo"
+    )
+    assert hass_storage[STORAGE_KEY]["version"] == 2
+    assert "base64_content" not in hass_storage[STORAGE_KEY]["data"]["attachments"][0]
+
+
+@pytest.mark.asyncio
+async def test_missing_asset_file_is_skipped(hass: HomeAssistant, hass_storage):
+    """Test that an attachment whose file was deleted is not loaded."""
+    hass_storage[STORAGE_KEY] = {
+        "version": 2,
+        "minor_version": 1,
+        "key": STORAGE_KEY,
+        "data": {
+            "attachments": [
+                {"handle": "gone", "source": "/a", "size": 1, "compressed": False}
+            ]
+        },
+    }
+    registry = AttachmentRegistry(hass)
+    await registry.async_load()
+    assert registry.as_dict()["attachments"] == []
+
+
+def test_compress_image():
+    """Test that large images are downscaled and re-encoded."""
+    from PIL import Image
+
+    output = io.BytesIO()
+    Image.new("RGB", (4000, 3000), "white").save(output, format="PNG")
+    content = output.getvalue()
+
+    compressed = compress_image(content)
+
+    with Image.open(io.BytesIO(compressed)) as image:
+        assert image.format == "JPEG"
+        assert max(image.size) == 2048
+
+
+def test_compress_transparent_image():
+    """Test that transparent areas are flattened onto white, not black."""
+    from PIL import Image
+
+    noise = Image.effect_noise((3000, 3000), 64)
+    alpha = Image.new("L", noise.size, 255)
+    alpha.paste(0, (0, 0, 1000, 1000))
+    output = io.BytesIO()
+    Image.merge("RGBA", (noise, noise, noise, alpha)).save(output, format="PNG")
+
+    compressed = compress_image(output.getvalue())
+
+    with Image.open(io.BytesIO(compressed)) as image:
+        assert image.format == "JPEG"
+        assert min(image.getpixel((100, 100))) > 240
+
+
+def test_compress_not_an_image():
+    """Test that compressing a non-image fails."""
+    with pytest.raises(ValueError, match="Only images"):
+        compress_image(b"not an image")
+
+
+@pytest.mark.asyncio
+async def test_register_attachment_services(hass: HomeAssistant, tmp_path):
+    """Test the register and unregister attachment services."""
+    asset = tmp_path / "chime.wav"
+    asset.write_bytes(b"RIFF")
+
+    assert await async_setup_component(hass, DOMAIN, {})
+    await hass.async_block_till_done()
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_REGISTER_ATTACHMENT,
+        {"path": str(asset)},
+        blocking=True,
+        return_response=True,
+    )
+    assert response["handle"] == "chime"
+    assert response["total_memory_usage"] == len(base64.b64encode(b"RIFF"))
+    assert hass.data[DATA_ATTACHMENT_REGISTRY].get("chime")
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_UNREGISTER_ATTACHMENT, {"handle": "chime"}, blocking=True
+    )
+    with pytest.raises(HomeAssistantError, match="Unknown attachment handle"):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_UNREGISTER_ATTACHMENT, {"handle": "chime"}, blocking=True
+        )
+    with pytest.raises(HomeAssistantError, match="not found"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_REGISTER_ATTACHMENT,
+            {"path": str(tmp_path / "missing.wav")},
+            blocking=True,
+            return_response=True,
+        )
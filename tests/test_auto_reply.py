@@ -0,0 +1,91 @@
+"""Tests for the built-in auto-responder."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.signal_gateway.auto_reply import (
+    AutoResponder,
+    parse_auto_replies,
+)
+
+
+def make_msg(text, group_id=None):
+    data_message = {"message": text, "timestamp": 1234567890}
+    if group_id:
+        data_message["groupInfo"] = {"groupId": group_id}
+    return {"envelope": {"sourceNumber": "+1111111111", "dataMessage": data_message}}
+
+
+@pytest.fixture
+def mock_client():
+    client = MagicMock()
+    client.send_message = AsyncMock(return_value={"timestamp": "1"})
+    return client
+
+
+@pytest.mark.asyncio
+async def test_reply_with_rendered_template(hass: HomeAssistant, mock_client):
+    """Test that a matching message is answered with the rendered template."""
+    hass.states.async_set("alarm_control_panel.home", "armed_away")
+    responder = AutoResponder(
+        hass,
+        mock_client,
+        parse_auto_replies(
+            "status: Alarm {{ states('alarm_control_panel.home') }} for {{ sender }}"
+        ),
+    )
+
+    assert responder(make_msg("  Status "))
+    await hass.async_block_till_done()
+
+    mock_client.send_message.assert_awaited_once_with(
+        "+1111111111", "Alarm armed_away for +1111111111"
+    )
+    stats = responder.stats["status"]
+    assert stats["replies"] == 1
+    assert stats["last_response_time"] is not None
+
+
+@pytest.mark.asyncio
+async def test_reply_to_group(hass: HomeAssistant, mock_client):
+    """Test that group messages are answered in the group."""
+    responder = AutoResponder(hass, mock_client, {"ping": "pong"})
+
+    assert responder(make_msg("ping", group_id="abcd"))
+    await hass.async_block_till_done()
+
+    mock_client.send_message.assert_awaited_once_with("group.YWJjZA==", "pong")
+
+
+@pytest.mark.asyncio
+async def test_no_reply_without_match(hass: HomeAssistant, mock_client):
+    """Test that only whole-message matches are answered."""
+    responder = AutoResponder(hass, mock_client, {"ping": "pong"})
+
+    assert not responder(make_msg("ping me"))
+    assert not responder(make_msg(None))
+    await hass.async_block_till_done()
+
+    mock_client.send_message.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_reply_error_is_counted(hass: HomeAssistant, mock_client):
+    """Test that send errors are logged and counted."""
+    mock_client.send_message.side_effect = RuntimeError("Signal API error: 400")
+    responder = AutoResponder(hass, mock_client, {"ping": "pong"})
+
+    responder(make_msg("ping"))
+    await hass.async_block_till_done()
+
+    assert responder.stats["ping"]["errors"] == 1
+    assert responder.stats["ping"]["replies"] == 0
+
+
+@pytest.mark.parametrize("rules", ["ping", "ping:", ": pong"])
+def test_parse_auto_replies_invalid(rules):
+    """Test that malformed rules are rejected."""
+    with pytest.raises(ValueError):
+        parse_auto_replies(rules)
@@ -129,3 +129,119 @@ async def test_options_flow_uses_current_config_as_defaults(mock_config_entry):
 
     assert result["type"] == FlowResultType.FORM
     # Schema should be built with current config entry data as defaults
+
+
+@pytest.mark.asyncio
+async def test_options_flow_shows_filters(mock_config_entry):
+    """Test that the options form includes the message filters."""
+    from custom_components.signal_gateway.const import (
+        CONF_GROUP_SAMPLING,
+        CONF_MESSAGE_REGEX,
+        CONF_SENDER_ALLOWLIST,
+    )
+
+    flow = SignalGatewayOptionsFlow(mock_config_entry)
+    flow.hass = MagicMock()
+
+    result = await flow.async_step_init()
+
+    schema_keys = {str(key) for key in result["data_schema"].schema}
+    assert {
+        CONF_SENDER_ALLOWLIST,
+        CONF_MESSAGE_REGEX,
+        CONF_GROUP_SAMPLING,
+    } <= schema_keys
+
+
+@pytest.mark.asyncio
+async def test_options_flow_invalid_filter(valid_user_input, mock_config_entry):
+    """Test options flow with an invalid message regex."""
+    flow = SignalGatewayOptionsFlow(mock_config_entry)
+
+    mock_hass = MagicMock()
+    mock_hass.config_entries.async_entries = MagicMock(return_value=[])
+    flow.hass = mock_hass
+
+    result = await flow.async_step_init(
+        user_input={**valid_user_input, "message_regex": "(unclosed"}
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"]["base"] == "invalid_filter"
+
+
+@pytest.mark.asyncio
+async def test_options_flow_shows_tuning(mock_config_entry):
+    """Test that the options form includes the transport tuning fields."""
+    flow = SignalGatewayOptionsFlow(mock_config_entry)
+    flow.hass = MagicMock()
+
+    result = await flow.async_step_init()
+
+    schema_keys = {str(key) for key in result["data_schema"].schema}
+    assert {
+        "websocket_heartbeat",
+        "websocket_idle_timeout",
+        "max_attachments_per_message",
+        "spool_threshold_mb",
+        "attachment_cache_mb",
+        "max_received_attachment_mb",
+        "max_parallel_downloads",
+        "timeout_floor",
+        "timeout_ceiling",
+        "websocket_queue_size",
+        "websocket_overflow_policy",
+    } <= schema_keys
+
+
+@pytest.mark.asyncio
+async def test_options_flow_rejects_unknown_overflow_policy(mock_config_entry):
+    """Test that the overflow policy must be one of the listener policies."""
+    import voluptuous as vol
+
+    flow = SignalGatewayOptionsFlow(mock_config_entry)
+    flow.hass = MagicMock()
+
+    result = await flow.async_step_init()
+
+    schema = result["data_schema"]
+    validated = schema(
+        {**mock_config_entry.data, "websocket_overflow_policy": "drop_oldest"}
+    )
+    assert validated["websocket_overflow_policy"] == "drop_oldest"
+    with pytest.raises(vol.Invalid):
+        schema({**mock_config_entry.data, "websocket_overflow_policy": "drop_newest"})
+
+
+@pytest.mark.asyncio
+async def test_options_flow_invalid_timeouts(valid_user_input, mock_config_entry):
+    """Test options flow with a timeout ceiling below the floor."""
+    flow = SignalGatewayOptionsFlow(mock_config_entry)
+
+    mock_hass = MagicMock()
+    mock_hass.config_entries.async_entries = MagicMock(return_value=[])
+    flow.hass = mock_hass
+
+    result = await flow.async_step_init(
+        user_input={**valid_user_input, "timeout_floor": 60, "timeout_ceiling": 30}
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"]["base"] == "invalid_timeouts"
+
+
+@pytest.mark.asyncio
+async def test_options_flow_keeps_cached_api_info(valid_user_input, mock_config_entry):
+    """Test that the cached capabilities are kept when the API is unreachable."""
+    mock_config_entry.data = {**mock_config_entry.data, "api_info": {"mode": "native"}}
+    flow = SignalGatewayOptionsFlow(mock_config_entry)
+    mock_hass = MagicMock()
+    mock_hass.config_entries.async_entries = MagicMock(return_value=[mock_config_entry])
+    flow.hass = mock_hass
+
+    result = await flow.async_step_init(user_input=valid_user_input)
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    mock_hass.config_entries.async_update_entry.assert_called_once_with(
+        mock_config_entry, data={**valid_user_input, "api_info": {"mode": "native"}}
+    )
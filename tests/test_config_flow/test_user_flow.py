@@ -112,3 +112,25 @@ async def test_user_flow_preserves_input_on_error(valid_user_input):
     assert result["type"] == FlowResultType.FORM
     assert result["data_schema"] is not None
     # The schema should be built with the invalid input to preserve values
+
+
+@pytest.mark.asyncio
+async def test_user_flow_records_api_info(
+    valid_user_input, mock_setup_entry, mock_probe_api
+):
+    """Test that the probed API capabilities are stored in the entry."""
+    mock_probe_api.return_value = {"mode": "json-rpc", "version": "0.92"}
+    flow = SignalGatewayConfigFlow()
+    flow.hass = MagicMock()
+    flow._async_current_entries = MagicMock(return_value=[])
+
+    result = await flow.async_step_user(user_input=valid_user_input)
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"] == {
+        **valid_user_input,
+        "api_info": {"mode": "json-rpc", "version": "0.92"},
+    }
+    mock_probe_api.assert_awaited_once_with(
+        flow.hass, "http://192.168.1.100:8080", "+1234567890"
+    )
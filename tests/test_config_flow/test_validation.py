@@ -176,3 +176,47 @@ def test_validate_signal_gateway_input_https_url():
     }
 
     validate_signal_gateway_input(user_input, [])
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {"message_regex": "(unclosed"},
+        {"group_sampling": "group.abc: never"},
+    ],
+)
+def test_validate_signal_gateway_input_invalid_filter(valid_user_input, filters):
+    """Test validation with an invalid message filter."""
+    from custom_components.signal_gateway.config_flow import InvalidFilterError
+
+    with pytest.raises(InvalidFilterError):
+        validate_signal_gateway_input({**valid_user_input, **filters}, [])
+
+
+def test_validate_signal_gateway_input_invalid_commands(valid_user_input):
+    """Test validation with an invalid command rule."""
+    from custom_components.signal_gateway.config_flow import InvalidCommandError
+
+    with pytest.raises(InvalidCommandError):
+        validate_signal_gateway_input(
+            {**valid_user_input, "commands": "/lights off: not a service"}, []
+        )
+
+
+@pytest.mark.parametrize("rules", ["ping", "status: {{ states('sun.sun') "])
+def test_validate_signal_gateway_input_invalid_auto_replies(valid_user_input, rules):
+    """Test validation with an invalid auto-reply rule or template."""
+    from custom_components.signal_gateway.config_flow import InvalidAutoReplyError
+
+    with pytest.raises(InvalidAutoReplyError):
+        validate_signal_gateway_input({**valid_user_input, "auto_replies": rules}, [])
+
+
+def test_validate_signal_gateway_input_invalid_timeouts(valid_user_input):
+    """Test validation with a timeout ceiling below the floor."""
+    from custom_components.signal_gateway.config_flow import InvalidTimeoutsError
+
+    with pytest.raises(InvalidTimeoutsError):
+        validate_signal_gateway_input(
+            {**valid_user_input, "timeout_floor": 60, "timeout_ceiling": 30}, []
+        )
@@ -0,0 +1,91 @@
+"""Tests for Signal Gateway diagnostics."""
+
+import pytest
+from unittest.mock import MagicMock
+
+from custom_components.signal_gateway.const import (
+    CONF_GROUP_ALLOWLIST,
+    CONF_PHONE_NUMBER,
+    CONF_SENDER_ALLOWLIST,
+    CONF_SENDER_DENYLIST,
+    CONF_SIGNAL_CLI_REST_API_URL,
+    DOMAIN,
+)
+from custom_components.signal_gateway.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.signal_gateway.signal import AdaptiveTimeout, RateLimiter
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_reports_timeouts():
+    """Test that diagnostics expose learned timeouts and redact numbers."""
+    client = MagicMock()
+    client.timeout_estimates = {"/v2/send": {"latency": 0.5}}
+    client.listener_stats = {"queue_depth": 0}
+    notify_service = MagicMock()
+    notify_service.download_timeouts = AdaptiveTimeout()
+    notify_service.download_timeouts.record("example.com", 100, 0.2)
+
+    entry = MagicMock()
+    entry.entry_id = "test_entry_id"
+    entry.data = {
+        CONF_SIGNAL_CLI_REST_API_URL: "http://localhost:8080",
+        CONF_PHONE_NUMBER: "+1234567890",
+        CONF_SENDER_ALLOWLIST: "+1111111111",
+        CONF_SENDER_DENYLIST: "+2222222222",
+        CONF_GROUP_ALLOWLIST: "abcd",
+    }
+    hass = MagicMock()
+    hass.data = {
+        DOMAIN: {"test_entry_id": {"client": client, "notify_service": notify_service}}
+    }
+
+    result = await async_get_config_entry_diagnostics(hass, entry)
+
+    for key in (
+        CONF_PHONE_NUMBER,
+        CONF_SENDER_ALLOWLIST,
+        CONF_SENDER_DENYLIST,
+        CONF_GROUP_ALLOWLIST,
+    ):
+        assert result["entry"][key] == "**REDACTED**"
+    assert result["listener"] == {"queue_depth": 0}
+    assert result["timeouts"]["api"] == {"/v2/send": {"latency": 0.5}}
+    assert result["timeouts"]["downloads"]["example.com"]["samples"] == 1
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_entry_not_loaded():
+    """Test diagnostics of an entry that is not set up."""
+    entry = MagicMock()
+    entry.entry_id = "test_entry_id"
+    entry.data = {}
+    hass = MagicMock()
+    hass.data = {}
+
+    result = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert result["timeouts"] == {"api": {}, "downloads": {}}
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_rate_limited_counts_only():
+    """Test that flood protection reports counts, not senders or groups."""
+    rate_limiter = RateLimiter(sender_rate=1)
+    msg = {"envelope": {"sourceNumber": "+1234567890", "dataMessage": {}}}
+    for _ in range(3):
+        rate_limiter(msg)
+    entry = MagicMock()
+    entry.entry_id = "test_entry_id"
+    entry.data = {}
+    hass = MagicMock()
+    hass.data = {DOMAIN: {"test_entry_id": {"rate_limiter": rate_limiter}}}
+
+    result = await async_get_config_entry_diagnostics(hass, entry)
+
+    assert result["rate_limited"] == {
+        "senders": {"sources": 1, "dropped": 2},
+        "groups": {"sources": 0, "dropped": 0},
+    }
+    assert "+1234567890" not in str(result)
@@ -8,21 +8,29 @@ Tests the full integration lifecycle using Home Assistant's testing framework:
 - Config entry reload/unload
 """
 
+from datetime import timedelta
+
 import pytest
-from pytest_homeassistant_custom_component.common import MockConfigEntry
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from homeassistant.core import HomeAssistant
 from homeassistant.const import CONF_NAME
 from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
 
 from custom_components.signal_gateway.const import (
     DOMAIN,
     CONF_SIGNAL_CLI_REST_API_URL,
     CONF_PHONE_NUMBER,
+    CONF_RECEIVE_MODE,
     CONF_WEBSOCKET_ENABLED,
     EVENT_SIGNAL_RECEIVED,
 )
+from custom_components.signal_gateway.signal import SignalClient, SignalPollingListener
 
 
 @pytest.fixture
@@ -142,12 +150,12 @@ async def test_websocket_event_handling(hass: HomeAssistant, mock_signal_client)
     # Verify event was fired
     assert len(events) == 1
     event_data = events[0].data
-    # Event data contains the raw message envelope
-    assert "envelope" in event_data
-    assert event_data["envelope"]["source"] == "+33698765432"
-    assert (
-        event_data["envelope"]["dataMessage"]["message"] == "Test message from Signal"
-    )
+    # Event data is flattened, without the raw envelope by default
+    assert "envelope" not in event_data
+    assert event_data["sender"] == "+33698765432"
+    assert event_data["reply_to"] == "+33698765432"
+    assert event_data["message"] == "Test message from Signal"
+    assert event_data["group_id"] is None
 
     # Cleanup
     assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -266,3 +274,161 @@ async def test_multiple_config_entries(hass: HomeAssistant, mock_signal_client):
     # Cleanup
     assert await hass.config_entries.async_unload(entry2.entry_id)
     await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_reload_on_non_live_option_change(hass: HomeAssistant):
+    """Test that reloads triggered by option changes do not leak the old entry."""
+    clients = []
+
+    def new_client(*args, **kwargs):
+        client = MagicMock()
+        client.start_listening = AsyncMock()
+        client.stop_listening = AsyncMock()
+        clients.append(client)
+        return client
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_NAME: "test_gateway_reload",
+            CONF_SIGNAL_CLI_REST_API_URL: "http://localhost:8080",
+            CONF_PHONE_NUMBER: "+33612345678",
+            CONF_WEBSOCKET_ENABLED: True,
+        },
+        entry_id="test_entry_reload",
+        unique_id="test_gateway_reload",
+    )
+    config_entry.add_to_hass(hass)
+
+    with patch("custom_components.signal_gateway.SignalClient", side_effect=new_client):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+        for url in ("http://signal:8080", "http://signal:8081"):
+            hass.config_entries.async_update_entry(
+                config_entry,
+                data={**config_entry.data, CONF_SIGNAL_CLI_REST_API_URL: url},
+            )
+            await hass.async_block_till_done()
+
+    assert len(clients) == 3
+    running = [client for client in clients if not client.stop_listening.called]
+    assert running == [clients[-1]]
+    assert len(config_entry.update_listeners) == 1
+    assert hass.data[DOMAIN]["test_entry_reload"]["client"] is clients[-1]
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_on_demand_after_reload(hass: HomeAssistant):
+    """Test that only the client of the current setup is started on demand."""
+    clients = []
+
+    def new_client(*args, **kwargs):
+        client = MagicMock()
+        client.listening = False
+        client.subscribers = 0
+
+        async def start():
+            client.listening = True
+
+        async def stop():
+            client.listening = False
+
+        client.start_listening = AsyncMock(side_effect=start)
+        client.stop_listening = AsyncMock(side_effect=stop)
+        clients.append(client)
+        return client
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_NAME: "test_gateway_on_demand",
+            CONF_SIGNAL_CLI_REST_API_URL: "http://localhost:8080",
+            CONF_PHONE_NUMBER: "+33612345678",
+            CONF_WEBSOCKET_ENABLED: True,
+            "receive_on_demand": True,
+        },
+        entry_id="test_entry_on_demand",
+        unique_id="test_gateway_on_demand",
+    )
+    config_entry.add_to_hass(hass)
+
+    with patch("custom_components.signal_gateway.SignalClient", side_effect=new_client):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        hass.config_entries.async_update_entry(
+            config_entry,
+            data={**config_entry.data, CONF_SIGNAL_CLI_REST_API_URL: "http://s:8080"},
+        )
+        await hass.async_block_till_done()
+
+    remove = hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, lambda event: None)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done()
+
+    old_client, new_client = clients
+    old_client.start_listening.assert_not_called()
+    new_client.start_listening.assert_awaited_once()
+
+    remove()
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.mark.asyncio
+async def test_dedup_survives_transport_switch(hass: HomeAssistant):
+    """Test that an envelope received again after a transport switch is dropped."""
+    clients = []
+
+    def new_client(*args, **kwargs):
+        client = SignalClient(*args, **kwargs)
+        client.start_listening = AsyncMock()
+        client.stop_listening = AsyncMock()
+        clients.append(client)
+        return client
+
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            CONF_NAME: "test_gateway_switch",
+            CONF_SIGNAL_CLI_REST_API_URL: "http://localhost:8080",
+            CONF_PHONE_NUMBER: "+33612345678",
+            CONF_WEBSOCKET_ENABLED: True,
+            CONF_RECEIVE_MODE: "websocket",
+        },
+        entry_id="test_entry_switch",
+    )
+    config_entry.add_to_hass(hass)
+    events = []
+    hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, events.append)
+    msg = {
+        "envelope": {
+            "sourceNumber": "+1234567890",
+            "timestamp": 1000,
+            "dataMessage": {"message": "Door open", "timestamp": 1000},
+        }
+    }
+
+    with patch("custom_components.signal_gateway.SignalClient", side_effect=new_client):
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        await clients[0]._ws_listener._handle_data(msg)
+
+        hass.config_entries.async_update_entry(
+            config_entry, data={**config_entry.data, CONF_RECEIVE_MODE: "polling"}
+        )
+        await hass.async_block_till_done()
+        # signal-cli delivers the envelope again to the new transport
+        await clients[1]._ws_listener._handle_data(msg)
+        await hass.async_block_till_done()
+
+    assert isinstance(clients[1]._ws_listener, SignalPollingListener)
+    assert len(events) == 1
+    assert clients[1].listener_stats["duplicate_envelopes"] == 1
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
@@ -4,7 +4,7 @@ import pytest
 from unittest.mock import AsyncMock, MagicMock
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_NAME
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CoreState, HomeAssistant
 
 from custom_components.signal_gateway.const import (
     CONF_PHONE_NUMBER,
@@ -20,6 +20,13 @@ def mock_hass():
     """Create a mock HomeAssistant instance."""
     hass = MagicMock(spec=HomeAssistant)
     hass.data = {DOMAIN: {}}
+    hass.state = CoreState.running
+    hass.config = MagicMock()
+    hass.config.media_dirs = {}
+    hass.config.path = MagicMock(return_value="/nonexistent/media")
+    hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda target, *args: target(*args)
+    )
     hass.bus = MagicMock()
     hass.bus.async_fire = MagicMock()
     hass.config_entries = MagicMock()
@@ -1,28 +1,125 @@
 """Tests for async_reload_entry function."""
 
 import pytest
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 
 from custom_components.signal_gateway import async_reload_entry
+from custom_components.signal_gateway.const import DOMAIN
+from custom_components.signal_gateway.signal import RateLimiter
 
 
 @pytest.mark.asyncio
 async def test_reload_entry():
-    """Test reload calls unload then setup."""
+    """Test reload goes through the config entries manager."""
     mock_hass = MagicMock(spec=HomeAssistant)
+    mock_hass.data = {}
+    mock_hass.config_entries = MagicMock()
+    mock_hass.config_entries.async_reload = AsyncMock(return_value=True)
     mock_entry = MagicMock(spec=ConfigEntry)
+    mock_entry.entry_id = "test_entry_id"
 
-    with patch(
-        "custom_components.signal_gateway.async_unload_entry"
-    ) as mock_unload, patch(
-        "custom_components.signal_gateway.async_setup_entry"
-    ) as mock_setup:
-        mock_unload.return_value = AsyncMock(return_value=True)
-        mock_setup.return_value = AsyncMock(return_value=True)
+    await async_reload_entry(mock_hass, mock_entry)
 
-        await async_reload_entry(mock_hass, mock_entry)
+    mock_hass.config_entries.async_reload.assert_awaited_once_with("test_entry_id")
 
-        mock_unload.assert_called_once_with(mock_hass, mock_entry)
-        mock_setup.assert_called_once_with(mock_hass, mock_entry)
+
+@pytest.fixture
+def loaded_entry(mock_hass, mock_entry):
+    """Return the data of an entry set up with the mock_entry configuration."""
+    data = {
+        "config": dict(mock_entry.data),
+        "client": MagicMock(),
+        "default_recipients": ["+9876543210", "+5551234567"],
+        "notify_service": MagicMock(),
+        "rate_limiter": RateLimiter(sender_rate=5),
+    }
+    mock_hass.data[DOMAIN][mock_entry.entry_id] = data
+    return data
+
+
+async def reload(mock_hass, mock_entry):
+    mock_hass.config_entries.async_reload = AsyncMock(return_value=True)
+    await async_reload_entry(mock_hass, mock_entry)
+    return mock_hass.config_entries.async_reload.called
+
+
+@pytest.mark.asyncio
+async def test_reload_entry_updates_recipients_in_place(
+    mock_hass, mock_entry, loaded_entry
+):
+    """Test that changing the recipients keeps the listener running."""
+    mock_entry.data = {**mock_entry.data, "recipients": "+1111111111"}
+
+    assert not await reload(mock_hass, mock_entry)
+    assert loaded_entry["default_recipients"] == ["+1111111111"]
+    loaded_entry["notify_service"].set_default_recipients.assert_called_once_with(
+        ["+1111111111"]
+    )
+    loaded_entry["client"].stop_listening.assert_not_called()
+    assert loaded_entry["config"] == mock_entry.data
+
+
+@pytest.mark.asyncio
+async def test_reload_entry_updates_filters_and_rates(
+    mock_hass, mock_entry, loaded_entry
+):
+    """Test that filters and flood protection rates are replaced in place."""
+    mock_entry.data = {
+        **mock_entry.data,
+        "sender_denylist": "+2222222222",
+        "sender_rate_limit": 10,
+        "group_rate_limit": 3,
+    }
+
+    assert not await reload(mock_hass, mock_entry)
+    client = loaded_entry["client"]
+    assert client.set_message_filter.call_args_list[0].args == (None,)
+    message_filter = client.set_message_filter.call_args_list[1].args[0]
+    assert loaded_entry["message_filter"] is message_filter
+    assert loaded_entry["rate_limiter"].sender_rate == 10
+    assert loaded_entry["rate_limiter"].group_rate == 3
+
+    # Removing the filter does not reload either
+    mock_entry.data = {**mock_entry.data, "sender_denylist": ""}
+    assert not await reload(mock_hass, mock_entry)
+    assert client.set_message_filter.call_args.args == (None,)
+    assert "message_filter" not in loaded_entry
+
+
+@pytest.mark.asyncio
+async def test_reload_entry_enables_retention(mock_hass, mock_entry, loaded_entry):
+    """Test that enabling the retention prunes the stored messages at once."""
+    store = MagicMock()
+    store.retention_days = 0
+    loaded_entry["message_store"] = store
+    mock_entry.data = {**mock_entry.data, "message_retention_days": 7}
+
+    assert not await reload(mock_hass, mock_entry)
+    assert store.retention_days == 7
+    mock_entry.async_create_background_task.assert_called_once()
+    assert mock_entry.async_create_background_task.call_args.args[1] is (
+        store.async_prune.return_value
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"signal_cli_rest_api_url": "http://signal:8080"},
+        {"phone_number": "+3333333333"},
+        {"recipients": "+1111111111", "receive_mode": "polling"},
+        # Disabling flood protection removes its summary timer
+        {"sender_rate_limit": 0},
+    ],
+)
+async def test_reload_entry_restarts_when_needed(
+    mock_hass, mock_entry, loaded_entry, changes
+):
+    """Test that other changes reload the entry."""
+    mock_entry.data = {**mock_entry.data, **changes}
+
+    assert await reload(mock_hass, mock_entry)
+    assert loaded_entry["default_recipients"] == ["+9876543210", "+5551234567"]
@@ -1,15 +1,33 @@
 """Tests for async_setup_entry function."""
 
 import pytest
+from datetime import timedelta
 from unittest.mock import AsyncMock, MagicMock, patch
-from homeassistant.const import CONF_NAME
+from homeassistant.const import CONF_NAME, EVENT_HOMEASSISTANT_STARTED
+from homeassistant.core import CoreState
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
 
-from custom_components.signal_gateway import async_setup_entry
+from custom_components.signal_gateway import async_setup_entry, async_unload_entry
 from custom_components.signal_gateway.const import (
+    CONF_ATTACHMENT_CACHE_MB,
+    CONF_MAX_PARALLEL_DOWNLOADS,
+    CONF_MAX_RECEIVED_ATTACHMENT_MB,
     CONF_PHONE_NUMBER,
     CONF_SIGNAL_CLI_REST_API_URL,
+    CONF_TIMEOUT_CEILING,
+    CONF_TIMEOUT_FLOOR,
+    CONF_WEBSOCKET_COMPRESSION,
     CONF_WEBSOCKET_ENABLED,
+    CONF_WEBSOCKET_HEARTBEAT,
+    CONF_WEBSOCKET_IDLE_TIMEOUT,
+    CONF_WEBSOCKET_MAX_MESSAGE_KB,
+    CONF_WEBSOCKET_OVERFLOW_POLICY,
+    CONF_WEBSOCKET_QUEUE_SIZE,
     DOMAIN,
+    EVENT_SIGNAL_ATTACHMENTS,
+    EVENT_SIGNAL_COMMAND,
+    EVENT_SIGNAL_RATE_LIMITED,
     EVENT_SIGNAL_RECEIVED,
 )
 
@@ -101,8 +119,10 @@ async def test_setup_entry_without_recipients(mock_hass, mock_entry):
 
 
 @pytest.mark.asyncio
-async def test_setup_entry_duplicate_service_name(mock_hass, mock_entry):
-    """Test that duplicate service names are rejected."""
+async def test_setup_entry_duplicate_service_name(
+    mock_hass, mock_entry, mock_probe_api
+):
+    """Test that duplicate service names are rejected before probing the API."""
     # Add an existing entry with the same service name
     mock_hass.data[DOMAIN]["existing_entry_id"] = {
         "service_name": "test_signal",
@@ -115,6 +135,7 @@ async def test_setup_entry_duplicate_service_name(mock_hass, mock_entry):
 
         assert result is False
         assert "test_entry_id" not in mock_hass.data[DOMAIN]
+        mock_probe_api.assert_not_awaited()
 
 
 @pytest.mark.asyncio
@@ -134,13 +155,48 @@ async def test_setup_entry_websocket_message_handler(mock_hass, mock_entry):
         handler = mock_client.set_message_handler.call_args[0][0]
 
         # Call the handler with test data
-        test_data = {"sender": "+1234567890", "message": "Test message"}
+        test_data = {
+            "envelope": {
+                "sourceNumber": "+1234567890",
+                "dataMessage": {"message": "Test message", "timestamp": 1234567890},
+            }
+        }
         await handler(test_data)
 
-        # Verify event was fired
-        mock_hass.bus.async_fire.assert_called_once_with(
-            EVENT_SIGNAL_RECEIVED, test_data
-        )
+        # Verify a flat event was fired
+        mock_hass.bus.async_fire.assert_called_once()
+        event_type, event_data = mock_hass.bus.async_fire.call_args[0]
+        assert event_type == EVENT_SIGNAL_RECEIVED
+        assert event_data["sender"] == "+1234567890"
+        assert event_data["message"] == "Test message"
+        assert "envelope" not in event_data
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_websocket_include_envelope(mock_hass, mock_entry):
+    """Test that the full envelope is added to events when enabled."""
+    mock_entry.data["include_envelope"] = True
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        handler = mock_client.set_message_handler.call_args[0][0]
+        test_data = {
+            "envelope": {
+                "sourceNumber": "+1234567890",
+                "dataMessage": {"message": "Test message"},
+            }
+        }
+        await handler(test_data)
+
+        event_data = mock_hass.bus.async_fire.call_args[0][1]
+        assert event_data["envelope"] == test_data["envelope"]
 
 
 @pytest.mark.asyncio
@@ -164,3 +220,477 @@ async def test_setup_entry_websocket_message_handler_error(mock_hass, mock_entry
 
         # Handler should not raise exception
         await handler({"test": "data"})
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_sets_message_filter(mock_hass, mock_entry):
+    """Test that configured filters are applied to the client."""
+    mock_entry.data["sender_allowlist"] = "+1111111111, +2222222222"
+    mock_entry.data["message_regex"] = "^/"
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        message_filter = mock_client.set_message_filter.call_args[0][0]
+        assert message_filter(
+            {"envelope": {"source": "+1111111111", "dataMessage": {"message": "/ping"}}}
+        )
+        assert not message_filter(
+            {"envelope": {"source": "+3333333333", "dataMessage": {"message": "/ping"}}}
+        )
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_without_filters(mock_hass, mock_entry):
+    """Test that no filter is set when none is configured."""
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        mock_client.set_message_filter.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_routes_commands(mock_hass, mock_entry):
+    """Test that command messages fire command events or call services."""
+    mock_entry.data["commands"] = "/alarm arm\n/lights off: script.lights_off"
+    mock_hass.services = MagicMock()
+    mock_hass.services.async_call = AsyncMock()
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(mock_hass, mock_entry)
+        handler = mock_client.set_message_handler.call_args[0][0]
+
+        def message(text):
+            return {
+                "envelope": {
+                    "sourceNumber": "+1234567890",
+                    "dataMessage": {"message": text},
+                }
+            }
+
+        await handler(message("/alarm arm away"))
+        assert mock_hass.bus.async_fire.call_count == 2
+        event_type, event_data = mock_hass.bus.async_fire.call_args[0]
+        assert event_type == EVENT_SIGNAL_COMMAND
+        assert event_data["command"] == "/alarm arm"
+        assert event_data["args"] == "away"
+        assert event_data["sender"] == "+1234567890"
+
+        mock_hass.bus.async_fire.reset_mock()
+        await handler(message("/Lights off"))
+        mock_hass.services.async_call.assert_awaited_once_with(
+            "script", "lights_off", {}, blocking=False
+        )
+        mock_hass.bus.async_fire.assert_called_once()
+
+        # The arguments are forwarded to the service
+        mock_hass.services.async_call.reset_mock()
+        await handler(message("/lights off  kitchen table"))
+        mock_hass.services.async_call.assert_awaited_once_with(
+            "script", "lights_off", {"args": "kitchen table"}, blocking=False
+        )
+
+        mock_hass.bus.async_fire.reset_mock()
+        await handler(message("hello"))
+        mock_hass.bus.async_fire.assert_called_once()
+        assert mock_hass.bus.async_fire.call_args[0][0] == EVENT_SIGNAL_RECEIVED
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_sets_auto_responder(mock_hass, mock_entry):
+    """Test that configured auto-replies are evaluated by the client."""
+    mock_entry.data["auto_replies"] = "ping: pong"
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class, patch(
+        "custom_components.signal_gateway.AutoResponder"
+    ) as mock_responder_class:
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        mock_responder_class.assert_called_once_with(
+            mock_hass, mock_client, {"ping": "pong"}
+        )
+        mock_client.set_auto_responder.assert_called_once_with(
+            mock_responder_class.return_value
+        )
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_polling_mode(mock_hass, mock_entry):
+    """Test that the polling receive mode is passed to the client."""
+    mock_entry.data["receive_mode"] = "polling"
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client_class.return_value.start_listening = AsyncMock()
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        assert mock_client_class.call_args.kwargs["polling"] is True
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_configures_listener(mock_hass, mock_entry):
+    """Test that the transport tuning options are passed to the listener."""
+    mock_entry.data.update(
+        {
+            CONF_WEBSOCKET_HEARTBEAT: 0,
+            CONF_WEBSOCKET_IDLE_TIMEOUT: 120,
+            CONF_WEBSOCKET_COMPRESSION: True,
+            CONF_WEBSOCKET_MAX_MESSAGE_KB: 1024,
+            CONF_WEBSOCKET_QUEUE_SIZE: 500,
+            CONF_WEBSOCKET_OVERFLOW_POLICY: "drop_oldest",
+        }
+    )
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client_class.return_value.start_listening = AsyncMock()
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        mock_client_class.return_value.configure_listener.assert_called_once_with(
+            heartbeat=None,
+            idle_timeout=120,
+            compress=15,
+            max_msg_size=1048576,
+            queue_size=500,
+            overflow_policy="drop_oldest",
+        )
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_timeout_bounds(mock_hass, mock_entry):
+    """Test that the timeout bounds options are passed to the HTTP client."""
+    mock_entry.data.update({CONF_TIMEOUT_FLOOR: 5, CONF_TIMEOUT_CEILING: 120})
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client_class.return_value.start_listening = AsyncMock()
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+        timeouts = mock_client_class.call_args.kwargs["timeouts"]
+        assert (timeouts.floor, timeouts.ceiling) == (5, 120)
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_attachment_cache_options(mock_hass, mock_entry):
+    """Test that the attachment cache options are applied."""
+    mock_entry.data.update(
+        {
+            CONF_ATTACHMENT_CACHE_MB: 100,
+            CONF_MAX_RECEIVED_ATTACHMENT_MB: 10,
+            CONF_MAX_PARALLEL_DOWNLOADS: 2,
+        }
+    )
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client_class.return_value.start_listening = AsyncMock()
+
+        await async_setup_entry(mock_hass, mock_entry)
+
+    cache = mock_hass.data[DOMAIN][mock_entry.entry_id]["attachment_cache"]
+    assert cache.max_bytes == 100 * 1048576
+    assert cache.max_file_bytes == 10 * 1048576
+    assert cache._semaphore._value == 2
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_download_attachments(hass, mock_entry, tmp_path):
+    """Test that received attachments are downloaded after the event fired."""
+    mock_entry.data["download_attachments"] = True
+    hass.config.media_dirs = {"local": str(tmp_path)}
+    hass.data[DOMAIN] = {}
+    events = []
+    hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, events.append)
+    hass.bus.async_listen(EVENT_SIGNAL_ATTACHMENTS, events.append)
+    mock_entry.async_create_background_task = (
+        lambda hass, target, name: hass.async_create_task(target)
+    )
+
+    async def iter_attachment(attachment_id, size=0):
+        yield b"photo"
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class, patch.object(
+        hass.config_entries, "async_forward_entry_setups", AsyncMock()
+    ):
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client.iter_attachment = iter_attachment
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(hass, mock_entry)
+
+        handler = mock_client.set_message_handler.call_args[0][0]
+        await handler(
+            {
+                "envelope": {
+                    "sourceNumber": "+1234567890",
+                    "dataMessage": {
+                        "message": "Look",
+                        "timestamp": 1234567890,
+                        "attachments": [{"id": "abc.jpg", "size": 5}],
+                    },
+                }
+            }
+        )
+        await hass.async_block_till_done()
+
+    assert [event.event_type for event in events] == [
+        EVENT_SIGNAL_RECEIVED,
+        EVENT_SIGNAL_ATTACHMENTS,
+    ]
+    path = tmp_path / DOMAIN / "test_signal" / "abc.jpg"
+    downloaded = events[1].data
+    assert downloaded["sender"] == "+1234567890"
+    assert downloaded["attachments"][0]["path"] == str(path)
+    assert path.read_bytes() == b"photo"
+    assert "attachment_cache" in hass.data[DOMAIN][mock_entry.entry_id]
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_rate_limit_summary(hass, mock_entry, tmp_path):
+    """Test that flooding senders are dropped and summarized every minute."""
+    mock_entry.data.update(
+        {"sender_rate_limit": 2, "group_rate_limit": 0, "rate_limit_summary": True}
+    )
+    hass.config.media_dirs = {"local": str(tmp_path)}
+    hass.data[DOMAIN] = {}
+    summaries = []
+    hass.bus.async_listen(EVENT_SIGNAL_RATE_LIMITED, summaries.append)
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class, patch.object(
+        hass.config_entries, "async_forward_entry_setups", AsyncMock()
+    ):
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(hass, mock_entry)
+
+    rate_limiter = mock_client.set_rate_limiter.call_args[0][0]
+    assert hass.data[DOMAIN][mock_entry.entry_id]["rate_limiter"] is rate_limiter
+    msg = {"envelope": {"sourceNumber": "+1111111111", "dataMessage": {}}}
+    assert [rate_limiter(msg) for _ in range(5)] == [True, True, False, False, False]
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=1))
+    await hass.async_block_till_done()
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(minutes=2))
+    await hass.async_block_till_done()
+
+    # No event when nothing was dropped during the interval
+    assert len(summaries) == 1
+    assert summaries[0].data == {
+        "interval": 60.0,
+        "senders": {"+1111111111": 3},
+        "groups": {},
+    }
+
+    # The summary timer is cancelled when the entry is unloaded
+    for call in mock_entry.async_on_unload.call_args_list:
+        call.args[0]()
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_store_messages(hass, mock_entry, tmp_path):
+    """Test that received messages are stored and searchable."""
+    mock_entry.data.update({"store_messages": True, "message_retention_days": 0})
+    hass.config.config_dir = str(tmp_path)
+    hass.config.media_dirs = {"local": str(tmp_path)}
+    hass.data[DOMAIN] = {}
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class, patch.object(
+        hass.config_entries, "async_forward_entry_setups", AsyncMock()
+    ):
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client.stop_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(hass, mock_entry)
+
+        handler = mock_client.set_message_handler.call_args[0][0]
+        await handler(
+            {
+                "envelope": {
+                    "sourceNumber": "+1234567890",
+                    "dataMessage": {"message": "Door open", "timestamp": 1234567890},
+                }
+            }
+        )
+
+    store = hass.data[DOMAIN][mock_entry.entry_id]["message_store"]
+    assert store.path == tmp_path / "signal_gateway_test_signal.db"
+    results = await store.async_search(query="door")
+    assert [result["sender"] for result in results] == ["+1234567890"]
+
+    # Pruning is scheduled without retention, so that it can be enabled live
+    with patch.object(store, "async_prune", AsyncMock()) as mock_prune:
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(hours=1))
+        await hass.async_block_till_done()
+    mock_prune.assert_awaited_once()
+    for call in mock_entry.async_on_unload.call_args_list:
+        call.args[0]()
+
+    with patch.object(
+        hass.config_entries, "async_unload_platforms", AsyncMock(return_value=True)
+    ), patch("custom_components.signal_gateway.async_unload_notify_service"):
+        assert await async_unload_entry(hass, mock_entry)
+    assert store.stats["pending"] == 0
+    assert await store.async_search() == []
+
+
+@pytest.mark.asyncio
+async def test_setup_entry_receive_on_demand(hass, mock_entry, tmp_path):
+    """Test that the listener waits for a listener of the Signal events."""
+    mock_entry.data["receive_on_demand"] = True
+    hass.config.media_dirs = {"local": str(tmp_path)}
+    hass.data[DOMAIN] = {}
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class, patch.object(
+        hass.config_entries, "async_forward_entry_setups", AsyncMock()
+    ):
+        mock_client = MagicMock()
+        mock_client.listening = False
+        mock_client.subscribers = 0
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+
+        await async_setup_entry(hass, mock_entry)
+
+    mock_client.set_message_handler.assert_called_once()
+    mock_client.start_listening.assert_not_called()
+    on_demand = hass.data[DOMAIN][mock_entry.entry_id]["on_demand"]
+    assert on_demand.always_needed is False
+
+    remove = hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, lambda event: None)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=10))
+    await hass.async_block_till_done()
+    mock_client.start_listening.assert_awaited_once()
+    remove()
+
+    for call in mock_entry.async_on_unload.call_args_list:
+        call.args[0]()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("startup_delay", [0, 30])
+async def test_setup_entry_during_boot(hass, mock_entry, tmp_path, startup_delay):
+    """Test that the listener starts once Home Assistant has started."""
+    mock_entry.data["startup_delay"] = startup_delay
+    hass.config.media_dirs = {"local": str(tmp_path)}
+    hass.data[DOMAIN] = {}
+    hass.set_state(CoreState.starting)
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class, patch.object(
+        hass.config_entries, "async_forward_entry_setups", AsyncMock()
+    ):
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client_class.return_value = mock_client
+        mock_entry.async_create_background_task = (
+            lambda hass, target, name: hass.async_create_task(target, name)
+        )
+
+        await async_setup_entry(hass, mock_entry)
+
+    # The message handler is ready, but nothing is received during boot
+    mock_client.set_message_handler.assert_called_once()
+    mock_client.start_listening.assert_not_called()
+
+    hass.set_state(CoreState.running)
+    hass.bus.async_fire(EVENT_HOMEASSISTANT_STARTED)
+    await hass.async_block_till_done()
+    if startup_delay:
+        mock_client.start_listening.assert_not_called()
+        async_fire_time_changed(
+            hass, dt_util.utcnow() + timedelta(seconds=startup_delay)
+        )
+        await hass.async_block_till_done()
+    mock_client.start_listening.assert_awaited_once()
+
+    for call in mock_entry.async_on_unload.call_args_list:
+        call.args[0]()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("probed", "cached", "configured", "polling"),
+    [
+        # json-rpc only delivers messages over the WebSocket
+        ({"mode": "json-rpc"}, None, "polling", False),
+        ({"mode": "native"}, None, "websocket", True),
+        # The mode cached by the config flow is used without probing the API
+        (None, {"mode": "normal"}, "websocket", True),
+        (None, {"mode": "json-rpc"}, "polling", False),
+        # The configured mode is used while the API is unreachable
+        (None, None, "polling", True),
+    ],
+)
+async def test_setup_entry_probes_api(
+    mock_hass, mock_entry, mock_probe_api, probed, cached, configured, polling
+):
+    """Test that the receive mode follows the cached or probed API mode."""
+    mock_entry.data["receive_mode"] = configured
+    if cached:
+        mock_entry.data["api_info"] = cached
+    mock_probe_api.return_value = probed
+
+    with patch("custom_components.signal_gateway.async_get_clientsession"), patch(
+        "custom_components.signal_gateway.SignalClient"
+    ) as mock_client_class:
+        mock_client_class.return_value.start_listening = AsyncMock()
+        assert await async_setup_entry(mock_hass, mock_entry)
+
+    if cached:
+        mock_probe_api.assert_not_awaited()
+    else:
+        mock_probe_api.assert_awaited_once_with(
+            mock_hass, "http://localhost:8080", "+1234567890"
+        )
+    assert mock_client_class.call_args.kwargs["polling"] is polling
+    if probed:
+        mock_hass.config_entries.async_update_entry.assert_called_once_with(
+            mock_entry, data={**mock_entry.data, "api_info": probed}
+        )
+    else:
+        mock_hass.config_entries.async_update_entry.assert_not_called()
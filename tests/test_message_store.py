@@ -0,0 +1,168 @@
+"""Tests for the local store of received messages."""
+
+import asyncio
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.signal_gateway import message_store
+from custom_components.signal_gateway.message_store import MessageStore
+
+
+def event_data(message, timestamp, sender="+1111111111", group_id=None):
+    return {
+        "timestamp": timestamp,
+        "sender": sender,
+        "sender_uuid": f"uuid-{sender}",
+        "sender_name": "Alice",
+        "message": message,
+        "group_id": group_id,
+        "reply_to": group_id or sender,
+        "attachments": [],
+        "mentions": [],
+        "quote": None,
+    }
+
+
+@pytest.fixture
+async def store(hass: HomeAssistant, tmp_path):
+    store = MessageStore(hass, tmp_path / "messages.db", retention_days=30)
+    await store.async_open()
+    yield store
+    await store.async_close()
+
+
+def count_rows(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+@pytest.mark.asyncio
+async def test_messages_are_written_in_batches(hass: HomeAssistant, store, monkeypatch):
+    """Test that messages are buffered, then written in one transaction."""
+    monkeypatch.setattr(message_store, "BATCH_SIZE", 3)
+    with patch.object(store, "_insert", wraps=store._insert) as insert:
+        store.async_add(event_data("one", 1))
+        store.async_add(event_data("two", 2))
+        assert store.stats["pending"] == 2
+        store.async_add(event_data("three", 3))
+        await hass.async_block_till_done()
+        insert.assert_called_once()
+
+    assert store.stored == 3
+    assert count_rows(store.path) == 3
+
+
+@pytest.mark.asyncio
+async def test_pending_messages_are_written_after_delay(
+    hass: HomeAssistant, store, monkeypatch
+):
+    """Test that a partial batch is written after the batch delay."""
+    monkeypatch.setattr(message_store, "BATCH_DELAY", 0.01)
+    store.async_add(event_data("one", 1))
+    # Redelivered messages are stored once
+    store.async_add(event_data("one", 1))
+    await hass.async_block_till_done()
+    assert store.stats["pending"] == 2
+
+    await asyncio.sleep(0.05)
+    await hass.async_block_till_done()
+    assert store.stats["pending"] == 0
+    assert store.stored == 1
+    assert count_rows(store.path) == 1
+
+
+@pytest.mark.asyncio
+async def test_search(store):
+    """Test full-text and indexed searches, most recent first."""
+    store.async_add(event_data("Front door open", 1000))
+    store.async_add(event_data("Back door closed", 2000, sender="+2222222222"))
+    store.async_add(event_data("The door is OPEN again", 3000, group_id="abcd"))
+    store.async_add(event_data("Nothing to see", 4000))
+
+    results = await store.async_search(query="door open")
+    assert [result["message"] for result in results] == [
+        "The door is OPEN again",
+        "Front door open",
+    ]
+    assert results[1] == {
+        "timestamp": 1000,
+        "sender": "+1111111111",
+        "sender_uuid": "uuid-+1111111111",
+        "sender_name": "Alice",
+        "group_id": None,
+        "reply_to": "+1111111111",
+        "message": "Front door open",
+        "attachments": 0,
+    }
+
+    results = await store.async_search(sender="uuid-+2222222222")
+    assert [result["timestamp"] for result in results] == [2000]
+    results = await store.async_search(group_id="abcd")
+    assert [result["timestamp"] for result in results] == [3000]
+    results = await store.async_search(since=2000, until=3000)
+    assert [result["timestamp"] for result in results] == [3000, 2000]
+    results = await store.async_search(limit=1)
+    assert [result["timestamp"] for result in results] == [4000]
+    # Full-text operators are matched literally
+    assert await store.async_search(query='door" OR "see') == []
+
+
+@pytest.mark.asyncio
+async def test_prune_in_chunks(store, monkeypatch):
+    """Test that old messages are deleted chunk by chunk."""
+    monkeypatch.setattr(message_store, "PRUNE_CHUNK_SIZE", 2)
+    now = int(time.time() * 1000)
+    old = now - 31 * 86400 * 1000
+    for index in range(5):
+        store.async_add(event_data(f"old {index}", old + index))
+    store.async_add(event_data("recent door", now))
+    await store.async_flush()
+
+    with patch.object(store, "_prune_chunk", wraps=store._prune_chunk) as prune:
+        assert await store.async_prune() == 5
+    assert prune.call_count == 3
+    assert [result["message"] for result in await store.async_search()] == [
+        "recent door"
+    ]
+    # The full-text index follows deletions
+    assert await store.async_search(query="old") == []
+    assert store.stats["pruned"] == 5
+
+
+@pytest.mark.asyncio
+async def test_close_writes_pending_messages(hass: HomeAssistant, tmp_path):
+    """Test that buffered messages are written when the store is closed."""
+    store = MessageStore(hass, tmp_path / "messages.db")
+    await store.async_open()
+    store.async_add(event_data("last words", 1))
+    await store.async_close()
+    assert count_rows(tmp_path / "messages.db") == 1
+    assert await store.async_prune() == 0
+    assert store._prune_chunk(int(time.time() * 1000)) == 0
+
+
+@pytest.mark.asyncio
+async def test_close_waits_for_running_prune(
+    hass: HomeAssistant, tmp_path, monkeypatch
+):
+    """Test that closing the store stops a running pruning after its chunk."""
+    monkeypatch.setattr(message_store, "PRUNE_CHUNK_SIZE", 1)
+    store = MessageStore(hass, tmp_path / "messages.db", retention_days=30)
+    await store.async_open()
+    old = int(time.time() * 1000) - 31 * 86400 * 1000
+    for index in range(3):
+        store.async_add(event_data(f"old {index}", old + index))
+    await store.async_flush()
+
+    prune = hass.async_create_task(store.async_prune())
+    await asyncio.sleep(0)
+    await store.async_close()
+
+    assert prune.done()
+    assert prune.result() == 1
+    assert store._connection is None
+    assert count_rows(tmp_path / "messages.db") == 2
@@ -1,12 +1,25 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from custom_components.signal_gateway.notify import async_setup_entry
+from custom_components.signal_gateway.const import (
+    CONF_MAX_ATTACHMENT_BATCH_MB,
+    CONF_MAX_ATTACHMENTS_PER_MESSAGE,
+    CONF_SPOOL_THRESHOLD_MB,
+    CONF_TIMEOUT_CEILING,
+    CONF_TIMEOUT_FLOOR,
+)
+from custom_components.signal_gateway.notify import (
+    DEFAULT_MAX_ATTACHMENT_BATCH_MB,
+    DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE,
+    DEFAULT_SPOOL_THRESHOLD_MB,
+    async_setup_entry,
+)
 
 
 @pytest.mark.asyncio
 async def test_notify_async_setup_entry_success():
     hass = MagicMock()
     entry = MagicMock()
+    entry.data = {}
     async_add_entities = MagicMock()
     # Simuler la présence du client dans hass.data
     hass.data = {
@@ -16,6 +29,37 @@ async def test_notify_async_setup_entry_success():
     }
     result = await async_setup_entry(hass, entry, async_add_entities)
     assert result is True
+    service = hass.data["signal_gateway"][entry.entry_id]["notify_service"]
+    assert service._spool_threshold == DEFAULT_SPOOL_THRESHOLD_MB * 1048576
+    assert service._max_attachments_per_message == DEFAULT_MAX_ATTACHMENTS_PER_MESSAGE
+    assert service._max_attachment_batch_bytes == (
+        DEFAULT_MAX_ATTACHMENT_BATCH_MB * 1048576
+    )
+
+
+@pytest.mark.asyncio
+async def test_notify_async_setup_entry_attachment_limits():
+    hass = MagicMock()
+    entry = MagicMock()
+    entry.data = {
+        CONF_MAX_ATTACHMENTS_PER_MESSAGE: 10,
+        CONF_MAX_ATTACHMENT_BATCH_MB: 8,
+        CONF_SPOOL_THRESHOLD_MB: 0,
+        CONF_TIMEOUT_FLOOR: 5,
+        CONF_TIMEOUT_CEILING: 120,
+    }
+    hass.data = {
+        "signal_gateway": {
+            entry.entry_id: {"client": object(), "service_name": "test_service"}
+        }
+    }
+    assert await async_setup_entry(hass, entry, MagicMock()) is True
+    service = hass.data["signal_gateway"][entry.entry_id]["notify_service"]
+    assert service._max_attachments_per_message == 10
+    assert service._max_attachment_batch_bytes == 8388608
+    assert service._spool_threshold == 0
+    assert service.download_timeouts.floor == 5
+    assert service.download_timeouts.ceiling == 120
 
 
 @pytest.mark.asyncio
@@ -13,6 +13,9 @@ def mock_hass():
     hass.data = {}
     hass.services = MagicMock()
     hass.services.async_register = MagicMock()
+    hass.async_add_executor_job = AsyncMock(
+        side_effect=lambda target, *args: target(*args)
+    )
     return hass
 
 
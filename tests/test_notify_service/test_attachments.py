@@ -3,11 +3,22 @@
 import os
 import tempfile
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 
-# Test _encode_attachments_from_paths
-def test_encode_attachments_success(notification_service):
+async def collect(service, attachments=None, urls=None, handles=None):
+    """Encode the attachments of a message with _iter_attachments."""
+    return [
+        attachment
+        async for attachment in service._iter_attachments(
+            attachments, urls, True, handles
+        )
+    ]
+
+
+# Test the encoding of local files
+@pytest.mark.asyncio
+async def test_encode_attachments_success(notification_service):
     """Test encoding attachments from paths."""
     with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
         tmp.write(b"test content")
@@ -15,7 +26,7 @@ def test_encode_attachments_success(notification_service):
         tmp_path = tmp.name
 
     try:
-        result = notification_service._encode_attachments_from_paths([tmp_path])
+        result = await collect(notification_service, [tmp_path])
         assert len(result) == 1
         # Verify it's base64 encoded
         import base64
@@ -26,13 +37,15 @@ def test_encode_attachments_success(notification_service):
         os.unlink(tmp_path)
 
 
-def test_encode_attachments_file_not_found(notification_service):
+@pytest.mark.asyncio
+async def test_encode_attachments_file_not_found(notification_service):
     """Test encoding non-existent file."""
     with pytest.raises(ValueError, match="not found"):
-        notification_service._encode_attachments_from_paths(["/nonexistent.txt"])
+        await collect(notification_service, ["/nonexistent.txt"])
 
 
-def test_encode_attachments_too_large(notification_service):
+@pytest.mark.asyncio
+async def test_encode_attachments_too_large(notification_service):
     """Test encoding file exceeding size limit."""
     with tempfile.NamedTemporaryFile(delete=False) as tmp:
         # Write 51 MB
@@ -42,12 +55,13 @@ def test_encode_attachments_too_large(notification_service):
 
     try:
         with pytest.raises(ValueError, match="exceeds maximum"):
-            notification_service._encode_attachments_from_paths([tmp_path])
+            await collect(notification_service, [tmp_path])
     finally:
         os.unlink(tmp_path)
 
 
-def test_encode_attachments_multiple_files(notification_service):
+@pytest.mark.asyncio
+async def test_encode_attachments_multiple_files(notification_service):
     """Test encoding multiple attachments."""
     files = []
     try:
@@ -58,7 +72,7 @@ def test_encode_attachments_multiple_files(notification_service):
             files.append(tmp.name)
             tmp.close()
 
-        result = notification_service._encode_attachments_from_paths(files)
+        result = await collect(notification_service, files)
         assert len(result) == 2
     finally:
         for f in files:
@@ -100,7 +114,68 @@ async def test_download_in_chunks_success(notification_service):
     mock_response.content.iter_chunked = mock_iter_chunked
 
     result = await notification_service._download_in_chunks(mock_response, 10000)
-    assert result == b"chunk1chunk2"
+    with result:
+        assert result.read() == b"chunk1chunk2"
+        # Small downloads stay in memory
+        assert not result._rolled
+
+
+@pytest.mark.asyncio
+async def test_download_in_chunks_spools_to_disk(mock_hass, mock_signal_client):
+    """Test that downloads above the spool threshold are moved to disk."""
+    from custom_components.signal_gateway.notify import SignalGatewayNotificationService
+
+    service = SignalGatewayNotificationService(
+        hass=mock_hass,
+        client=mock_signal_client,
+        default_recipients=[],
+        spool_threshold=2000,
+    )
+    mock_response = MagicMock()
+
+    async def mock_iter_chunked(size):
+        for _ in range(3):
+            yield b"x" * 1000
+
+    mock_response.content.iter_chunked = mock_iter_chunked
+
+    result = await service._download_in_chunks(mock_response, 10000)
+    with result:
+        assert result._rolled
+        assert result.read() == b"x" * 3000
+    # Chunks are written (and rolled over to disk) by blocks, in the executor
+    written = [
+        call.args[1]
+        for call in mock_hass.async_add_executor_job.call_args_list
+        if call.args[0] == result.write
+    ]
+    assert written == [b"x" * 3000]
+
+
+@pytest.mark.asyncio
+async def test_download_in_chunks_writes_blocks(notification_service, mock_hass):
+    """Test that one executor job writes many downloaded chunks."""
+    from custom_components.signal_gateway.notify import SPOOL_WRITE_BLOCK_SIZE
+
+    mock_response = MagicMock()
+    chunk = b"x" * 65536
+    count = 2 * SPOOL_WRITE_BLOCK_SIZE // len(chunk) + 1
+
+    async def mock_iter_chunked(size):
+        for _ in range(count):
+            yield chunk
+
+    mock_response.content.iter_chunked = mock_iter_chunked
+
+    result = await notification_service._download_in_chunks(mock_response, 10**8)
+    with result:
+        assert result.read() == chunk * count
+    written = [
+        len(call.args[1])
+        for call in mock_hass.async_add_executor_job.call_args_list
+        if call.args[0] == result.write
+    ]
+    assert written == [SPOOL_WRITE_BLOCK_SIZE, SPOOL_WRITE_BLOCK_SIZE, len(chunk)]
 
 
 @pytest.mark.asyncio
@@ -119,9 +194,48 @@ async def test_download_in_chunks_exceeds_limit(notification_service):
         await notification_service._download_in_chunks(mock_response, 100)
 
 
-# Test _process_attachments
+# Test _download_and_encode_url
 @pytest.mark.asyncio
-async def test_process_attachments_both_local_and_urls(notification_service):
+async def test_download_and_encode_url_large_file(mock_hass, mock_signal_client):
+    """Test that a spooled download is encoded correctly block by block."""
+    import base64
+
+    from custom_components.signal_gateway.notify import (
+        ENCODE_BLOCK_SIZE,
+        SignalGatewayNotificationService,
+    )
+
+    service = SignalGatewayNotificationService(
+        hass=mock_hass,
+        client=mock_signal_client,
+        default_recipients=[],
+        spool_threshold=1024,
+    )
+    content = os.urandom(ENCODE_BLOCK_SIZE * 2 + 7)
+
+    mock_response = MagicMock()
+    mock_response.headers = {}
+
+    async def mock_iter_chunked(size):
+        for i in range(0, len(content), size):
+            yield content[i : i + size]
+
+    mock_response.content.iter_chunked = mock_iter_chunked
+    mock_cm = MagicMock()
+    mock_cm.__aenter__ = AsyncMock(return_value=mock_response)
+    mock_cm.__aexit__ = AsyncMock(return_value=None)
+    session = MagicMock()
+    session.get = MagicMock(return_value=mock_cm)
+
+    result = await service._download_and_encode_url(
+        session, "https://example.com/clip.mp4", len(content)
+    )
+    assert result == base64.b64encode(content).decode("ascii")
+
+
+# Test _iter_attachments
+@pytest.mark.asyncio
+async def test_iter_attachments_both_local_and_urls(notification_service):
     """Test processing both local files and URLs."""
     with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
         tmp.write(b"local")
@@ -130,27 +244,67 @@ async def test_process_attachments_both_local_and_urls(notification_service):
 
     try:
         # Mock URL download
-        with patch.object(
+        with patch(
+            "custom_components.signal_gateway.notify.async_get_clientsession"
+        ), patch.object(
             notification_service,
-            "_download_attachments_from_urls",
-            return_value=["url_base64"],
+            "_download_and_encode_url",
+            AsyncMock(return_value="url_base64"),
         ):
-            result = await notification_service._process_attachments(
-                attachments=[tmp_path],
-                urls=["https://example.com/file.jpg"],
-                verify_ssl=True,
+            result = await collect(
+                notification_service, [tmp_path], ["https://example.com/file.jpg"]
             )
 
-            assert result is not None
-            assert len(result) == 2  # 1 local + 1 url
+            assert result == ["bG9jYWw=", "url_base64"]
+    finally:
+        os.unlink(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_iter_attachments_validates_files_first(notification_service):
+    """Test that an invalid file fails before any attachment is encoded."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
+        tmp.write(b"local")
+        tmp_path = tmp.name
+
+    try:
+        attachments = notification_service._iter_attachments(
+            [tmp_path, "/nonexistent.txt"], None, True
+        )
+        with pytest.raises(ValueError, match="Attachment file not found"):
+            await anext(attachments)
     finally:
         os.unlink(tmp_path)
 
 
 @pytest.mark.asyncio
-async def test_process_attachments_exception_propagates(notification_service):
-    """Test that exceptions in attachment processing propagate to the caller."""
-    with pytest.raises(ValueError, match="Attachment file not found"):
-        await notification_service._process_attachments(
-            attachments=["/nonexistent.txt"], urls=None, verify_ssl=True
+async def test_iter_attachments_with_handles(mock_hass, mock_signal_client):
+    """Test that registered attachments are added after files and URLs."""
+    from custom_components.signal_gateway.notify import SignalGatewayNotificationService
+
+    registry = MagicMock()
+    registry.get = MagicMock(side_effect=lambda handle: f"{handle}_base64")
+    service = SignalGatewayNotificationService(
+        hass=mock_hass,
+        client=mock_signal_client,
+        default_recipients=[],
+        attachment_registry=registry,
+    )
+
+    with patch(
+        "custom_components.signal_gateway.notify.async_get_clientsession"
+    ), patch.object(
+        service, "_download_and_encode_url", AsyncMock(return_value="url_base64")
+    ):
+        result = await collect(
+            service, urls=["https://example.com/file.jpg"], handles=["logo"]
         )
+
+    assert result == ["url_base64", "logo_base64"]
+
+
+@pytest.mark.asyncio
+async def test_iter_attachments_handles_without_registry(notification_service):
+    """Test that handles fail when no registry is available."""
+    with pytest.raises(ValueError, match="not available"):
+        await collect(notification_service, handles=["logo"])
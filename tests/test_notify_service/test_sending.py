@@ -3,7 +3,7 @@
 import os
 import tempfile
 import pytest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 
 # Test _send_to_recipient
@@ -42,6 +42,157 @@ async def test_send_to_recipient_error(notification_service, mock_signal_client)
     await notification_service._send_to_recipient("+1234567890", "Hello", None)
 
 
+# Test the attachment batches
+def make_batching_service(mock_hass, mock_signal_client, **kwargs):
+    """Create a service whose registered attachments are named after their handle."""
+    from custom_components.signal_gateway.notify import SignalGatewayNotificationService
+
+    registry = MagicMock()
+    registry.get = MagicMock(side_effect=lambda handle: handle)
+    return SignalGatewayNotificationService(
+        hass=mock_hass,
+        client=mock_signal_client,
+        default_recipients=[],
+        attachment_registry=registry,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_batches_splits_messages(mock_hass, mock_signal_client):
+    """Test that each attachment batch is sent as its own message."""
+    service = make_batching_service(
+        mock_hass, mock_signal_client, max_attachments_per_message=2
+    )
+
+    await service.async_send_message(
+        message="Album",
+        target=["+1111111111", "+2222222222"],
+        attachment_handles=["a", "b", "c", "d", "e"],
+    )
+
+    calls = mock_signal_client.send_message.call_args_list
+    assert len(calls) == 6
+    # The text goes with the first batch only
+    assert [call.kwargs["message"] for call in calls] == ["Album"] * 2 + [""] * 4
+    # The batches are sent in order, each one to every recipient
+    assert [
+        (call.kwargs["target"], call.kwargs["base64_attachments"]) for call in calls
+    ] == [
+        ("+1111111111", ["a", "b"]),
+        ("+2222222222", ["a", "b"]),
+        ("+1111111111", ["c", "d"]),
+        ("+2222222222", ["c", "d"]),
+        ("+1111111111", ["e"]),
+        ("+2222222222", ["e"]),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_batches_size_limit(mock_hass, mock_signal_client):
+    """Test that batches are limited by size, large attachments alone."""
+    service = make_batching_service(
+        mock_hass, mock_signal_client, max_attachment_batch_bytes=5
+    )
+
+    await service.async_send_message(
+        message="Album",
+        target="+1111111111",
+        attachment_handles=["aa", "bb", "cccccc", "d"],
+    )
+
+    assert [
+        call.kwargs["base64_attachments"]
+        for call in mock_signal_client.send_message.call_args_list
+    ] == [["aa", "bb"], ["cccccc"], ["d"]]
+
+
+@pytest.mark.asyncio
+async def test_send_batches_batch_error(mock_hass, mock_signal_client):
+    """Test that a failing batch does not prevent the other batches."""
+    service = make_batching_service(
+        mock_hass, mock_signal_client, max_attachments_per_message=1
+    )
+    mock_signal_client.send_message.side_effect = [
+        {"success": True},
+        Exception("Send failed"),
+        {"success": True},
+    ]
+
+    await service.async_send_message(
+        message="Album", target="+1111111111", attachment_handles=["a", "b", "c"]
+    )
+
+    assert mock_signal_client.send_message.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_send_batches_pipelined(mock_hass, mock_signal_client):
+    """Test that the next batch is prepared while the current one is sent."""
+    import asyncio
+
+    service = make_batching_service(
+        mock_hass, mock_signal_client, max_attachments_per_message=1
+    )
+    events = []
+
+    async def download(session, url, max_size):
+        events.append(("download", url))
+        await asyncio.sleep(0.01)
+        return url
+
+    async def send_message(**kwargs):
+        events.append(("send", kwargs["base64_attachments"][0]))
+        await asyncio.sleep(0.05)
+        events.append(("sent", kwargs["base64_attachments"][0]))
+
+    mock_signal_client.send_message.side_effect = send_message
+    with patch(
+        "custom_components.signal_gateway.notify.async_get_clientsession"
+    ), patch.object(service, "_download_and_encode_url", download):
+        await service.async_send_message(
+            message="Clips", target="+1111111111", urls=["u1", "u2", "u3"]
+        )
+
+    assert events == [
+        ("download", "u1"),
+        ("send", "u1"),
+        ("download", "u2"),
+        ("sent", "u1"),
+        ("send", "u2"),
+        ("download", "u3"),
+        ("sent", "u2"),
+        ("send", "u3"),
+        ("sent", "u3"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_batches_later_failure(mock_hass, mock_signal_client):
+    """Test that a batch failing to prepare stops the following ones."""
+    service = make_batching_service(
+        mock_hass, mock_signal_client, max_attachments_per_message=1
+    )
+
+    async def download(session, url, max_size):
+        if url == "broken":
+            raise ValueError("Attachment too large")
+        return url
+
+    with patch(
+        "custom_components.signal_gateway.notify.async_get_clientsession"
+    ), patch.object(service, "_download_and_encode_url", download):
+        with pytest.raises(ValueError, match="too large"):
+            await service.async_send_message(
+                message="Clips", target="+1111111111", urls=["u1", "broken", "u3"]
+            )
+
+    assert [
+        call.kwargs["base64_attachments"]
+        for call in mock_signal_client.send_message.call_args_list
+    ] == [["u1"]]
+
+
 # Test async_send_message
 @pytest.mark.asyncio
 async def test_async_send_message_no_target_no_default(mock_hass, mock_signal_client):
@@ -232,3 +383,71 @@ async def test_service_handler_extracts_nested_data(mock_hass, mock_signal_clien
     assert call_kwargs["text_mode"] == "styled"
     assert call_kwargs["message"] == "Test message"
     assert call_kwargs["target"] == "+1234567890"
+
+
+# Test typing indicator
+@pytest.mark.asyncio
+async def test_send_message_typing_indicator_with_attachments(
+    notification_service, mock_signal_client
+):
+    """Test that the typing indicator is shown while attachments are processed."""
+    import asyncio
+
+    events = []
+    mock_signal_client.set_typing_indicator.side_effect = (
+        lambda recipient, typing: events.append(("typing", recipient, typing))
+    )
+    mock_signal_client.send_message.side_effect = lambda **kwargs: events.append(
+        ("send", kwargs["target"])
+    )
+
+    async def slow_download(session, url, max_size):
+        await asyncio.sleep(0.01)
+        return "base64data"
+
+    with patch(
+        "custom_components.signal_gateway.notify.async_get_clientsession"
+    ), patch.object(notification_service, "_download_and_encode_url", slow_download):
+        await notification_service.async_send_message(
+            message="Hello", target="1111111111", urls=["https://example.com/a.jpg"]
+        )
+        # Let the background task hide the indicator
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+
+    assert events == [
+        ("typing", "+1111111111", True),
+        ("send", "+1111111111"),
+        ("typing", "+1111111111", False),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_message_typing_indicator_errors_ignored(
+    notification_service, mock_signal_client
+):
+    """Test that typing indicator failures do not prevent sending."""
+    mock_signal_client.set_typing_indicator.side_effect = Exception("Not supported")
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".txt") as tmp:
+        tmp.write(b"test")
+        tmp_path = tmp.name
+
+    try:
+        await notification_service.async_send_message(
+            message="Hello", target="+1111111111", attachments=[tmp_path]
+        )
+    finally:
+        os.unlink(tmp_path)
+
+    mock_signal_client.send_message.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_send_message_no_typing_indicator_without_attachments(
+    notification_service, mock_signal_client
+):
+    """Test that plain text messages do not show the typing indicator."""
+    await notification_service.async_send_message(message="Hello", target="+1111111111")
+
+    mock_signal_client.set_typing_indicator.assert_not_called()
@@ -0,0 +1,132 @@
+"""Tests for the on-demand receive mode."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.signal_gateway.const import (
+    EVENT_SIGNAL_COMMAND,
+    EVENT_SIGNAL_RECEIVED,
+)
+from custom_components.signal_gateway.on_demand import (
+    ON_DEMAND_CHECK_INTERVAL,
+    OnDemandReceiver,
+)
+
+
+@pytest.fixture
+def client():
+    client = MagicMock()
+    client.listening = False
+    client.subscribers = 0
+
+    async def start():
+        client.listening = True
+
+    async def stop():
+        client.listening = False
+
+    client.start_listening = AsyncMock(side_effect=start)
+    client.stop_listening = AsyncMock(side_effect=stop)
+    return client
+
+
+@pytest.fixture
+def monotonic():
+    with patch(
+        "custom_components.signal_gateway.on_demand.time.monotonic"
+    ) as mock_monotonic:
+        mock_monotonic.return_value = 1000.0
+        yield mock_monotonic
+
+
+@pytest.mark.asyncio
+async def test_starts_with_first_listener(hass: HomeAssistant, client):
+    """Test that the listener starts only once Signal events are listened to."""
+    receiver = OnDemandReceiver(hass, client)
+    await receiver.async_update()
+    client.start_listening.assert_not_called()
+
+    remove = hass.bus.async_listen(EVENT_SIGNAL_COMMAND, lambda event: None)
+    await receiver.async_update()
+    await receiver.async_update()
+    client.start_listening.assert_awaited_once()
+    assert receiver.stats["starts"] == 1
+    remove()
+
+
+@pytest.mark.asyncio
+async def test_stops_after_grace_period(hass: HomeAssistant, client, monotonic):
+    """Test that the listener stops once nothing listened for the grace period."""
+    receiver = OnDemandReceiver(hass, client)
+    remove = hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, lambda event: None)
+    await receiver.async_update()
+    remove()
+
+    await receiver.async_update()
+    monotonic.return_value += receiver.grace_period - 1
+    await receiver.async_update()
+    client.stop_listening.assert_not_called()
+
+    monotonic.return_value += 1
+    await receiver.async_update()
+    client.stop_listening.assert_awaited_once()
+    assert receiver.stats == {
+        "listening": False,
+        "always_needed": False,
+        "starts": 1,
+        "stops": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_listener_back_within_grace_period(
+    hass: HomeAssistant, client, monotonic
+):
+    """Test that a listener coming back during the grace period resets it."""
+    receiver = OnDemandReceiver(hass, client)
+    remove = hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, lambda event: None)
+    await receiver.async_update()
+    remove()
+    await receiver.async_update()
+
+    monotonic.return_value += receiver.grace_period - 1
+    remove = hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, lambda event: None)
+    await receiver.async_update()
+    remove()
+    monotonic.return_value += 2
+    await receiver.async_update()
+
+    client.stop_listening.assert_not_called()
+    client.start_listening.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_subscribers_and_integration_consumers(hass: HomeAssistant, client):
+    """Test that subscribers and integration features keep the listener started."""
+    receiver = OnDemandReceiver(hass, client)
+    client.subscribers = 1
+    assert receiver.has_demand()
+
+    client.subscribers = 0
+    assert not OnDemandReceiver(hass, client).has_demand()
+    assert OnDemandReceiver(hass, client, always_needed=True).has_demand()
+
+
+@pytest.mark.asyncio
+async def test_cancel_stops_checks(hass: HomeAssistant, client):
+    """Test that a cancelled receiver never starts its client again."""
+    receiver = OnDemandReceiver(hass, client)
+    await receiver.async_start()
+    receiver.async_cancel()
+
+    remove = hass.bus.async_listen(EVENT_SIGNAL_RECEIVED, lambda event: None)
+    async_fire_time_changed(hass, dt_util.utcnow() + ON_DEMAND_CHECK_INTERVAL)
+    await hass.async_block_till_done()
+    await receiver.async_update()
+
+    client.start_listening.assert_not_called()
+    remove()
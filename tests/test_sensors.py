@@ -0,0 +1,92 @@
+"""Tests for the WebSocket listener entities."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.const import CONF_NAME, STATE_OFF, STATE_ON
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.signal_gateway.const import (
+    CONF_PHONE_NUMBER,
+    CONF_SIGNAL_CLI_REST_API_URL,
+    CONF_WEBSOCKET_ENABLED,
+    DOMAIN,
+)
+
+
+@pytest.fixture
+def mock_signal_client():
+    """Mock SignalClient exposing the listener state."""
+    with patch("custom_components.signal_gateway.SignalClient") as mock_client_class:
+        mock_client = MagicMock()
+        mock_client.start_listening = AsyncMock()
+        mock_client.stop_listening = AsyncMock()
+        mock_client.connected = False
+        mock_client.reconnects = 0
+        mock_client.last_message_time = None
+        mock_client.receive_latency = None
+        mock_client.state_listeners = []
+        mock_client.add_state_listener = MagicMock(
+            side_effect=lambda listener: mock_client.state_listeners.append(listener)
+            or (lambda: None)
+        )
+        mock_client_class.return_value = mock_client
+        yield mock_client
+
+
+async def setup_entry(hass: HomeAssistant, websocket_enabled: bool = True):
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="Signal",
+        data={
+            CONF_NAME: "signal",
+            CONF_SIGNAL_CLI_REST_API_URL: "http://localhost:8080",
+            CONF_PHONE_NUMBER: "+33612345678",
+            CONF_WEBSOCKET_ENABLED: websocket_enabled,
+        },
+        entry_id="test_entry",
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return config_entry
+
+
+def entity_id(hass: HomeAssistant, domain: str, key: str) -> str:
+    return er.async_get(hass).async_get_entity_id(domain, DOMAIN, f"test_entry_{key}")
+
+
+@pytest.mark.asyncio
+async def test_listener_entities_follow_state(hass: HomeAssistant, mock_signal_client):
+    """Test that the entities are updated on listener state changes."""
+    await setup_entry(hass)
+
+    connected = entity_id(hass, "binary_sensor", "connected")
+    reconnects = entity_id(hass, "sensor", "reconnects")
+    last_message = entity_id(hass, "sensor", "last_message")
+    latency = entity_id(hass, "sensor", "receive_latency")
+    assert hass.states.get(connected).state == STATE_OFF
+
+    mock_signal_client.connected = True
+    mock_signal_client.reconnects = 3
+    mock_signal_client.last_message_time = 1700000000.0
+    mock_signal_client.receive_latency = 1.25
+    for listener in mock_signal_client.state_listeners:
+        listener()
+    await hass.async_block_till_done()
+
+    assert hass.states.get(connected).state == STATE_ON
+    assert hass.states.get(reconnects).state == "3"
+    assert hass.states.get(last_message).state == "2023-11-14T22:13:20+00:00"
+    assert float(hass.states.get(latency).state) == 1.25
+
+
+@pytest.mark.asyncio
+async def test_no_entities_without_websocket(hass: HomeAssistant, mock_signal_client):
+    """Test that no listener entity is created when the WebSocket is disabled."""
+    await setup_entry(hass, websocket_enabled=False)
+
+    assert entity_id(hass, "binary_sensor", "connected") is None
+    assert entity_id(hass, "sensor", "reconnects") is None
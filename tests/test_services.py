@@ -0,0 +1,99 @@
+"""Tests for the integration-wide services."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.setup import async_setup_component
+from homeassistant.util import dt as dt_util
+
+from custom_components.signal_gateway.const import (
+    DOMAIN,
+    SERVICE_RECONNECT,
+    SERVICE_SEARCH_MESSAGES,
+)
+
+
+@pytest.mark.asyncio
+async def test_reconnect_service(hass: HomeAssistant):
+    """Test that the reconnect service reconnects one or all entries."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    first, second = MagicMock(), MagicMock()
+    first.reconnect = AsyncMock()
+    second.reconnect = AsyncMock()
+    hass.data[DOMAIN] = {"first": {"client": first}, "second": {"client": second}}
+
+    await hass.services.async_call(
+        DOMAIN, SERVICE_RECONNECT, {"config_entry_id": "second"}, blocking=True
+    )
+    first.reconnect.assert_not_awaited()
+    second.reconnect.assert_awaited_once()
+
+    await hass.services.async_call(DOMAIN, SERVICE_RECONNECT, {}, blocking=True)
+    first.reconnect.assert_awaited_once()
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN, SERVICE_RECONNECT, {"config_entry_id": "unknown"}, blocking=True
+        )
+
+
+@pytest.mark.asyncio
+async def test_search_messages_service(hass: HomeAssistant):
+    """Test that results of every store are merged, most recent first."""
+    assert await async_setup_component(hass, DOMAIN, {})
+    first, second = MagicMock(), MagicMock()
+    first.async_search = AsyncMock(
+        return_value=[{"timestamp": 3000, "message": "c"}, {"timestamp": 1000}]
+    )
+    second.async_search = AsyncMock(return_value=[{"timestamp": 2000}])
+    hass.data[DOMAIN] = {
+        "first": {"message_store": first},
+        "second": {"message_store": second},
+        "third": {},
+    }
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SEARCH_MESSAGES,
+        {
+            "query": "door",
+            "group_id": "group.YWJjZA==",
+            "since": "2026-01-01 00:00:00",
+            "limit": 2,
+        },
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {
+        "messages": [
+            {"timestamp": 3000, "message": "c", "config_entry_id": "first"},
+            {"timestamp": 2000, "config_entry_id": "second"},
+        ]
+    }
+    search = first.async_search.call_args.kwargs
+    assert search["query"] == "door"
+    assert search["group_id"] == "abcd"
+    assert search["since"] == int(
+        dt_util.as_utc(dt_util.parse_datetime("2026-01-01 00:00:00")).timestamp() * 1000
+    )
+    assert search["limit"] == 2
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_SEARCH_MESSAGES,
+        {"config_entry_id": "second"},
+        blocking=True,
+        return_response=True,
+    )
+    assert response == {"messages": [{"timestamp": 2000, "config_entry_id": "second"}]}
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_SEARCH_MESSAGES,
+            {"config_entry_id": "third"},
+            blocking=True,
+            return_response=True,
+        )
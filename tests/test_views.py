@@ -0,0 +1,123 @@
+"""Tests for the HTTP view serving received attachments."""
+
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant
+
+from custom_components.signal_gateway.const import (
+    CONF_PHONE_NUMBER,
+    CONF_SIGNAL_CLI_REST_API_URL,
+    CONF_WEBSOCKET_ENABLED,
+    DOMAIN,
+)
+
+CONTENT = b"0123456789" * 100
+
+
+@pytest.fixture
+async def signal_client(hass: HomeAssistant, tmp_path):
+    """Set up an entry whose client serves one attachment slowly."""
+    hass.config.media_dirs = {"local": str(tmp_path)}
+    release = asyncio.Event()
+
+    async def iter_attachment(attachment_id, size=0):
+        client.requests.append(attachment_id)
+        if attachment_id != "photo.jpg":
+            raise RuntimeError("Signal API error: 404 - not found")
+        await release.wait()
+        yield CONTENT
+
+    with patch("custom_components.signal_gateway.SignalClient") as mock_client_class:
+        client = MagicMock()
+        client.requests = []
+        client.release = release
+        client.iter_attachment = iter_attachment
+        client.stop_listening = AsyncMock()
+        mock_client_class.return_value = client
+
+        config_entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={
+                CONF_NAME: "test_gateway",
+                CONF_SIGNAL_CLI_REST_API_URL: "http://localhost:8080",
+                CONF_PHONE_NUMBER: "+33612345678",
+                CONF_WEBSOCKET_ENABLED: False,
+            },
+            entry_id="test_entry_id",
+        )
+        config_entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+        yield client
+
+
+URL = "/api/signal_gateway/attachments/test_entry_id/photo.jpg"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_download(
+    hass: HomeAssistant, hass_client, signal_client, tmp_path
+):
+    """Test that viewers of an uncached attachment trigger a single fetch."""
+    client = await hass_client()
+    requests = [asyncio.create_task(client.get(URL)) for _ in range(3)]
+    await asyncio.sleep(0.1)
+    signal_client.release.set()
+    responses = await asyncio.gather(*requests)
+
+    for response in responses:
+        assert response.status == HTTPStatus.OK
+        assert await response.read() == CONTENT
+        assert response.headers["Content-Type"] == "image/jpeg"
+        assert "immutable" in response.headers["Cache-Control"]
+    assert signal_client.requests == ["photo.jpg"]
+    path = tmp_path / DOMAIN / "test_gateway" / "photo.jpg"
+    assert path.read_bytes() == CONTENT
+
+
+@pytest.mark.asyncio
+async def test_range_and_etag(hass: HomeAssistant, hass_client, signal_client):
+    """Test that cached attachments support Range and conditional requests."""
+    signal_client.release.set()
+    client = await hass_client()
+    response = await client.get(URL)
+    etag = response.headers["ETag"]
+
+    response = await client.get(URL, headers={"Range": "bytes=10-19"})
+    assert response.status == HTTPStatus.PARTIAL_CONTENT
+    assert await response.read() == CONTENT[10:20]
+
+    response = await client.get(URL, headers={"If-None-Match": etag})
+    assert response.status == HTTPStatus.NOT_MODIFIED
+    assert signal_client.requests == ["photo.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_errors(hass: HomeAssistant, hass_client, signal_client):
+    """Test unknown entries, invalid IDs and upstream errors."""
+    client = await hass_client()
+    response = await client.get("/api/signal_gateway/attachments/unknown/photo.jpg")
+    assert response.status == HTTPStatus.NOT_FOUND
+    response = await client.get("/api/signal_gateway/attachments/test_entry_id/.hidden")
+    assert response.status == HTTPStatus.NOT_FOUND
+    response = await client.get(
+        "/api/signal_gateway/attachments/test_entry_id/missing.jpg"
+    )
+    assert response.status == HTTPStatus.BAD_GATEWAY
+
+
+@pytest.mark.asyncio
+async def test_authentication_required(
+    hass: HomeAssistant, hass_client_no_auth, signal_client
+):
+    """Test that attachments are not served without authentication."""
+    client = await hass_client_no_auth()
+    response = await client.get(URL)
+    assert response.status == HTTPStatus.UNAUTHORIZED
+    assert signal_client.requests == []